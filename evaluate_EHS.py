@@ -1,10 +1,19 @@
+import argparse
 import numpy as np
+from poker_env.equity import get_histogram_vector, calculate_equity  # noqa: F401
 
 
-def get_histogram_vector(array, bins=50, range=(0, 1)):
-    '''
-    Get the probability histogram vector of a numpy array.
-    '''
-    histogram_vec = np.histogram(array, bins=bins, range=range, density=True)
-    prob_vec = histogram_vec / np.sum(histogram_vec)
-    return prob_vec
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the expected hand strength (EHS) of a hand against a random hand")
+    parser.add_argument('hand_cards', nargs=2, help="2 hand cards, Eg: As Kd")
+    parser.add_argument('-p', '--public_cards', nargs='*', default=[], help="0, 3, 4 or 5 public cards")
+    parser.add_argument('-b', '--bins', type=int, default=50, help="the number of bins of the histogram")
+    args = parser.parse_args()
+
+    equity = calculate_equity(args.hand_cards, args.public_cards, bins=args.bins)
+    print("EHS: {:.4f} // EHS^2: {:.4f}".format(equity.ehs, equity.ehs2))
+    print("Histogram: {}".format(np.round(equity.histogram, 4)))
+
+
+if __name__ == '__main__':
+    main()
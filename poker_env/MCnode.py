@@ -88,7 +88,7 @@ class NoLimitTexasHoldemGameMCTSNode(RealtimeSearchMCTSNode):
     @property
     def untried_actions(self):
         if self._untried_actions is None:
-            self._untried_actions = self.state.get_legal_actions()
+            self._untried_actions = list(self.state.get_legal_actions().iter_actions())
         return self._untried_actions
 
     @property
@@ -106,7 +106,7 @@ class NoLimitTexasHoldemGameMCTSNode(RealtimeSearchMCTSNode):
 
     def expand(self):
         action = self.untried_actions.pop()
-        next_state, _ = self.state.step(action)
+        next_state = self.state.child(action)
         child_node = NoLimitTexasHoldemGameMCTSNode(
             next_state, parent=self
         )
@@ -117,12 +117,13 @@ class NoLimitTexasHoldemGameMCTSNode(RealtimeSearchMCTSNode):
         return self.state.is_over()
 
     def rollout(self):
-        current_rollout_state = self.state
+        # Play on a copy, the state of the node is kept
+        current_rollout_state = self.state.clone()
         while not current_rollout_state.is_over():
             possible_actions = current_rollout_state.get_legal_actions()
             action = self.rollout_policy(possible_actions)
-            current_rollout_state = current_rollout_state.step(action)
-        return current_rollout_state.game_result
+            current_rollout_state.step(action)
+        return current_rollout_state.get_payoffs()
 
     def backpropagate(self, result):
         self._number_of_visits += 1.
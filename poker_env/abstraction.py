@@ -0,0 +1,463 @@
+import os
+import argparse
+import functools
+import itertools
+import multiprocessing
+from math import comb
+import numpy as np
+from poker_env.utils import init_52_deck
+from poker_env.equity import exact_equity, HOLE_PAIRS
+from poker_env.evaluator import evaluate_batch, colex_combinations
+from poker_env.preflop import get_preflop_histogram, HISTOGRAM_BINS
+from poker_env.isomorphism import get_hand_indexer, HAND_INDEX_SIZES, HAND_INDEX_OFFSETS, HAND_INDEX_NUM, \
+    PUBLIC_CARDS_PER_ROUND, RANK_NUM, SUIT_NUM
+
+
+# Default path of the bucket table built by `python -m poker_env.abstraction build`
+BUCKET_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'buckets.npy')
+# Default number of buckets of each betting round, pre-flop hands are not abstracted
+BUCKET_NUMS = (169, 200, 200, 200)
+# Default number of sampled hands to fit the buckets of each betting round, the river is fit on all the hands
+FIT_SAMPLE_NUMS = (169, 5000, 5000, 10000)
+# Number of hands each worker process handles at once
+CHUNK_SIZE = 1000
+# Number of river boards each worker process handles at once
+RIVER_BOARD_CHUNK_SIZE = 64
+# Number of cards in a deck
+CARD_NUM = RANK_NUM * SUIT_NUM
+# The river score of a hand counts 2 for each of the 990 opponent hands it beats and 1 for each tie,
+# the hand strength is score / RIVER_SCORE_MAX
+RIVER_SCORE_MAX = 2 * comb(CARD_NUM - 7, 2)
+
+# Lazily loaded bucket table: None if not loaded yet, False if the table file does not exist
+_bucket_table = None
+
+
+def get_hand_histograms(bet_round, indices, bins=HISTOGRAM_BINS):
+    '''
+    Compute the EHS histograms of canonical hands against a random opponent.
+
+    Args:
+        bet_round (int): 0 for pre-flop, 1 for flop, 2 for turn, 3 for river
+        indices (list): indices of hands in the round, see poker_env.isomorphism.HandIndexer
+        bins (int): the number of bins of each histogram
+
+    Returns:
+        (numpy.ndarray): shape (len(indices), bins), the histogram of each hand
+    '''
+    indexer = get_hand_indexer(bet_round)
+    deck = init_52_deck()
+    histograms = np.empty((len(indices), bins))
+    for i, index in enumerate(indices):
+        cards = indexer.unindex(int(index))
+        if bet_round == 0:
+            # Pre-flop histograms come from the pre-flop table
+            histograms[i] = get_preflop_histogram([deck[card] for card in cards])
+        else:
+            histograms[i] = exact_equity(cards[:2], cards[2:], bins=bins).histogram
+    return histograms
+
+
+def get_canonical_boards(card_num):
+    '''
+    Enumerate the boards up to suit isomorphism. The representative of a board is the one with the smallest
+    colexicographic index among its 24 suit permutations.
+
+    Args:
+        card_num (int): the number of public cards
+
+    Returns:
+        (numpy.ndarray): shape (M, card_num), sorted card ids of each representative board
+    '''
+    boards = colex_combinations(CARD_NUM, card_num).astype(np.intp)
+    binom = np.array([[comb(n, k) for n in range(CARD_NUM)] for k in range(card_num + 1)], dtype=np.int64)
+    # The boards are in colexicographic order, so the index of a board is its row
+    canonical = np.ones(len(boards), dtype=bool)
+    for suits in itertools.permutations(range(SUIT_NUM)):
+        card_map = np.array([suits[card // RANK_NUM] * RANK_NUM + card % RANK_NUM for card in range(CARD_NUM)])
+        permuted = np.sort(card_map[boards], axis=1)
+        index = sum(binom[i + 1][permuted[:, i]] for i in range(card_num))
+        canonical &= np.arange(len(boards)) <= index
+    return boards[canonical]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_river_pairs():
+    '''
+    The hole pairs among the 47 cards left by a river board (positions in colex order), the pairs with each card,
+    and the flat position of each pair among the pairs with each of its 2 cards.
+    '''
+    pairs = colex_combinations(CARD_NUM - 5, 2).astype(np.intp)
+    card_pairs = np.array([np.flatnonzero((pairs == card).any(axis=1)) for card in range(CARD_NUM - 5)])
+    # Flat positions in card_pairs
+    positions = np.empty_like(pairs)
+    for card, card_pair in enumerate(card_pairs):
+        for position, pair in enumerate(card_pair):
+            positions[pair, int(pairs[pair, 1] == card)] = card * card_pairs.shape[1] + position
+    return pairs, card_pairs, positions
+
+
+def _count_lower(values):
+    '''
+    Count the values lower than and not higher than each value in its row (along the last axis).
+    Values must be less than 1 << 20 and rows shorter than 2048.
+    '''
+    size = values.shape[-1]
+    rows = values.reshape(-1, size)
+    # Sort the values with their positions in the low bits
+    keys = np.sort(rows.astype(np.int32) << 11 | np.arange(size, dtype=np.int32), axis=1)
+    sorted_values = keys >> 11
+    positions = np.broadcast_to(np.arange(size, dtype=np.int32), keys.shape)
+    changes = sorted_values[:, 1:] != sorted_values[:, :-1]
+    edge = np.ones((len(rows), 1), dtype=bool)
+    # The first and the last position of the run of equal values of each sorted position
+    first = np.maximum.accumulate(np.where(np.concatenate([edge, changes], axis=1), positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(np.concatenate([changes, edge], axis=1), positions, size)[:, ::-1],
+                                 axis=1)[:, ::-1]
+    targets = (np.arange(len(rows))[:, None] * size + (keys & 2047)).ravel()
+    lower = np.empty(rows.size, dtype=np.int32)
+    not_higher = np.empty(rows.size, dtype=np.int32)
+    lower[targets] = first.ravel()
+    not_higher[targets] = last.ravel() + 1
+    return lower.reshape(values.shape), not_higher.reshape(values.shape)
+
+
+def get_river_scores(boards):
+    '''
+    Compute the hand strength of every hole pair against a random opponent hand on river boards.
+
+    The 1081 hands left by a board are ranked once, and each hand counts the opponents it beats and ties with
+    by sorting. The opponents that share a card with the hand are taken out by inclusion-exclusion over the
+    hands with each of its cards, so a board takes 1081 evaluations instead of 1081 * 990.
+
+    Args:
+        boards (numpy.ndarray): shape (B, 5), card ids of each board
+
+    Returns:
+        (numpy.ndarray): shape (B, 1326), int16 scores of the hole pairs aligned with HOLE_PAIRS
+                         (see RIVER_SCORE_MAX), -1 for the pairs that share a card with the board
+    '''
+    boards = np.asarray(boards, dtype=np.intp)
+    board_num = len(boards)
+    pairs, card_pairs, positions = _get_river_pairs()
+    rows = np.arange(board_num)[:, None]
+    used = np.zeros((board_num, CARD_NUM), dtype=bool)
+    used[rows, boards] = True
+    decks = np.nonzero(~used)[1].reshape(board_num, CARD_NUM - 5)
+    pair_cards = decks[:, pairs]
+    cards = np.empty((board_num, len(pairs), 7), dtype=np.int8)
+    cards[:, :, :5] = boards[:, None]
+    cards[:, :, 5:] = pair_cards
+    ranks = evaluate_batch(cards.reshape(-1, 7)).reshape(board_num, len(pairs))
+
+    lower, not_higher = _count_lower(ranks)
+    # The same counts among the hands with each card, taken out for both cards of the hand
+    card_lower, card_not_higher = _count_lower(ranks[:, card_pairs.ravel()].reshape(board_num, *card_pairs.shape))
+    card_lower = card_lower.reshape(board_num, -1)
+    card_not_higher = card_not_higher.reshape(board_num, -1)
+    for i in range(2):
+        lower -= card_lower[:, positions[:, i]]
+        not_higher -= card_not_higher[:, positions[:, i]]
+    # The hand itself is not higher than itself, and it has both cards
+    not_higher += 1
+
+    scores = np.full((board_num, len(HOLE_PAIRS)), -1, dtype=np.int16)
+    high = pair_cards[:, :, 1]
+    scores[rows, high * (high - 1) // 2 + pair_cards[:, :, 0]] = lower + not_higher
+    return scores
+
+
+@functools.lru_cache(maxsize=None)
+def _get_score_bins(bins):
+    '''
+    The histogram bin of each river score, the same as numpy.histogram of the hand strengths over [0, 1].
+    '''
+    edges = np.linspace(0, 1, bins + 1)
+    strengths = np.arange(RIVER_SCORE_MAX + 1) / RIVER_SCORE_MAX
+    return np.minimum(np.searchsorted(edges, strengths, side='right') - 1, bins - 1)
+
+
+def get_board_histograms(board, bins=HISTOGRAM_BINS):
+    '''
+    Compute the EHS histograms of every hole pair on a flop or turn board against a random opponent,
+    from the river scores of all the runouts of the board.
+
+    Args:
+        board (list): 3 or 4 card ids of the public cards
+        bins (int): the number of bins of each histogram
+
+    Returns:
+        (tuple): Tuple containing:
+            (numpy.ndarray): shape (P,), indices in HOLE_PAIRS of the pairs that do not share a card with the board
+            (numpy.ndarray): shape (P, bins), the histogram of each pair, the same as exact_equity
+    '''
+    board = list(board)
+    deck = np.setdiff1d(np.arange(CARD_NUM), board)
+    runouts = deck[colex_combinations(len(deck), 5 - len(board)).astype(np.intp)]
+    boards = np.concatenate([np.tile(board, (len(runouts), 1)), runouts], axis=1)
+    scores = get_river_scores(boards)
+    valid = scores >= 0
+    pair_bins = np.arange(len(HOLE_PAIRS)) * bins + _get_score_bins(bins)[np.maximum(scores, 0)]
+    counts = np.bincount(pair_bins[valid], minlength=len(HOLE_PAIRS) * bins).reshape(len(HOLE_PAIRS), bins)
+    pair_indices = np.flatnonzero(valid.any(axis=0))
+    counts = counts[pair_indices]
+    return pair_indices, counts / counts.sum(axis=1, keepdims=True)
+
+
+def emd_distances(histograms, centers):
+    '''
+    Compute the earth mover's distances between histograms and cluster centers.
+    For 1-dimensional histograms, it is the L1 distance between their cumulative distributions.
+
+    Args:
+        histograms (numpy.ndarray): shape (N, bins)
+        centers (numpy.ndarray): shape (K, bins)
+
+    Returns:
+        (numpy.ndarray): shape (N, K), the distances
+    '''
+    histogram_cdf = np.cumsum(histograms, axis=1)
+    center_cdf = np.cumsum(centers, axis=1)
+    distances = np.empty((len(histograms), len(centers)))
+    # One center at a time to keep the memory linear in N
+    for k, cdf in enumerate(center_cdf):
+        distances[:, k] = np.abs(histogram_cdf - cdf).sum(axis=1)
+    return distances
+
+
+def kmeans_emd(histograms, cluster_num, iteration_num=30, rng=None):
+    '''
+    Cluster histograms with k-means under earth mover's distance, initialized by k-means++.
+
+    Args:
+        histograms (numpy.ndarray): shape (N, bins)
+        cluster_num (int): the number of clusters
+        iteration_num (int): the maximum number of iterations
+        rng (numpy.random.Generator): optional, the random generator
+
+    Returns:
+        (tuple): Tuple containing:
+            (numpy.ndarray): shape (cluster_num, bins), the cluster centers
+            (numpy.ndarray): shape (N,), the cluster of each histogram
+    '''
+    rng = np.random.default_rng() if rng is None else rng
+    cluster_num = min(cluster_num, len(histograms))
+    centers = histograms[[rng.integers(len(histograms))]]
+    distances = emd_distances(histograms, centers)[:, 0]
+    while len(centers) < cluster_num:
+        # Far histograms are more likely to be the next center
+        if distances.sum() > 0:
+            next_center = rng.choice(len(histograms), p=distances ** 2 / np.sum(distances ** 2))
+        else:
+            next_center = rng.integers(len(histograms))
+        centers = np.vstack([centers, histograms[next_center]])
+        distances = np.minimum(distances, emd_distances(histograms, centers[-1:])[:, 0])
+
+    labels = None
+    for _ in range(iteration_num):
+        new_labels = np.argmin(emd_distances(histograms, centers), axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        for k in range(len(centers)):
+            members = histograms[labels == k]
+            # Keep the old center of an empty cluster
+            if len(members) > 0:
+                centers[k] = members.mean(axis=0)
+    return centers, labels
+
+
+def kmeans_1d(values, weights, cluster_num, iteration_num=100):
+    '''
+    Cluster weighted scalars with k-means, initialized at the weighted quantiles. Under earth mover's distance,
+    scalars are histograms with a single bin, so hand strengths are clustered directly.
+
+    Args:
+        values (numpy.ndarray): shape (N,), the scalars
+        weights (numpy.ndarray): shape (N,), the weight of each scalar
+        cluster_num (int): the max number of clusters, equal quantiles are merged
+        iteration_num (int): the maximum number of iterations
+
+    Returns:
+        (tuple): Tuple containing:
+            (numpy.ndarray): shape (K,), the cluster centers in ascending order
+            (numpy.ndarray): shape (N,), the cluster of each scalar, the nearest center
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    quantiles = (np.arange(cluster_num) + 0.5) / cluster_num * cumulative[-1]
+    centers = np.unique(values[order][np.minimum(np.searchsorted(cumulative, quantiles), len(values) - 1)])
+    for _ in range(iteration_num):
+        labels = np.searchsorted((centers[1:] + centers[:-1]) / 2, values)
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        sums = np.bincount(labels, weights=weights * values, minlength=len(centers))
+        # Keep the old center of an empty cluster
+        new_centers = np.where(totals > 0, sums / np.maximum(totals, 1e-300), centers)
+        if np.array_equal(new_centers, centers):
+            break
+        centers = new_centers
+    return centers, np.searchsorted((centers[1:] + centers[:-1]) / 2, values)
+
+
+def _histogram_worker(args):
+    bet_round, indices, bins = args
+    return get_hand_histograms(bet_round, indices, bins)
+
+
+def _river_score_worker(boards):
+    scores = get_river_scores(boards)
+    rows, pair_indices = np.nonzero(scores >= 0)
+    hands = np.concatenate([HOLE_PAIRS[pair_indices], boards[rows]], axis=1)
+    return get_hand_indexer(3).index_batch(hands), scores[rows, pair_indices]
+
+
+def _board_bucket_worker(args):
+    bet_round, boards, centers = args
+    indexer = get_hand_indexer(bet_round)
+    indices, buckets = [], []
+    for board in boards:
+        pair_indices, histograms = get_board_histograms(board, centers.shape[1])
+        hands = np.concatenate([HOLE_PAIRS[pair_indices], np.tile(board, (len(pair_indices), 1))], axis=1)
+        indices.append(indexer.index_batch(hands))
+        buckets.append(np.argmin(emd_distances(histograms, centers), axis=1))
+    return np.concatenate(indices), np.concatenate(buckets)
+
+
+def _fill_river_buckets(river, bucket_num, pool):
+    '''
+    Write the river score of every canonical river hand into river (the river part of the bucket table),
+    then cluster the scores of all the hands and replace each score by its bucket.
+    '''
+    boards = get_canonical_boards(5)
+    tasks = [boards[start:start + RIVER_BOARD_CHUNK_SIZE] for start in range(0, len(boards), RIVER_BOARD_CHUNK_SIZE)]
+    # Every canonical hand is a hand on a canonical board, some of them are written more than once
+    for indices, scores in pool.imap_unordered(_river_score_worker, tasks):
+        river[indices] = scores
+    step = 1 << 24
+    counts = np.zeros(RIVER_SCORE_MAX + 1)
+    for start in range(0, len(river), step):
+        counts += np.bincount(river[start:start + step], minlength=RIVER_SCORE_MAX + 1)
+    _, buckets = kmeans_1d(np.arange(RIVER_SCORE_MAX + 1), counts, bucket_num)
+    buckets = buckets.astype(river.dtype)
+    for start in range(0, len(river), step):
+        river[start:start + step] = buckets[river[start:start + step]]
+
+
+def build_bucket_table(path=BUCKET_TABLE_PATH, bucket_nums=BUCKET_NUMS, fit_sample_nums=FIT_SAMPLE_NUMS,
+                       process_num=None, bins=HISTOGRAM_BINS, seed=0):
+    '''
+    Build the bucket table of all the betting rounds and write it to a .npy file.
+
+    On the flop and the turn, the EHS histograms of sampled canonical hands (by exact_equity) are clustered by
+    k-means under earth mover's distance. Then the histograms of all the hands are computed a board at a time
+    (see get_board_histograms) for the boards up to suit isomorphism, and every hand is assigned to the bucket of
+    its nearest center. On the river, a histogram is a single bin, so the hand strengths of all the canonical
+    hands (see get_river_scores) are clustered directly. A round with at least as many buckets as hands is kept
+    lossless. The work is done in parallel by process_num processes.
+
+    The default build takes about 35 CPU minutes (flop about 16, turn about 14, river about 5), instead of about
+    44 CPU hours with exact_equity for every hand, and the table file is about 277MB.
+
+    Args:
+        path (str): the path of the table file
+        bucket_nums (tuple): the number of buckets of each betting round
+        fit_sample_nums (tuple): the number of sampled hands to fit the buckets of each betting round,
+                                 the river is fit on all the hands
+        process_num (int): the number of worker processes, default is the number of CPUs
+        bins (int): the number of bins of each histogram
+        seed (int): the seed of the random generator
+    '''
+    rng = np.random.default_rng(seed)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint16, shape=(HAND_INDEX_NUM,))
+    with multiprocessing.Pool(process_num) as pool:
+        for bet_round, (size, offset) in enumerate(zip(HAND_INDEX_SIZES, HAND_INDEX_OFFSETS)):
+            if bucket_nums[bet_round] > np.iinfo(np.uint16).max + 1:
+                raise ValueError("At most 65536 buckets are supported in each round.")
+            if bucket_nums[bet_round] >= size:
+                table[offset:offset + size] = np.arange(size)
+                continue
+            if bet_round == 3:
+                _fill_river_buckets(table[offset:offset + size], bucket_nums[bet_round], pool)
+                continue
+            sample = rng.choice(size, min(fit_sample_nums[bet_round], size), replace=False)
+            if bet_round == 0:
+                # Pre-flop histograms are looked up, so all the 169 hands are assigned to the nearest centers
+                histograms = get_hand_histograms(bet_round, range(size), bins)
+                centers, _ = kmeans_emd(histograms[sample], bucket_nums[bet_round], rng=rng)
+                table[offset:offset + size] = np.argmin(emd_distances(histograms, centers), axis=1)
+                continue
+            tasks = [(bet_round, sample[start:start + CHUNK_SIZE], bins) for start in range(0, len(sample), CHUNK_SIZE)]
+            histograms = np.concatenate(pool.map(_histogram_worker, tasks))
+            centers, _ = kmeans_emd(histograms, bucket_nums[bet_round], rng=rng)
+            boards = get_canonical_boards(PUBLIC_CARDS_PER_ROUND[bet_round])
+            # About 0.45 s for a flop board and 50 ms for a turn board
+            board_num = 1 if bet_round == 1 else 32
+            tasks = [(bet_round, boards[start:start + board_num], centers)
+                     for start in range(0, len(boards), board_num)]
+            for indices, buckets in pool.imap_unordered(_board_bucket_worker, tasks):
+                table[offset + indices] = buckets
+    table.flush()
+    del table
+    # Replace atomically, so that other processes never load a partial table
+    os.replace(tmp_path, path)
+
+
+def load_bucket_table(path=None):
+    '''
+    Memory-map the bucket table, which maps the global hand index (see poker_env.isomorphism.index_hand)
+    to the bucket of the hand in its betting round.
+
+    Args:
+        path (str): the path of the table file, default is BUCKET_TABLE_PATH
+    Returns:
+        (numpy.ndarray or bool): the bucket table backed by the memory map, False if not available
+    '''
+    global _bucket_table
+    path = BUCKET_TABLE_PATH if path is None else path
+    if os.path.exists(path):
+        table = np.load(path, mmap_mode='r')
+        if table.shape != (HAND_INDEX_NUM,) or table.dtype != np.uint16:
+            raise ValueError("{} is not a valid bucket table.".format(path))
+        _bucket_table = table.view(np.ndarray)
+    else:
+        _bucket_table = False
+    return _bucket_table
+
+
+def get_bucket(hand_index):
+    '''
+    Get the bucket of a hand.
+
+    Args:
+        hand_index (int): the global index of the hand, see PokerState.get_hand_index
+    Returns:
+        (int): the bucket of the hand in its betting round, None if the bucket table is not available
+    '''
+    buckets = _bucket_table if _bucket_table is not None else load_bucket_table()
+    if buckets is False:
+        return None
+    return int(buckets[hand_index])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Card abstraction tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="build the bucket table of all the betting rounds")
+    build_parser.add_argument('-o', '--output', default=BUCKET_TABLE_PATH, help="path of the bucket table file")
+    build_parser.add_argument('-b', '--buckets', type=int, nargs=4, default=BUCKET_NUMS,
+                              help="number of buckets of pre-flop, flop, turn and river")
+    build_parser.add_argument('-s', '--samples', type=int, nargs=4, default=FIT_SAMPLE_NUMS,
+                              help="number of sampled hands to fit the buckets of each round")
+    build_parser.add_argument('-p', '--processes', type=int, default=None, help="number of worker processes")
+    build_parser.add_argument('--seed', type=int, default=0, help="seed of the random generator")
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_bucket_table(args.output, args.buckets, args.samples, args.processes, seed=args.seed)
+        print("Bucket table is saved to {}".format(args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,293 @@
 from enum import Enum
+from collections.abc import Sequence
+import numpy as np
+
+
+# Integer action codes. The kind of an action is in the low ACTION_KIND_BITS bits, and the amount of a raise
+# is in the high bits, Eg: 'raise10' is 10 << ACTION_KIND_BITS | RAISE_ACTION.
+ACTION_KIND_BITS = 3
+ACTION_KIND_MASK = (1 << ACTION_KIND_BITS) - 1
+FOLD_ACTION = 0
+CHECK_ACTION = 1
+CALL_ACTION = 2
+RAISE_ACTION = 3
+ALL_IN_ACTION = 4
+_KIND_STRINGS = ('fold', 'check', 'call', 'raise', 'all-in')
+_STRING_KINDS = {'fold': FOLD_ACTION, 'check': CHECK_ACTION, 'call': CALL_ACTION, 'all-in': ALL_IN_ACTION}
+
+
+def raise_action(amount):
+    '''
+    Get the code of raising the amount of chips
+    '''
+    return amount << ACTION_KIND_BITS | RAISE_ACTION
+
+
+def get_action_kind(action):
+    '''
+    Get the kind (FOLD_ACTION, CHECK_ACTION, CALL_ACTION, RAISE_ACTION or ALL_IN_ACTION) of an action code
+    '''
+    return action & ACTION_KIND_MASK
+
+
+def get_raise_amount(action):
+    '''
+    Get the raise amount of an action code, 0 if it is not a raise
+    '''
+    return action >> ACTION_KIND_BITS
+
+
+def action_from_str(action):
+    '''
+    Convert an action string ('fold', 'check', 'call', 'raise{amount}' or 'all-in') to its code.
+    '''
+    kind = _STRING_KINDS.get(action)
+    if kind is not None:
+        return kind
+    if action.startswith('raise'):
+        try:
+            return raise_action(int(action[5:]))
+        except ValueError:
+            pass
+    raise ValueError("Unknown action: {}".format(action))
+
+
+def action_to_str(action):
+    '''
+    Convert an action code to its string.
+    '''
+    kind = action & ACTION_KIND_MASK
+    if kind == RAISE_ACTION:
+        return 'raise{}'.format(action >> ACTION_KIND_BITS)
+    return _KIND_STRINGS[kind]
+
+
+def to_action(action):
+    '''
+    Get the code of an action given by a string or an integer.
+    '''
+    if isinstance(action, str):
+        return action_from_str(action)
+    return int(action)
+
+
+def _get_action_num(big_blind, init_chips):
+    max_raise = init_chips if isinstance(init_chips, int) else max(init_chips)
+    return 4 + max(0, max_raise - big_blind)
+
+
+def get_action_space(big_blind, init_chips):
+    '''
+    Get the action space of a game: 'fold', 'check', 'call', every 'raise{amount}' with amount from big_blind
+    to the max init chips (excluded), and 'all-in'.
+
+    Args:
+        big_blind (int): the number of Big Blind(BB) chips
+        init_chips (int or list): chips that each player holds when game starts
+
+    Returns:
+        (list): each element (str) represent a possible action
+    '''
+    max_raise = init_chips if isinstance(init_chips, int) else max(init_chips)
+    action_space = ['fold', 'check', 'call']
+    for i in range(big_blind, max_raise):
+        action_space.append('raise{}'.format(i))
+    action_space.append('all-in')
+    return action_space
+
+
+def get_action_index(action, big_blind, init_chips):
+    '''
+    Get the index of an action in the action space in constant time.
+
+    Args:
+        action (int or str): the code of the action, or its string
+        big_blind (int): the number of Big Blind(BB) chips
+        init_chips (int or list): chips that each player holds when game starts
+
+    Returns:
+        (int): the index in the action space
+    '''
+    action = to_action(action)
+    kind = get_action_kind(action)
+    action_num = _get_action_num(big_blind, init_chips)
+    if kind == RAISE_ACTION:
+        index = 3 + get_raise_amount(action) - big_blind
+        if not 3 <= index < action_num - 1:
+            raise ValueError("{} is not in the action space.".format(action_to_str(action)))
+        return index
+    if kind == ALL_IN_ACTION:
+        return action_num - 1
+    return kind
+
+
+def get_action_from_index(index, big_blind, init_chips):
+    '''
+    Get the code of an action in the action space in constant time.
+
+    Args:
+        index (int): the index in the action space
+        big_blind (int): the number of Big Blind(BB) chips
+        init_chips (int or list): chips that each player holds when game starts
+
+    Returns:
+        (int): the code of the action
+    '''
+    action_num = _get_action_num(big_blind, init_chips)
+    if index < 0:
+        index += action_num
+    if index < 3:
+        return index
+    if index == action_num - 1:
+        return ALL_IN_ACTION
+    return raise_action(index - 3 + big_blind)
+
+
+def get_legal_action_mask(legal_actions, big_blind, init_chips, out=None):
+    '''
+    Mark the legal actions in the action space.
+
+    Args:
+        legal_actions (LegalActions): the legal actions of a state
+        big_blind (int): the number of Big Blind(BB) chips
+        init_chips (int or list): chips that each player holds when game starts
+        out (numpy.ndarray): optional, shape (len(action_space),), the mask to fill
+
+    Returns:
+        (numpy.ndarray): 1 for the legal actions, 0 otherwise
+    '''
+    if out is None:
+        out = np.zeros(_get_action_num(big_blind, init_chips), dtype=bool)
+    else:
+        out[:] = 0
+    out[:3] = legal_actions.fold, legal_actions.check, legal_actions.call
+    # Raise actions are consecutive in the action space
+    if legal_actions.raise_num > 0:
+        min_raise_index = 3 + legal_actions.min_raise - big_blind
+        out[min_raise_index:min_raise_index + legal_actions.raise_num] = 1
+    out[-1] = legal_actions.all_in
+    return out
+
+
+class LegalActions(Sequence):
+    '''
+    A compact descriptor of the legal actions of a decision point.
+
+    The actions are fold, check or call, every 'raise{amount}' with amount in [min_raise, max_raise], and all-in.
+    It behaves as the list ['fold', ('check' | 'call'), 'raise{min_raise}', ..., 'raise{max_raise}', 'all-in']
+    (in this order), but the raise strings are only created when they are iterated or indexed.
+    get_action and iter_actions give the integer codes of the actions in the same order.
+
+    Attributes:
+        fold (boolean): True if the player can fold
+        check (boolean): True if the player can check
+        call (boolean): True if the player can call
+        min_raise (int): the min legal raise amount
+        max_raise (int): the max legal raise amount, less than min_raise if the player cannot raise
+        all_in (boolean): True if the player can all-in
+    '''
+    __slots__ = ('fold', 'check', 'call', 'min_raise', 'max_raise', 'all_in', '__heads')
+
+    def __init__(self, fold=True, check=False, call=False, min_raise=1, max_raise=0, all_in=True):
+        '''
+        Initialize the legal actions.
+        '''
+        self.fold = fold
+        self.check = check
+        self.call = call
+        self.min_raise = min_raise
+        self.max_raise = max_raise
+        self.all_in = all_in
+        # Codes of the actions before the raises
+        self.__heads = [action for action, legal in ((FOLD_ACTION, fold), (CHECK_ACTION, check),
+                                                     (CALL_ACTION, call)) if legal]
+
+    @property
+    def raise_num(self):
+        '''
+        The number of legal raise amounts
+        '''
+        return max(0, self.max_raise - self.min_raise + 1)
+
+    def can_raise(self, amount):
+        '''
+        Return True if the player can raise the amount of chips
+        '''
+        return self.min_raise <= amount <= self.max_raise
+
+    def get_action(self, index):
+        '''
+        Get the code of the index-th legal action.
+
+        Args:
+            index (int): the index of the action, negative values count from the end
+
+        Returns:
+            (int): the action code
+        '''
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("legal action index out of range")
+        if index < len(self.__heads):
+            return self.__heads[index]
+        index -= len(self.__heads)
+        if index < self.raise_num:
+            return raise_action(self.min_raise + index)
+        return ALL_IN_ACTION
+
+    def iter_actions(self):
+        '''
+        Iterate the codes of the legal actions.
+        '''
+        yield from self.__heads
+        for amount in range(self.min_raise, self.max_raise + 1):
+            yield raise_action(amount)
+        if self.all_in:
+            yield ALL_IN_ACTION
+
+    def __len__(self):
+        return len(self.__heads) + self.raise_num + self.all_in
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return action_to_str(self.get_action(index))
+
+    def __iter__(self):
+        for action in self.iter_actions():
+            yield action_to_str(action)
+
+    def __contains__(self, action):
+        try:
+            action = to_action(action)
+        except (TypeError, ValueError):
+            return False
+        kind = action & ACTION_KIND_MASK
+        if kind == RAISE_ACTION:
+            return self.can_raise(action >> ACTION_KIND_BITS)
+        if kind == ALL_IN_ACTION:
+            return action == ALL_IN_ACTION and self.all_in
+        return action in self.__heads
+
+    def __eq__(self, other):
+        if isinstance(other, LegalActions):
+            return self.__key() == other.__key()
+        if isinstance(other, list):
+            return len(self) == len(other) and list(self) == other
+        return NotImplemented
+
+    def __key(self):
+        return self.__heads, self.all_in, (self.min_raise, self.max_raise) if self.raise_num else None
+
+    __hash__ = None
+
+    def __repr__(self):
+        heads = [action_to_str(action) for action in self.__heads]
+        if self.raise_num:
+            heads.append('raise{}~{}'.format(self.min_raise, self.max_raise))
+        return 'LegalActions({})'.format(heads + (['all-in'] if self.all_in else []))
 
 
 class AbstractAction(Enum):
@@ -21,39 +310,34 @@ class AbstractAction(Enum):
             state (PokerState): the target state
 
         Returns:
-            (str): specific legal action
+            (int): the code of the specific legal action
         '''
         total_pot = sum(state.pot)
         legal_actions = state.legal_actions
 
         if self == AbstractAction.FOLD:
-            action_str = 'fold'
+            if legal_actions.fold:
+                return FOLD_ACTION
         elif self == AbstractAction.CHECK:
-            action_str = 'check'
+            if legal_actions.check:
+                return CHECK_ACTION
         elif self == AbstractAction.CALL:
-            action_str = 'call'
-        elif self == AbstractAction.RAISE_HALF_POT:
-            action_str = 'raise{}'.format(int(0.5 * total_pot))
-        elif self == AbstractAction.RAISE_POT:
-            action_str = 'raise{}'.format(int(total_pot))
-        elif self == AbstractAction.RAISE_2POT:
-            action_str = 'raise{}'.format(int(2 * total_pot))
-        else:
-            action_str = 'all-in'
-
-        # fold, check, call, raise
-        if action_str in legal_actions:
-            return action_str
-        # Do not have enough chips
-        else:
-            return 'all-in'
+            if legal_actions.call:
+                return CALL_ACTION
+        elif self != AbstractAction.ALL_IN:
+            pot_ratio = {AbstractAction.RAISE_HALF_POT: 0.5,
+                         AbstractAction.RAISE_POT: 1,
+                         AbstractAction.RAISE_2POT: 2}[self]
+            raise_amount = int(pot_ratio * total_pot)
+            if legal_actions.can_raise(raise_amount):
+                return raise_action(raise_amount)
+        # all-in, or do not have enough chips
+        return ALL_IN_ACTION
 
 
 # from state import PokerState
 # if __name__ == "__main__":
-#     legal_actions = ['fold', 'call', 'all-in']
-#     for i in range(4, 100):
-#         legal_actions.append('raise{}'.format(i))
+#     legal_actions = LegalActions(call=True, min_raise=4, max_raise=99)
 #     temp_state = PokerState(player_id=0,
 #                             pot=[10 for _ in range(6)],
 #                             hand_cards=[],
@@ -33,7 +33,7 @@ class Agent:
             state (PokerState): the current state
 
         Returns:
-            action (str): the action predicted by the agent
+            action (int or str): the code of the action predicted by the agent (see poker_env.action), or its string
         '''
         raise NotImplementedError
 
@@ -46,6 +46,6 @@ class Agent:
             state (PokerState): the current state
 
         Returns:
-            action (str): the action predicted by the agent
+            action (int or str): the code of the action predicted by the agent (see poker_env.action), or its string
         '''
         raise NotImplementedError
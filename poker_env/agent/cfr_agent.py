@@ -2,7 +2,15 @@ import numpy as np
 import collections
 from poker_env.agent.base_agent import Agent
 from poker_env.env import NoLimitTexasHoldemEnv as Env
-from poker_env.action import AbstractAction
+from poker_env.action import AbstractAction, raise_action, FOLD_ACTION, CHECK_ACTION, CALL_ACTION, ALL_IN_ACTION
+from poker_env.abstraction import get_bucket
+from poker_env.infoset_table import SparseInfosetTable
+
+
+# Fields of the sparse infoset table
+REGRET = 0
+AVERAGE_POLICY = 1
+POLICY = 2
 
 
 class CFRAgent(Agent):
@@ -11,14 +19,19 @@ class CFRAgent(Agent):
 
     Attributes:
         agent_type (str): the type name of the agent
+        sparse (boolean): True if the regrets and policies of an infoset only cover the actions that have been legal
+                          (or abstracted) at it, see poker_env.infoset_table.SparseInfosetTable
 
     '''
-    def __init__(self, env):
+    def __init__(self, env, sparse=False):
         '''
         Initialize the random agent
 
         Args:
             env (Env): Env instance for training agent
+            sparse (boolean): store the regrets and policies sparsely. The vectors of an infoset take memory of
+                              the legal actions instead of the whole action space, which is much smaller in
+                              deep-stack games.
         '''
         super().__init__(agent_type='CFRAgent')
         if isinstance(env, Env):
@@ -30,20 +43,35 @@ class CFRAgent(Agent):
         self.__regrets = collections.defaultdict(np.array)
         self.__action_space = env.get_action_space()
         self.__abstract_action_space = [_ for _ in AbstractAction]
+        self.sparse = sparse
+        self.__table = SparseInfosetTable(3) if sparse else None
         self.iterations = 0
 
     @property
     def policy(self):
+        if self.sparse:
+            return self.__table.field_view(POLICY, self.action_num)
         return self.__policy
 
     @property
     def average_policy(self):
+        if self.sparse:
+            return self.__table.field_view(AVERAGE_POLICY, self.action_num)
         return self.__average_policy
 
     @property
     def regrets(self):
+        if self.sparse:
+            return self.__table.field_view(REGRET, self.action_num)
         return self.__regrets
 
+    @property
+    def table(self):
+        '''
+        The sparse infoset table, None if the agent is not sparse
+        '''
+        return self.__table
+
     @property
     def action_num(self):
         return len(self.__action_space)
@@ -80,29 +108,29 @@ class CFRAgent(Agent):
 
         current_player = self.env.get_player_id()
 
-        action_utilities = {}
         state_utility = np.zeros(self.env.player_num)
 
         state = self.env.get_state()
         encode_state = self.encode_state(state)
         legal_actions = self.encode_action(state)
         # Self-play: All player share the same policy, along with the same action probs
-        action_probs = self.get_action_probs(
-            policy=self.policy,
+        action_probs = self.get_legal_action_probs(
+            field=POLICY,
             state=encode_state,
             legal_actions=legal_actions,
             length=self.abs_action_num
             if state.need_action_abstraction() else 0)
+        action_utilities = np.empty((len(legal_actions), self.env.player_num))
         # traverse every legal action
-        for action in legal_actions:
-            action_prob = action_probs[action]
+        for i, action in enumerate(legal_actions):
+            action_prob = action_probs[i]
             # calculate the reach probability of the next state
             new_probs = probs.copy()
             new_probs[current_player] *= action_prob
             # keep traversing the child state
             self.env.step(self.decode_action(action, self.env.get_state()))
             action_utility = self.traverse_tree(new_probs, player_id)
-            action_utilities[action] = action_utility
+            action_utilities[i] = action_utility
             # state utility is the expectation of action utility
             state_utility += action_prob * action_utility
             self.env.step_back()
@@ -115,24 +143,39 @@ class CFRAgent(Agent):
         counterfactual_prob = np.prod(probs) / player_prob
         player_state_utility = state_utility[current_player]
 
-        if encode_state not in self.regrets:
-            self.regrets[encode_state] = np.zeros(self.action_num)
-        if encode_state not in self.average_policy:
-            self.average_policy[encode_state] = np.zeros(self.action_num)
-        for action in legal_actions:
-            action_prob = action_probs[action]
-            regret = counterfactual_prob * (
-                action_utilities[action][current_player] -
-                player_state_utility)
-            self.regrets[encode_state][action] += regret
-            self.average_policy[encode_state][
-                action] += self.iterations * player_prob * action_prob
+        regrets = counterfactual_prob * (action_utilities[:, current_player] - player_state_utility)
+        policy_weights = self.iterations * player_prob * action_probs
+        if self.sparse:
+            # The block of the infoset may have moved while traversing the children
+            slots = self.__table.get_slots(encode_state, legal_actions)
+            self.__table.data[REGRET, slots] += regrets
+            self.__table.data[AVERAGE_POLICY, slots] += policy_weights
+        else:
+            if encode_state not in self.regrets:
+                self.regrets[encode_state] = np.zeros(self.action_num)
+            if encode_state not in self.average_policy:
+                self.average_policy[encode_state] = np.zeros(self.action_num)
+            self.regrets[encode_state][legal_actions] += regrets
+            self.average_policy[encode_state][legal_actions] += policy_weights
         return state_utility
 
     def update_policy(self):
         '''
         Update policy based on the current regrets
         '''
+        if self.sparse:
+            for encode_state in self.__table:
+                block = self.__table.get_block(encode_state)
+                positive_regret = np.maximum(block[REGRET], 0)
+                positive_regret_sum = np.sum(positive_regret)
+                if positive_regret_sum > 0:
+                    block[POLICY] = positive_regret / positive_regret_sum
+                    # Actions that become legal later have no regret
+                    self.__table.set_fill(encode_state, (0, 0, 0))
+                else:
+                    block[POLICY] = 1 / block.shape[1]
+                    self.__table.set_fill(encode_state, (0, 0, 1 / block.shape[1]))
+            return
         for encode_state, regret in self.regrets.items():
             positive_regret_sum = np.sum(np.maximum(regret, 0))
             if positive_regret_sum > 0:
@@ -171,20 +214,48 @@ class CFRAgent(Agent):
             legal_probs /= np.sum(legal_probs)
         return legal_probs
 
+    def get_legal_action_probs(self, field, state, legal_actions, length=0):
+        '''
+        Get the probabilities of the legal actions of the current state.
+
+        Args:
+            field (int): POLICY or AVERAGE_POLICY
+            state (int): the encoded state
+            legal_actions (list): indices of legal actions
+            [optional] length (int): length of the action space of the state. Default is the length of env action space
+
+        Returns:
+            (numpy.ndarray): the probability of each legal action
+        '''
+        if not self.sparse:
+            policy = self.policy if field == POLICY else self.average_policy
+            return self.get_action_probs(policy, state, legal_actions, length)[legal_actions]
+        action_length = length if length != 0 else self.action_num
+        slots = self.__table.get_slots(state, legal_actions, fill=(0, 0, 1.0 / action_length))
+        legal_probs = self.__table.data[field, slots]
+        # Normalization
+        if np.sum(legal_probs) == 0:
+            legal_probs[:] = 1 / len(legal_actions)
+        else:
+            legal_probs /= np.sum(legal_probs)
+        return legal_probs
+
     def encode_state(self, state):
         '''
-        Conduct infomation abstraction and Encode observable state to specific string.
+        Conduct infomation abstraction and Encode observable state to an integer.
 
         Args:
             state (PokerState): the state of the game
 
         Returns:
-            (str): represent the information of the state
+            (int): represent the information of the state. It is the bucket of the hand (with the betting round)
+                   if the bucket table is built, otherwise the index of the suit isomorphic hand.
         '''
-        lossless_info = state.get_lossless_abstraction()
-        # TODO: lossy information abstraction
-        abstract_info = ''.join(lossless_info)
-        return abstract_info
+        hand_index = state.get_hand_index()
+        bucket = get_bucket(hand_index)
+        if bucket is None:
+            return hand_index
+        return state.get_bet_round() << 16 | bucket
 
     def encode_action(self, state):
         '''
@@ -200,23 +271,29 @@ class CFRAgent(Agent):
         legal_actions = state.legal_actions
 
         if not state.need_action_abstraction():
-            for action in legal_actions:
-                encode_actions.append(self.__action_space.index(action))
+            if legal_actions.fold:
+                encode_actions.append(self.env.get_action_index(FOLD_ACTION))
+            if legal_actions.check:
+                encode_actions.append(self.env.get_action_index(CHECK_ACTION))
+            if legal_actions.call:
+                encode_actions.append(self.env.get_action_index(CALL_ACTION))
+            # Raise actions are consecutive in the action space
+            if legal_actions.raise_num > 0:
+                min_raise_id = self.env.get_action_index(raise_action(legal_actions.min_raise))
+                encode_actions.extend(range(min_raise_id, min_raise_id + legal_actions.raise_num))
+            if legal_actions.all_in:
+                encode_actions.append(self.env.get_action_index(ALL_IN_ACTION))
         else:
             total_pot = sum(state.pot)
-            max_raise = 0
-            for action in legal_actions:
-                if action == 'fold':
-                    encode_actions.append(AbstractAction.FOLD.value)
-                elif action == 'check':
-                    encode_actions.append(AbstractAction.CHECK.value)
-                elif action == 'call':
-                    encode_actions.append(AbstractAction.CALL.value)
-                elif action == 'all-in':
-                    encode_actions.append(AbstractAction.ALL_IN.value)
-                elif 'raise' in action:
-                    raise_amount = int(action[5:])
-                    max_raise = max(max_raise, raise_amount)
+            max_raise = legal_actions.max_raise if legal_actions.raise_num > 0 else 0
+            if legal_actions.fold:
+                encode_actions.append(AbstractAction.FOLD.value)
+            if legal_actions.check:
+                encode_actions.append(AbstractAction.CHECK.value)
+            if legal_actions.call:
+                encode_actions.append(AbstractAction.CALL.value)
+            if legal_actions.all_in:
+                encode_actions.append(AbstractAction.ALL_IN.value)
             if max_raise > 0.5 * total_pot:
                 encode_actions.append(AbstractAction.RAISE_HALF_POT.value)
             if max_raise > total_pot:
@@ -235,12 +312,12 @@ class CFRAgent(Agent):
             state (PokerState): current state
 
         Returns:
-            (str): legal action string for the state
+            (int): the code of the legal action for the state
         '''
         if state.need_action_abstraction():
             return self.__abstract_action_space[action].translate_from(state)
         else:
-            return self.__action_space[action]
+            return self.env.get_action_from_index(action)
 
     def step(self, state):
         '''
@@ -250,15 +327,10 @@ class CFRAgent(Agent):
             state (PokerState): the current state
 
         Returns:
-            action (str): random action based on the action probability vector
+            action (int): the code of the random action based on the action probability vector
         '''
-        action_probs = self.get_action_probs(
-            policy=self.policy,
-            state=self.encode_state(state),
-            legal_actions=self.encode_action(state),
-            length=self.abs_action_num
-            if state.need_action_abstraction() else 0)
-        action = np.random.choice(len(action_probs), p=action_probs)
+        legal_actions, action_probs = self.__get_sorted_legal_action_probs(POLICY, state)
+        action = legal_actions[np.random.choice(len(action_probs), p=action_probs)]
         return self.decode_action(action, state)
 
     def eval_step(self, state):
@@ -269,13 +341,22 @@ class CFRAgent(Agent):
             state (PokerState): the current state
 
         Returns:
-            action (str): best action based on policy
+            action (int): the code of the best action based on policy
         '''
-        action_probs = self.get_action_probs(
-            policy=self.average_policy,
+        legal_actions, action_probs = self.__get_sorted_legal_action_probs(AVERAGE_POLICY, state)
+        action = legal_actions[np.argmax(action_probs)]
+        return self.decode_action(action, state)
+
+    def __get_sorted_legal_action_probs(self, field, state):
+        '''
+        Get the legal actions of a state in the order of the action space, and their probabilities.
+        '''
+        legal_actions = self.encode_action(state)
+        action_probs = self.get_legal_action_probs(
+            field=field,
             state=self.encode_state(state),
-            legal_actions=self.encode_action(state),
+            legal_actions=legal_actions,
             length=self.abs_action_num
             if state.need_action_abstraction() else 0)
-        action = np.argmax(action_probs)
-        return self.decode_action(action, state)
+        order = np.argsort(legal_actions)
+        return np.asarray(legal_actions)[order], action_probs[order]
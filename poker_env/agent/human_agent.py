@@ -53,17 +53,13 @@ class HumanAgent(Agent):
 
         # Input action
         legal_actions = state.legal_actions
-        print_actions = []
-        min_raise = sum(state.pot)
-        max_raise = 0
-        for action in legal_actions:
-            if 'raise' in action:
-                if 'raise' not in print_actions:
-                    print_actions.append('raise')
-                max_raise = max(max_raise, int(action[5:]))
-                min_raise = min(min_raise, int(action[5:]))
-            else:
-                print_actions.append(action)
+        print_actions = [action for action in ('fold', 'check', 'call') if getattr(legal_actions, action)]
+        if legal_actions.raise_num > 0:
+            print_actions.append('raise')
+        if legal_actions.all_in:
+            print_actions.append('all-in')
+        min_raise = legal_actions.min_raise
+        max_raise = legal_actions.max_raise
 
         if self._need_hint:
             print(
@@ -24,9 +24,11 @@ class RandomAgent(Agent):
             state (PokerState): the current state
 
         Returns:
-            action (str): the action predicted (randomly chosen) by the random agent
+            action (int): the code of the action predicted (randomly chosen) by the random agent
         '''
-        return np.random.choice(state.legal_actions)
+        legal_actions = state.legal_actions
+        # Index the descriptor instead of np.random.choice, which would create every raise action
+        return legal_actions.get_action(np.random.randint(len(legal_actions)))
 
     def eval_step(self, state):
         '''
@@ -37,6 +39,6 @@ class RandomAgent(Agent):
             state (PokerState): the current state
 
         Returns:
-            action (str): the action predicted (randomly chosen) by the random agent
+            action (int): the code of the action predicted (randomly chosen) by the random agent
         '''
         return self.step(state)
@@ -0,0 +1,347 @@
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+from poker_env.env import NoLimitTexasHoldemEnv as Env
+from poker_env.game import NoLimitTexasHoldemGame as Game
+from poker_env.agent.random_agent import RandomAgent
+from poker_env.agent.cfr_agent import CFRAgent
+from poker_env.evaluator import get_tables, evaluate_hand, evaluate_batch, load_rank_table
+from poker_env.utils import compare_all_hands
+
+
+# Metrics ending with these suffixes are better when lower, the others (rates) are better when higher.
+# Metrics ending with '_num' are counts describing the workload and are not compared.
+LOWER_IS_BETTER = ('_bytes',)
+# Seat numbers and stacks (in big blinds) of the env.run benchmarks
+ENV_RUN_PLAYERS = (2, 6, 9)
+ENV_RUN_STACKS = (20, 100, 500)
+
+
+def _seed(seed):
+    '''
+    Seed the global generators that agents draw from
+    '''
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def _play_random(game):
+    '''
+    Play random legal actions until the game is over, and return the actions.
+    '''
+    actions = []
+    while not game.is_over():
+        legal_actions = game.get_legal_actions()
+        action = legal_actions.get_action(np.random.randint(len(legal_actions)))
+        game.step(action)
+        actions.append(action)
+    return actions
+
+
+def benchmark_evaluator(hand_num=20000, batch_hand_num=200000, seed=0):
+    '''
+    Measure the speed of evaluate_hand and evaluate_batch on random seven-card hands.
+
+    Returns:
+        (dict): evaluations per second of each
+    '''
+    get_tables()
+    rng = np.random.default_rng(seed)
+    hands = rng.permuted(np.tile(np.arange(52), (batch_hand_num, 1)), axis=1)[:, :7]
+    single_hands = hands[:hand_num].tolist()
+    evaluate_batch(hands[:1000])
+    start = time.perf_counter()
+    for hand in single_hands:
+        evaluate_hand(hand)
+    single_duration = time.perf_counter() - start
+    start = time.perf_counter()
+    evaluate_batch(hands)
+    batch_duration = time.perf_counter() - start
+    return {'evaluate_hand_per_sec': hand_num / single_duration,
+            'evaluate_batch_per_sec': batch_hand_num / batch_duration}
+
+
+def benchmark_judger(game_num=2000, num_players=6, seed=0):
+    '''
+    Measure the settlement rate of NoLimitTexasHoldemJudger.judge_game and compare_all_hands
+    on the final states of random games.
+
+    Returns:
+        (dict): settlements per second of each
+    '''
+    _seed(seed)
+    game = Game(num_players=num_players, seed=seed)
+    settlements = []
+    for _ in range(game_num):
+        game.init_game()
+        _play_random(game)
+        # The players of the game are reset in place by the next init_game
+        final = game.clone()
+        hands = [p.hand + final.public_cards if p.status != 'folded' else None for p in final.players]
+        settlements.append((final.players, hands, [None if hand is None else [card.id for card in hand]
+                                                   for hand in hands]))
+    judger = game.judger
+    start = time.perf_counter()
+    for players, hands, _ in settlements:
+        judger.judge_game(players, hands)
+    judge_duration = time.perf_counter() - start
+    start = time.perf_counter()
+    for _, _, card_ids in settlements:
+        compare_all_hands(card_ids)
+    compare_duration = time.perf_counter() - start
+    return {'judge_game_per_sec': game_num / judge_duration,
+            'compare_all_hands_per_sec': game_num / compare_duration}
+
+
+def benchmark_env_run(num_players=2, game_num=20000, init_chips=100, seed=0):
+    '''
+    Measure the speed of env.run with RandomAgents.
+
+    Args:
+        num_players (int): the number of players
+        game_num (int): the number of games to run
+        init_chips (int): chips that each player holds when game starts
+        seed (int): the seed of the env and the agents
+
+    Returns:
+        (dict): hands per second and steps (decisions) per second
+    '''
+    # Load the hand evaluator tables before timing
+    get_tables()
+    np.random.seed(seed)
+    env = Env(num_players=num_players, init_chips=init_chips, seed=seed)
+    env.set_agents([RandomAgent() for _ in range(num_players)])
+    step_num = 0
+    start = time.perf_counter()
+    for _ in range(game_num):
+        trajectories, _ = env.run()
+        step_num += sum(len(trajectory) for trajectory in trajectories) // 2
+    duration = time.perf_counter() - start
+    return {'hands_per_sec': game_num / duration, 'steps_per_sec': step_num / duration}
+
+
+def benchmark_step_back(game_num=2000, num_players=6, seed=0):
+    '''
+    Measure the speed of Game.step and Game.step_back. Each random game is replayed forward
+    and then stepped back to the first state, only these calls are timed.
+
+    Returns:
+        (dict): operations per second of each
+    '''
+    _seed(seed)
+    game = Game(allow_step_back=True, num_players=num_players, seed=seed)
+    step_num = 0
+    step_duration = step_back_duration = 0.0
+    for _ in range(game_num):
+        game.init_game()
+        actions = _play_random(game)
+        while game.step_back():
+            pass
+        start = time.perf_counter()
+        for action in actions:
+            game.step(action)
+        step_duration += time.perf_counter() - start
+        start = time.perf_counter()
+        while game.step_back():
+            pass
+        step_back_duration += time.perf_counter() - start
+        step_num += len(actions)
+    return {'step_per_sec': step_num / step_duration, 'step_back_per_sec': step_num / step_back_duration}
+
+
+def benchmark_abstraction(game_num=2000, num_players=6, seed=0):
+    '''
+    Measure the speed of PokerState.get_lossless_abstraction on the states of random games.
+
+    Returns:
+        (dict): calls per second
+    '''
+    _seed(seed)
+    game = Game(num_players=num_players, seed=seed)
+    states = []
+    for _ in range(game_num):
+        state, _ = game.init_game()
+        while not game.is_over():
+            states.append(state)
+            legal_actions = state.legal_actions
+            state, _ = game.step(legal_actions.get_action(np.random.randint(len(legal_actions))))
+    start = time.perf_counter()
+    for state in states:
+        state.get_lossless_abstraction()
+    return {'get_lossless_abstraction_per_sec': len(states) / (time.perf_counter() - start)}
+
+
+def benchmark_cfr(iteration_num=5, num_players=2, init_chips=10, sparse=False, seed=0):
+    '''
+    Measure the speed of CFRAgent.train, and the peak memory traced by tracemalloc in a second run
+    with the same seed (tracing slows the training down).
+
+    Returns:
+        (dict): iterations per second, peak traced bytes, and the number of infosets
+    '''
+    def train(iteration_num):
+        _seed(seed)
+        env = Env(allow_step_back=True, num_players=num_players, init_chips=init_chips, seed=seed)
+        agent = CFRAgent(env=env, sparse=sparse)
+        start = time.perf_counter()
+        for _ in range(iteration_num):
+            agent.train()
+        return agent, time.perf_counter() - start
+
+    agent, duration = train(iteration_num)
+    tracemalloc.start()
+    try:
+        train(iteration_num)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'train_iterations_per_sec': iteration_num / duration, 'peak_memory_bytes': peak,
+            'infoset_num': len(agent.regrets)}
+
+
+def get_benchmarks(scale=1.0):
+    '''
+    Get the benchmarks of the suite.
+
+    Args:
+        scale (float): the scale of the workloads, Eg: 0.1 for a quick run
+
+    Returns:
+        (dict): name -> function that runs the benchmark and returns its metrics
+    '''
+    def size(n):
+        return max(int(n * scale), 1)
+
+    benchmarks = {
+        'evaluator': lambda: benchmark_evaluator(size(20000), size(200000)),
+        'judger': lambda: benchmark_judger(size(2000)),
+    }
+    for num_players in ENV_RUN_PLAYERS:
+        for stack in ENV_RUN_STACKS:
+            benchmarks['env_run/{}p_{}bb'.format(num_players, stack)] = \
+                lambda num_players=num_players, stack=stack: benchmark_env_run(
+                    num_players, size(20000 // num_players), init_chips=stack * 2)
+    benchmarks['step_back'] = lambda: benchmark_step_back(size(2000))
+    benchmarks['abstraction'] = lambda: benchmark_abstraction(size(2000))
+    benchmarks['cfr'] = lambda: benchmark_cfr(max(size(10), 2))
+    return benchmarks
+
+
+def is_lower_better(metric):
+    return metric.endswith(LOWER_IS_BETTER)
+
+
+def run_suite(names=None, repeat=3, scale=1.0, log=None):
+    '''
+    Run the benchmarks, each one is repeated and the best value of each metric is kept.
+
+    Args:
+        names (list): the names of the benchmarks to run, or prefixes of them (Eg: 'env_run' or 'env_run/6p'),
+                      default is all
+        repeat (int): the number of runs of each benchmark
+        scale (float): the scale of the workloads
+        log (file): optional, where the progress is printed
+
+    Returns:
+        (dict): the report, with the environment under 'meta' and the metrics of each benchmark under 'results'
+    '''
+    results = {}
+    for name, benchmark in get_benchmarks(scale).items():
+        if names and not any(name.startswith(selected) for selected in names):
+            continue
+        metrics = {}
+        for _ in range(repeat):
+            for metric, value in benchmark().items():
+                if metric not in metrics:
+                    metrics[metric] = value
+                elif is_lower_better(metric):
+                    metrics[metric] = min(metrics[metric], value)
+                else:
+                    metrics[metric] = max(metrics[metric], value)
+        results[name] = metrics
+        if log is not None:
+            print(name, ' '.join('{}={:.6g}'.format(metric, value) for metric, value in metrics.items()), file=log)
+    meta = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'platform': platform.platform(), 'processor': platform.processor(),
+            'rank_table': load_rank_table() is not False, 'repeat': repeat, 'scale': scale}
+    return {'meta': meta, 'results': results}
+
+
+def compare_reports(baseline, current, tolerance=0.1):
+    '''
+    Compare the metrics of two reports.
+
+    Args:
+        baseline (dict): the report of the baseline
+        current (dict): the report to check
+        tolerance (float): the relative change that is not a regression, Eg: 0.1 means 10% slower is accepted
+
+    Returns:
+        (list): (benchmark, metric, baseline value, current value, relative change, regressed) of each metric in both
+                reports. The relative change is positive when the metric gets better.
+    '''
+    rows = []
+    for name, metrics in current['results'].items():
+        for metric, value in metrics.items():
+            base_value = baseline['results'].get(name, {}).get(metric)
+            if base_value is None or metric.endswith('_num'):
+                continue
+            if base_value == 0:
+                change = 0.0
+            elif is_lower_better(metric):
+                change = (base_value - value) / base_value
+            else:
+                change = (value - base_value) / base_value
+            rows.append((name, metric, base_value, value, change, change < -tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of poker_env")
+    subparsers = parser.add_subparsers(dest='command')
+    run_parser = subparsers.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('-o', '--output', help="the JSON file of the report, default is stdout")
+    run_parser.add_argument('-b', '--benchmarks', nargs='+', help="names of the benchmarks, default is all")
+    run_parser.add_argument('-r', '--repeat', type=int, default=3, help="runs of each benchmark, the best is kept")
+    run_parser.add_argument('-s', '--scale', type=float, default=1.0, help="scale of the workloads")
+    run_parser.add_argument('--baseline', help="the JSON report to compare with")
+    run_parser.add_argument('-t', '--tolerance', type=float, default=0.1, help="accepted relative slowdown")
+    compare_parser = subparsers.add_parser('compare', help="compare two JSON reports")
+    compare_parser.add_argument('baseline', help="the JSON report of the baseline")
+    compare_parser.add_argument('current', help="the JSON report to check")
+    compare_parser.add_argument('-t', '--tolerance', type=float, default=0.1, help="accepted relative slowdown")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = run_suite(args.benchmarks, args.repeat, args.scale, log=sys.stderr)
+        if args.output is None:
+            print(json.dumps(report, indent=2))
+        else:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+        if args.baseline is None:
+            return 0
+        current = report
+    elif args.command == 'compare':
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        parser.print_help()
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressed = False
+    for name, metric, base_value, value, change, is_regression in compare_reports(baseline, current, args.tolerance):
+        regressed |= is_regression
+        print("{:<24} {:<34} {:>14.6g} {:>14.6g} {:>+8.1%}{}".format(
+            name, metric, base_value, value, change, '  REGRESSION' if is_regression else ''), file=sys.stderr)
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
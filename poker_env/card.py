@@ -31,6 +31,11 @@ class LookUpStr(Enum):
         return self.__value.index(char)
 
 
+# Cached look-up strings, hot paths use them instead of going through the Enum
+RANK_STR = LookUpStr.RANK.value
+SUIT_STR = LookUpStr.SUIT.value
+
+
 class Card():
     '''
     Card stores the suit and rank of a single card
@@ -38,25 +43,57 @@ class Card():
     Note:
         The suit variable in a standard card game should be one of [s, c, d, h] meaning [Spade, Clubs, Diamond, Heart]
         Similarly the rank variable should be one of [A, 2, 3, 4, 5, 6, 7, 8, 9, T, J, Q, K]
+
+        There are only 52 Card objects: Card(suit, rank) always returns the shared instance of the card,
+        so cards can be compared by identity. A card is immutable.
+
+    Attributes:
+        suit (str): suit of the card
+        rank (str): rank of the card
+        suit_index (int): index of the suit in LookUpStr.SUIT
+        rank_index (int): index of the rank in LookUpStr.RANK
+        id (int): suit_index * 13 + rank_index, ranging in [0, 52)
+        mask (int): 1 << id, the bit of the card in a 52-bit card set
+        string (str): the combination of rank and suit. Eg: 'As'
     '''
+    __slots__ = ('suit', 'rank', 'suit_index', 'rank_index', 'id', 'mask', 'string')
+    __cards = {}
 
-    def __init__(self, suit, rank):
+    def __new__(cls, suit, rank):
         '''
-        Initialize the suit and rank of a card
+        Get the card of the suit and rank
         Args:
             suit: string, suit of the card, should be one of valid_suit
             rank: string, rank of the card, should be one of valid_rank
         '''
-        self.__suit = suit
-        self.__rank = rank
+        card = cls.__cards.get((suit, rank))
+        if card is None:
+            if len(suit) != 1 or suit not in SUIT_STR or len(rank) != 1 or rank not in RANK_STR:
+                raise ValueError("Invalid card: suit {}, rank {}.".format(suit, rank))
+            card = super().__new__(cls)
+            suit_index = SUIT_STR.index(suit)
+            rank_index = RANK_STR.index(rank)
+            card_id = suit_index * len(RANK_STR) + rank_index
+            for name, value in zip(cls.__slots__, (suit, rank, suit_index, rank_index, card_id, 1 << card_id,
+                                                   rank + suit)):
+                object.__setattr__(card, name, value)
+            cls.__cards[(suit, rank)] = card
+        return card
 
-    @property
-    def suit(self):
-        return self.__suit
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable.")
 
-    @property
-    def rank(self):
-        return self.__rank
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (Card, (self.suit, self.rank))
+
+    def __repr__(self):
+        return self.string
 
     def get_index(self):
         '''
@@ -64,4 +101,12 @@ class Card():
         Returns:
             string: the combination of rank and suit of a card. Eg: 1s, 2h, Ad, BJ, RJ...
         '''
-        return self.rank + self.suit
+        return self.string
+
+    def get_id(self):
+        '''
+        Get integer id of a card.
+        Returns:
+            int: suit index * 13 + rank index, ranging in [0, 52). Eg: 2s -> 0, As -> 12, 2c -> 13...
+        '''
+        return self.id
@@ -1,23 +1,66 @@
-import random
-from poker_env.utils import init_52_deck
+import numpy as np
+from poker_env.utils import _DECK
+
+
+# Number of shuffled decks generated at once
+DECK_BATCH_SIZE = 4096
 
 
 class NoLimitTexasHoldemDealer:
     '''
     The Dealer class for No Limit Texas Hold'em Poker
+
+    Shuffled decks are generated in bulk by the random generator of the dealer, as an int8 matrix of card ids with
+    one permutation in each row. Each shuffle takes the next row, and cards are dealt from the row in order.
+    The first batch after seeding is small and the batches double up to batch_size, so reseeding is cheap.
     '''
-    def __init__(self):
+    def __init__(self, rng=None, batch_size=DECK_BATCH_SIZE):
         '''
         Initialize a dealer class.
+
+        Args:
+            rng (numpy.random.Generator or int or SeedSequence): the random generator of the dealer, or its seed
+            batch_size (int): the number of shuffled decks generated at once
         '''
-        self.__deck = init_52_deck()
+        self.batch_size = batch_size
+        self.seed(rng)
         self.shuffle()
 
+    def seed(self, rng=None):
+        '''
+        Reset the random generator of the dealer, the generated decks are dropped.
+
+        Args:
+            rng (numpy.random.Generator or int or SeedSequence): the random generator, or its seed
+        '''
+        self.rng = np.random.default_rng(rng)
+        self.__decks = np.empty((0, len(_DECK)), dtype=np.int8)
+        self.__deck_index = 0
+
+    def clone(self):
+        '''
+        Copy the dealer without shuffling. The copy owns its position in the deck,
+        and shares the random generator and the generated decks.
+        Returns:
+            (NoLimitTexasHoldemDealer): the copy
+        '''
+        dealer = NoLimitTexasHoldemDealer.__new__(NoLimitTexasHoldemDealer)
+        dealer.__dict__.update(self.__dict__)
+        return dealer
+
     def shuffle(self):
         '''
-        Shuffle the deck.
+        Shuffle the deck, by taking the next pre-shuffled deck.
         '''
-        random.shuffle(self.__deck)
+        if self.__deck_index == len(self.__decks):
+            deck_num = min(max(2 * len(self.__decks), 16), self.batch_size)
+            decks = np.tile(np.arange(len(_DECK), dtype=np.int8), (deck_num, 1))
+            self.__decks = self.rng.permuted(decks, axis=1)
+            self.__deck_index = 0
+        # Card ids of the deck, never changed after the shuffle so that copies can share it
+        self.__deck = self.__decks[self.__deck_index].tolist()
+        self.__deck_index += 1
+        self.__pointer = 0
 
     def deal_card(self):
         '''
@@ -25,4 +68,22 @@ class NoLimitTexasHoldemDealer:
         Returns:
             (Card): The drawn card from the deck
         '''
-        return self.__deck.pop()
+        card = _DECK[self.__deck[self.__pointer]]
+        self.__pointer += 1
+        return card
+
+    def put_back(self, cards):
+        '''
+        Put the last dealt cards back on the top of the deck, so that they will be dealt again in the same order.
+        Args:
+            cards (list): the cards in the order they were dealt
+        '''
+        self.__pointer -= len(cards)
+
+    def get_remained_cards(self):
+        '''
+        Get the cards that have not been dealt.
+        Returns:
+            (list): Card objects in the order they will be dealt
+        '''
+        return [_DECK[card_id] for card_id in self.__deck[self.__pointer:]]
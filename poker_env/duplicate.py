@@ -0,0 +1,162 @@
+import time
+import random
+import collections
+import multiprocessing
+from statistics import NormalDist
+import numpy as np
+from poker_env.env import NoLimitTexasHoldemEnv as Env
+
+
+# The result of DuplicateEvaluator.evaluate, values are indexed by the agents of the line-up
+# deal_num (int): the number of deals, each deal is played once with each rotation of the seats
+# hand_num (int): the number of hands, deal_num * num_players
+# mbb_per_hand (numpy.ndarray): shape (num_players,), the mean payoff of each agent in milli big blinds per hand
+# confidence_interval (numpy.ndarray): shape (num_players,), the half width of the confidence interval of mbb_per_hand
+# hands_per_sec (float): the number of hands played per second
+EvaluationResult = collections.namedtuple('EvaluationResult', ['deal_num', 'hand_num', 'mbb_per_hand',
+                                                               'confidence_interval', 'hands_per_sec'])
+
+# The env and the line-up of a worker process
+_worker = None
+
+
+def _init_worker(agent_fn, env_kwargs):
+    global _worker
+    env = Env(**env_kwargs)
+    _worker = (env, agent_fn())
+
+
+def _play_block(entropy, block_id, deal_num):
+    '''
+    Play the deals of a block once for each rotation of the seats.
+
+    Returns:
+        (numpy.ndarray): shape (deal_num, num_players), the payoff of each agent of the line-up in each deal,
+                         averaged over the rotations
+    '''
+    env, agents = _worker
+    player_num = env.player_num
+    # Every rotation replays the same cards and buttons from the seed of the block,
+    # and the agents draw the same random numbers
+    seed = np.random.SeedSequence(entropy, spawn_key=(block_id,))
+    numpy_seed, python_seed = seed.generate_state(2)
+    payoffs = np.zeros((deal_num, player_num))
+    for rotation in range(player_num):
+        # The agent i of the line-up sits at seat (i + rotation) % player_num
+        seats = (np.arange(player_num) + rotation) % player_num
+        env.set_agents([agents[(seat - rotation) % player_num] for seat in range(player_num)])
+        env.seed(seed)
+        np.random.seed(numpy_seed)
+        random.seed(int(python_seed))
+        for deal in range(deal_num):
+            _, deal_payoffs = env.run(is_training=False)
+            payoffs[deal] += np.asarray(deal_payoffs)[seats]
+    return payoffs / player_num
+
+
+class DuplicateEvaluator:
+    '''
+    Evaluate a line-up of agents with duplicate poker in a pool of worker processes.
+
+    Deals (the cards and the button of a hand) are generated from the seed of their block, and each block of deals
+    is replayed once for each rotation of the seats, so every agent plays every seat with the same cards. The payoff
+    of an agent in a deal is averaged over the rotations, which cancels most of the luck of the cards, and the
+    confidence intervals are computed from these per-deal payoffs.
+
+    Agents are created in the workers by agent_fn(), which must be picklable (Eg: a module level function).
+
+    Attributes:
+        worker_num (int): the number of worker processes
+        big_blind (int): the big blind of the env, the unit of mbb
+    '''
+    def __init__(self, agent_fn, worker_num=None, env_kwargs=None, deals_per_block=256, seed=0):
+        '''
+        Start the worker processes.
+
+        Args:
+            agent_fn (callable): agent_fn() returns the line-up, a list of an agent for each player
+            worker_num (int): the number of worker processes, default is the number of CPUs
+            env_kwargs (dict): the arguments of NoLimitTexasHoldemEnv
+            deals_per_block (int): the number of deals of a task of the workers
+            seed (int): the seed of the deals, the same seed replays the same deals
+        '''
+        self.worker_num = multiprocessing.cpu_count() if worker_num is None else worker_num
+        env_kwargs = {} if env_kwargs is None else dict(env_kwargs)
+        env = Env(**env_kwargs)
+        self.__player_num = env.player_num
+        self.big_blind = env_kwargs.get('big_blind', 2)
+        self.__deals_per_block = deals_per_block
+        self.__entropy = np.random.SeedSequence(seed).entropy
+        self.__pool = multiprocessing.Pool(self.worker_num, initializer=_init_worker,
+                                           initargs=(agent_fn, env_kwargs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def evaluate(self, hand_num, target_interval=None, confidence=0.95, min_hand_num=None):
+        '''
+        Play duplicate deals until hand_num hands are played, or until the confidence interval of every agent is
+        narrower than target_interval. Deals are taken from the blocks 0, 1, 2, ... of the seed, so two evaluations
+        with the same seed play the same deals.
+
+        Args:
+            hand_num (int): the max number of hands
+            target_interval (float): optional, the half width of the confidence intervals (in mbb/hand) to stop at
+            confidence (float): the confidence level of the intervals
+            min_hand_num (int): the number of hands before stopping early, default is 10 blocks
+
+        Returns:
+            (EvaluationResult): the result
+        '''
+        hands_per_block = self.__deals_per_block * self.__player_num
+        block_num = max(-(-hand_num // hands_per_block), 1)
+        if min_hand_num is None:
+            min_hand_num = 10 * hands_per_block
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        # Running sums of the per-deal payoffs and their squares
+        count = 0
+        total = np.zeros(self.__player_num)
+        total_square = np.zeros(self.__player_num)
+        pending = collections.deque()
+        next_block = 0
+        stopped = False
+        start = time.perf_counter()
+        while pending or (next_block < block_num and not stopped):
+            # Keep every worker busy with two blocks
+            while not stopped and next_block < block_num and len(pending) < 2 * self.worker_num:
+                pending.append(self.__pool.apply_async(_play_block,
+                                                       (self.__entropy, next_block, self.__deals_per_block)))
+                next_block += 1
+            payoffs = pending.popleft().get()
+            count += len(payoffs)
+            total += payoffs.sum(axis=0)
+            total_square += np.square(payoffs).sum(axis=0)
+            mean, interval = self.__get_interval(count, total, total_square, z)
+            if target_interval is not None and count * self.__player_num >= min_hand_num and \
+                    np.all(interval <= target_interval):
+                # Blocks in progress are still counted
+                stopped = True
+        duration = time.perf_counter() - start
+        mean, interval = self.__get_interval(count, total, total_square, z)
+        return EvaluationResult(deal_num=count, hand_num=count * self.__player_num, mbb_per_hand=mean,
+                                confidence_interval=interval,
+                                hands_per_sec=count * self.__player_num / duration)
+
+    def __get_interval(self, count, total, total_square, z):
+        '''
+        Get the mean and the half width of the confidence interval in mbb/hand.
+        '''
+        mean = total / count
+        variance = np.maximum(total_square / count - np.square(mean), 0) * count / max(count - 1, 1)
+        scale = 1000 / self.big_blind
+        return mean * scale, z * np.sqrt(variance / count) * scale
+
+    def close(self):
+        '''
+        Stop the worker processes.
+        '''
+        self.__pool.terminate()
+        self.__pool.join()
@@ -1,8 +1,10 @@
 import numpy as np
-import random
 
 from poker_env.game import NoLimitTexasHoldemGame as Game
 from poker_env.agent.base_agent import Agent
+from poker_env.action import to_action, action_to_str, get_action_space, get_action_index, get_action_from_index, \
+    get_legal_action_mask
+from poker_env.hand_history import render_events
 
 
 class NoLimitTexasHoldemEnv:
@@ -17,15 +19,26 @@ class NoLimitTexasHoldemEnv:
         init_chips (int or list): chips that each player holds when game starts. Int means that each player hold the same chips, while list means initializing each players' chips individually.
     '''
 
-    def __init__(self, allow_step_back=False, num_players=2, small_blind=1, big_blind=2, init_chips=100):
+    def __init__(self, allow_step_back=False, num_players=2, small_blind=1, big_blind=2, init_chips=100, seed=None,
+                 all_in_ev=False):
         '''
         Initialize the Nolimitholdem environment
+
+        Args:
+            seed (int or numpy.random.SeedSequence or numpy.random.Generator): the seed of the random generator
+                of the env, which deals the cards and places the button. Spawn a SeedSequence for each env to get
+                independent and reproducible streams in parallel workers.
+            all_in_ev (boolean): True to get the expected payoffs over the runouts of the public cards when the
+                betting is over before the river (Eg: all-in), instead of the payoffs of the dealt cards. It cuts the
+                variance of evaluations, see NoLimitTexasHoldemJudger.judge_all_in_ev.
         '''
         self.__game = Game(allow_step_back=allow_step_back,
                            num_players=num_players,
                            small_blind=small_blind,
                            big_blind=big_blind,
-                           init_chips=init_chips)
+                           init_chips=init_chips,
+                           seed=seed,
+                           all_in_ev=all_in_ev)
         self.__allow_step_back = allow_step_back
         self.__player_num = self.__game.get_player_num()
         self.__action_space = self.get_action_space()
@@ -56,6 +69,15 @@ class NoLimitTexasHoldemEnv:
         #     if isinstance(agent, Agent):
         #         print("id_{}:{}".format(i, agent.agent_type))
 
+    def seed(self, seed=None):
+        '''
+        Reset the random generator of the env.
+
+        Args:
+            seed (int or numpy.random.SeedSequence or numpy.random.Generator): the seed, or the generator itself
+        '''
+        self.__game.seed(seed)
+
     def init_game(self):
         '''
         Start a new game
@@ -73,7 +95,8 @@ class NoLimitTexasHoldemEnv:
         Step forward
 
         Args:
-            action (str): the action taken by the current player
+            action (int or str): the code of the action taken by the current player (see poker_env.action),
+                or its string
 
         Returns:
             (tuple): Tuple containing:
@@ -117,18 +140,19 @@ class NoLimitTexasHoldemEnv:
         Set the agents that will interact with the environment
 
         Args:
-            agents (list): List of Agent classes
+            agents (list): List of Agent classes, the agent of each seat. They replace the agents set before.
         '''
-        for index, agent in enumerate(agents):
+        if len(agents) != self.__player_num:
+            raise ValueError("Agents number should be equal to the player number")
+        for agent in agents:
             if not isinstance(agent, Agent):
                 raise TypeError("Agents must be subclasses of Agent class!")
+        self._has_human_agent = False
+        for index, agent in enumerate(agents):
             if agent.agent_type == 'HumanAgent':
                 self._has_human_agent = True
             agent.set_player_id(index)
-            self.__agents.append(agent)
-
-        if len(self.__agents) != self.__player_num:
-            raise ValueError("Agents number should be equal to the player number")
+        self.__agents = list(agents)
 
     def run(self, is_training=False, seed=None):
         '''
@@ -136,7 +160,8 @@ class NoLimitTexasHoldemEnv:
 
         Args:
             is_training (boolean): True if for training purpose.
-            seed (int): A seed for running the game.
+            seed (int): A seed for running the game. It resets the random generator of the env, and seeds the
+                global numpy generator that agents (Eg: RandomAgent) draw from.
 
         Returns:
             (tuple) Tuple containing:
@@ -144,8 +169,8 @@ class NoLimitTexasHoldemEnv:
                 (list): A list payoffs. Each entry corresponds to one player.
         '''
         if seed is not None:
+            self.seed(seed)
             np.random.seed(seed)
-            random.seed(seed)
 
         trajectories = [[] for _ in range(self.player_num)]
         state, player_id = self.init_game()
@@ -161,9 +186,9 @@ class NoLimitTexasHoldemEnv:
                 action = self.__agents[player_id].step(state)
             if self._has_human_agent:
                 if self.__agents[player_id].agent_type == 'HumanAgent':
-                    print("Human Player{} Choose {}".format(player_id, action))
+                    print("Human Player{} Choose {}".format(player_id, action_to_str(to_action(action))))
                 else:
-                    print("Computer Player{} Choose {}".format(player_id, action))
+                    print("Computer Player{} Choose {}".format(player_id, action_to_str(to_action(action))))
             # Save action
             trajectories[player_id].append(action)
             # Environment steps
@@ -209,7 +234,7 @@ class NoLimitTexasHoldemEnv:
         Get all leagal actions
 
         Returns:
-            encoded_action_list (list): return encoded legal action list (from str to int)
+            (LegalActions): the legal actions, it can be used as a list of action strings
         '''
         return self.__game.get_legal_actions()
 
@@ -220,16 +245,59 @@ class NoLimitTexasHoldemEnv:
         Returns:
             (list): each element (str) represent a possible action
         '''
-        min_raise = self.__game.big_blind
-        max_raise = self.__game.init_chips if isinstance(self.__game.init_chips, int) else max(self.__game.init_chips)
-        action_space = ['fold', 'check', 'call']
-        for i in range(min_raise, max_raise):
-            action_space.append('raise{}'.format(i))
-        action_space.append('all-in')
-        return action_space
+        return get_action_space(self.__game.big_blind, self.__game.init_chips)
+
+    def get_action_index(self, action):
+        '''
+        Get the index of an action in the action space in constant time.
+
+        Args:
+            action (int or str): the code of the action (see poker_env.action), or its string
+
+        Returns:
+            (int): the index in the action space
+        '''
+        return get_action_index(action, self.__game.big_blind, self.__game.init_chips)
 
-    def get_game_tree(self):
+    def get_action_from_index(self, index):
         '''
-        Return the action sequence of the game
+        Get the code of an action in the action space in constant time.
+
+        Args:
+            index (int): the index in the action space
+
+        Returns:
+            (int): the code of the action
+        '''
+        return get_action_from_index(index, self.__game.big_blind, self.__game.init_chips)
+
+    def get_legal_action_mask(self, legal_actions, out=None):
+        '''
+        Mark the legal actions in the action space.
+
+        Args:
+            legal_actions (LegalActions): the legal actions of a state
+            out (numpy.ndarray): optional, shape (len(action_space),), the mask to fill
+
+        Returns:
+            (numpy.ndarray): 1 for the legal actions, 0 otherwise
+        '''
+        return get_legal_action_mask(legal_actions, self.__game.big_blind, self.__game.init_chips, out)
+
+    def get_game_tree(self, to_string=True):
+        '''
+        Return the action sequence of the game, rendered from the events of the game
+
+        Args:
+            to_string (boolean): True to show the actions of players as strings, otherwise action codes
+        '''
+        return render_events(self.__game.events, to_string)
+
+    def get_hand_history(self):
+        '''
+        Return the events of the game, which can be saved by poker_env.hand_history.HandHistoryWriter
+
+        Returns:
+            (array): a copy of the int64 events
         '''
-        return self.__game.game_tree
+        return self.__game.events[:]
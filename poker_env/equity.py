@@ -0,0 +1,282 @@
+import itertools
+import functools
+import collections
+from math import comb
+import numpy as np
+from poker_env.evaluator import evaluate_batch, evaluate_board_batch, colex_combinations, CARD_STR_TO_ID
+
+
+# Number of cards in a deck
+CARD_NUM = 52
+
+# All the 1326 hole card pairs in colexicographic order, the index of pair (c0, c1) (c0 < c1) is C(c1, 2) + c0.
+# An opponent range is a vector of 1326 weights aligned with HOLE_PAIRS.
+HOLE_PAIRS = colex_combinations(CARD_NUM, 2).astype(np.intp)
+
+# _COMB[i][p] = C(p, i + 1)
+_COMB = np.array([[comb(p, i + 1) for p in range(CARD_NUM)] for i in range(7)], dtype=np.intp)
+
+# The equity of a hand
+# ehs (float): expected hand strength, the probability of winning (ties count half) against the opponent
+# ehs2 (float): the expectation of squared hand strength over all the runouts
+# histogram (numpy.ndarray): the probability histogram of hand strength over all the runouts
+Equity = collections.namedtuple('Equity', ['ehs', 'ehs2', 'histogram'])
+
+
+def get_histogram_vector(array, bins=50, range=(0, 1)):
+    '''
+    Get the probability histogram vector of a numpy array.
+    '''
+    histogram_vec = np.histogram(array, bins=bins, range=range)[0]
+    prob_vec = histogram_vec / np.sum(histogram_vec)
+    return prob_vec
+
+
+def get_pair_index(card0, card1):
+    '''
+    Get the index of a hole card pair in HOLE_PAIRS.
+
+    Args:
+        card0 (int or numpy.ndarray): card id
+        card1 (int or numpy.ndarray): another card id
+    Returns:
+        (int or numpy.ndarray): index of the pair
+    '''
+    low = np.minimum(card0, card1)
+    high = np.maximum(card0, card1)
+    return high * (high - 1) // 2 + low
+
+
+def to_card_ids(cards):
+    '''
+    Convert cards into integer card ids.
+
+    Args:
+        cards (list): Card objects, card index strings or card ids
+    Returns:
+        (list): card ids
+    '''
+    card_ids = []
+    for card in cards:
+        if isinstance(card, str):
+            card = CARD_STR_TO_ID[card]
+        elif not isinstance(card, (int, np.integer)):
+            card = card.id
+        card_ids.append(int(card))
+    return card_ids
+
+
+def _summarize(hand_strength, bins):
+    '''
+    Summarize hand strength of equally likely runouts into Equity.
+    '''
+    return Equity(ehs=float(np.mean(hand_strength)),
+                  ehs2=float(np.mean(hand_strength ** 2)),
+                  histogram=get_histogram_vector(hand_strength, bins=bins))
+
+
+def _colex_index(positions):
+    '''
+    Get the colexicographic index of sorted combinations.
+
+    Args:
+        positions (numpy.ndarray): shape (n, k), each row is sorted in ascending order
+    Returns:
+        (numpy.ndarray): shape (n,), index of each combination
+    '''
+    index = np.zeros(len(positions), dtype=np.intp)
+    for i in range(positions.shape[1]):
+        index += _COMB[i][positions[:, i]]
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def _get_card_set_splits(deck_size, runout_num):
+    '''
+    Enumerate the sets of (runout + opponent hand) cards and every way to split them.
+
+    Args:
+        deck_size (int): the number of unseen cards
+        runout_num (int): the number of public cards to come
+
+    Returns:
+        (tuple): Tuple containing:
+            (numpy.ndarray): shape (M, runout_num + 2), positions of the cards of each set in the unseen cards
+            (list): for each way to split the sets, a tuple of the runout indices and opponent hand indices
+    '''
+    card_sets = colex_combinations(deck_size, runout_num + 2).astype(np.intp)
+    splits = []
+    for runout_positions in itertools.combinations(range(runout_num + 2), runout_num):
+        hand_positions = [i for i in range(runout_num + 2) if i not in runout_positions]
+        splits.append((_colex_index(card_sets[:, list(runout_positions)]),
+                       _colex_index(card_sets[:, hand_positions])))
+    return card_sets, splits
+
+
+def exact_equity(hand_cards, public_cards, opponent_range=None, bins=50):
+    '''
+    Calculate the equity of a hand against one opponent by enumerating all runouts and opponent hands.
+
+    The opponent's 7 cards share the board, so the rank of each set of (runout + opponent hand) cards
+    is evaluated only once and reused by every way to split it into a runout and a hand.
+
+    All the hands share the board, so they are evaluated with evaluate_board_batch. A turn or river query takes
+    under 1 ms, but a flop query evaluates 178365 card sets and takes about 12 ms, which is still slow to call
+    for every hand of a street. Batch many hands with river_hand_strength instead, Eg: the abstraction building.
+
+    Args:
+        hand_cards (list): 2 hand cards (Card objects, card index strings or card ids)
+        public_cards (list): 3, 4 or 5 public cards
+        opponent_range (numpy.ndarray): optional, 1326 weights of opponent hands aligned with HOLE_PAIRS.
+                                        Default is a random hand.
+        bins (int): the number of bins of the histogram
+
+    Returns:
+        (Equity): the equity of the hand
+    '''
+    hero = to_card_ids(hand_cards)
+    board = to_card_ids(public_cards)
+    if len(hero) != 2 or len(board) not in (3, 4, 5):
+        raise ValueError("Exact equity needs 2 hand cards and 3 to 5 public cards.")
+    runout_num = 5 - len(board)
+    deck = np.array(sorted(set(range(CARD_NUM)) - set(hero) - set(board)), dtype=np.intp)
+
+    # Weights of opponent hands, indexed by the local pair index of positions in deck
+    if opponent_range is not None:
+        local_pairs = colex_combinations(len(deck), 2).astype(np.intp)
+        pair_weights = np.asarray(opponent_range, dtype=np.float64)[
+            get_pair_index(deck[local_pairs[:, 0]], deck[local_pairs[:, 1]])]
+
+    # Rank of the hand for each runout
+    runouts = colex_combinations(len(deck), runout_num).astype(np.intp)
+    hero_ranks = evaluate_board_batch(hero + board, deck[runouts])
+    # Rank of the opponent for each set of runout + opponent hand cards, all sharing the board
+    card_sets, splits = _get_card_set_splits(len(deck), runout_num)
+    opponent_ranks = evaluate_board_batch(board, deck[card_sets])
+
+    # Count each win as 2 and each tie as 1
+    wins = np.zeros(len(runouts))
+    if opponent_range is None:
+        # Every runout leaves the same number of opponent hands
+        totals = np.full(len(runouts), comb(len(deck) - runout_num, 2), dtype=np.float64)
+    else:
+        totals = np.zeros(len(runouts))
+    for runout_index, pair_index in splits:
+        scores = np.sign(hero_ranks[runout_index] - opponent_ranks) + 1
+        if opponent_range is None:
+            wins += np.bincount(runout_index, weights=scores, minlength=len(runouts))
+        else:
+            weights = pair_weights[pair_index]
+            wins += np.bincount(runout_index, weights=scores * weights, minlength=len(runouts))
+            totals += np.bincount(runout_index, weights=weights, minlength=len(runouts))
+
+    # Skip runouts that block the whole opponent range
+    valid = totals > 0
+    return _summarize(wins[valid] / (2 * totals[valid]), bins)
+
+
+def river_hand_strength(hand_cards, boards, opponent_range=None):
+    '''
+    Calculate the hand strength against all the opponent hands on each of several complete boards.
+
+    Args:
+        hand_cards (list): 2 hand card ids
+        boards (numpy.ndarray): shape (B, 5), card ids of each board
+        opponent_range (numpy.ndarray): optional, 1326 weights of opponent hands aligned with HOLE_PAIRS
+
+    Returns:
+        (numpy.ndarray): shape (B,), the hand strength on each board, nan if the board blocks the whole range
+    '''
+    board_num = len(boards)
+    used = np.zeros((board_num, CARD_NUM), dtype=bool)
+    used[np.arange(board_num)[:, None], boards] = True
+    used[:, hand_cards] = True
+    # Every board leaves the same number of opponent hands
+    rows, pairs = np.nonzero(~(used[:, HOLE_PAIRS[:, 0]] | used[:, HOLE_PAIRS[:, 1]]))
+
+    opponent_cards = np.empty((len(rows), 7), dtype=np.intp)
+    opponent_cards[:, :5] = boards[rows]
+    opponent_cards[:, 5:] = HOLE_PAIRS[pairs]
+    opponent_ranks = evaluate_batch(opponent_cards)
+    hero_cards = np.empty((board_num, 7), dtype=np.intp)
+    hero_cards[:, :5] = boards
+    hero_cards[:, 5:] = hand_cards
+    hero_ranks = evaluate_batch(hero_cards)[rows]
+
+    if opponent_range is None:
+        weights = np.ones(len(pairs))
+    else:
+        weights = np.asarray(opponent_range, dtype=np.float64)[pairs]
+    scores = weights * ((hero_ranks > opponent_ranks) + 0.5 * (hero_ranks == opponent_ranks))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.bincount(rows, weights=scores, minlength=board_num) / \
+            np.bincount(rows, weights=weights, minlength=board_num)
+
+
+def monte_carlo_equity(hand_cards, public_cards=(), opponent_range=None, bins=50,
+                       tolerance=0.005, batch_size=256, min_samples=1024, max_samples=100000, rng=None):
+    '''
+    Estimate the equity of a hand against one opponent by sampling runouts.
+
+    The hand strength on each sampled runout is exact. Sampling stops early once the standard error
+    of EHS is less than tolerance.
+
+    Args:
+        hand_cards (list): 2 hand cards (Card objects, card index strings or card ids)
+        public_cards (list): 0 to 5 public cards
+        opponent_range (numpy.ndarray): optional, 1326 weights of opponent hands aligned with HOLE_PAIRS.
+                                        Default is a random hand.
+        bins (int): the number of bins of the histogram
+        tolerance (float): the target standard error of EHS
+        batch_size (int): the number of runouts sampled at once
+        min_samples (int): the minimum number of runouts
+        max_samples (int): the maximum number of runouts
+        rng (numpy.random.Generator): optional, the random generator
+
+    Returns:
+        (Equity): the equity of the hand
+    '''
+    hero = to_card_ids(hand_cards)
+    board = to_card_ids(public_cards)
+    if len(hero) != 2 or len(board) > 5:
+        raise ValueError("Monte Carlo equity needs 2 hand cards and at most 5 public cards.")
+    rng = np.random.default_rng() if rng is None else rng
+    runout_num = 5 - len(board)
+    deck = np.array(sorted(set(range(CARD_NUM)) - set(hero) - set(board)), dtype=np.intp)
+
+    samples = []
+    sample_num = 0
+    while sample_num < max_samples:
+        boards = np.empty((batch_size, 5), dtype=np.intp)
+        boards[:, :len(board)] = board
+        # Sample runout cards without replacement for each board
+        boards[:, len(board):] = deck[np.argsort(rng.random((batch_size, len(deck))), axis=1)[:, :runout_num]]
+        hand_strength = river_hand_strength(hero, boards, opponent_range)
+        samples.append(hand_strength[~np.isnan(hand_strength)])
+        sample_num += len(samples[-1])
+        if sample_num >= min_samples:
+            hand_strength = np.concatenate(samples)
+            if np.std(hand_strength) / np.sqrt(sample_num) < tolerance:
+                break
+    return _summarize(np.concatenate(samples), bins)
+
+
+def calculate_equity(hand_cards, public_cards=(), opponent_range=None, bins=50, **kwargs):
+    '''
+    Calculate the equity of a hand against one opponent.
+
+    Exact enumeration is used on flop, turn and river. Monte Carlo sampling is used on pre-flop.
+
+    Args:
+        hand_cards (list): 2 hand cards (Card objects, card index strings or card ids)
+        public_cards (list): 0, 3, 4 or 5 public cards
+        opponent_range (numpy.ndarray): optional, 1326 weights of opponent hands aligned with HOLE_PAIRS
+        bins (int): the number of bins of the histogram
+        kwargs: the arguments of monte_carlo_equity
+
+    Returns:
+        (Equity): the equity of the hand
+    '''
+    if len(public_cards) >= 3:
+        return exact_equity(hand_cards, public_cards, opponent_range, bins)
+    return monte_carlo_equity(hand_cards, public_cards, opponent_range, bins, **kwargs)
@@ -0,0 +1,431 @@
+import os
+import bisect
+import argparse
+import itertools
+from math import comb
+import numpy as np
+from poker_env.card import LookUpStr
+
+
+# Number of ranks and suits in a standard deck
+RANK_NUM = len(LookUpStr.RANK.value)
+SUIT_NUM = len(LookUpStr.SUIT.value)
+
+# Map card index strings (Eg: 'As', 'Td') to integer card ids.
+# The card id is suit_index * 13 + rank_index, the same order as init_52_deck.
+CARD_STR_TO_ID = {rank + suit: s * RANK_NUM + r
+                  for s, suit in enumerate(LookUpStr.SUIT.value)
+                  for r, rank in enumerate(LookUpStr.RANK.value)}
+
+# Per-card lookups used by the evaluator
+_CARD_SUIT = [card_id // RANK_NUM for card_id in range(RANK_NUM * SUIT_NUM)]
+_CARD_BIT = [1 << (card_id % RANK_NUM) for card_id in range(RANK_NUM * SUIT_NUM)]
+# Rank keys chosen greedily (as in SKPokerEval) so that the sum of the keys of any 7 ranks,
+# with at most 4 cards of each rank, identifies the rank multiset. The largest sum is 7825759.
+_RANK_KEY = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+_CARD_KEY = [_RANK_KEY[card_id % RANK_NUM] for card_id in range(RANK_NUM * SUIT_NUM)]
+
+# Hand categories, greater combination has higher number (same as Hand.category)
+HIGH_CARD = 1
+ONE_PAIR = 2
+TWO_PAIRS = 3
+THREE_OF_A_KIND = 4
+STRAIGHT = 5
+FLUSH = 6
+FULL_HOUSE = 7
+FOUR_OF_A_KIND = 8
+STRAIGHT_FLUSH = 9
+
+# Lazily built look-up tables
+_tables = None
+_batch_tables = None
+
+# Default path of the 7-card rank table built by `python -m poker_env.evaluator build`
+RANK_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_ranks.npy')
+# Number of 7-card hands, the size of the 7-card rank table
+HAND_NUM = comb(RANK_NUM * SUIT_NUM, 7)
+# Memory-mapped 7-card rank table, None if not loaded yet, False if not available
+_rank_table = None
+# _COLEX[i][c] = C(c, i + 1), the colexicographic index of 7 sorted cards c0 < ... < c6 is sum(_COLEX[i][ci])
+_COLEX = [[comb(c, i + 1) for c in range(RANK_NUM * SUIT_NUM)] for i in range(7)]
+
+# Number of hands evaluated at once in evaluate_batch, bounds the temporary memory
+BATCH_CHUNK_SIZE = 1 << 16
+
+
+def _straight_high(rank_mask):
+    '''
+    Get the highest rank of a straight in a rank mask.
+
+    Args:
+        rank_mask (int): 13-bit mask, bit i is set if rank i is present
+    Returns:
+        (int): the highest rank of the best straight, -1 if there is no straight
+    '''
+    for high in range(RANK_NUM - 1, 3, -1):
+        if (rank_mask >> (high - 4)) & 0x1F == 0x1F:
+            return high
+    return -1
+
+
+def _pack(category, ranks):
+    '''
+    Pack a category and its ordered deciding ranks into one comparable integer.
+    '''
+    score = category
+    for i in range(5):
+        score = (score << 4) | (ranks[i] + 1 if i < len(ranks) else 0)
+    return score
+
+
+def _score_flush(rank_mask):
+    '''
+    Score the cards of one suit given its rank mask, 0 if there is no flush.
+    '''
+    ranks = [r for r in range(RANK_NUM - 1, -1, -1) if rank_mask >> r & 1]
+    if len(ranks) < 5:
+        return 0
+    high = _straight_high(rank_mask)
+    if high >= 0:
+        return _pack(STRAIGHT_FLUSH, [high])
+    return _pack(FLUSH, ranks[:5])
+
+
+def _score_ranks(counts):
+    '''
+    Score a hand without flush given the number of cards of every rank.
+    '''
+    # Groups sorted by (count, rank) in descending order
+    groups = sorted(((c, r) for r, c in enumerate(counts) if c > 0), reverse=True)
+    # Distinct ranks in descending order
+    distinct = [r for r in range(RANK_NUM - 1, -1, -1) if counts[r] > 0]
+    rank_mask = sum(1 << r for r in distinct)
+
+    def kickers(excluded, num):
+        return [r for r in distinct if r not in excluded][:num]
+
+    top_count, top_rank = groups[0]
+    if top_count == 4:
+        return _pack(FOUR_OF_A_KIND, [top_rank] + kickers([top_rank], 1))
+    if top_count == 3 and groups[1][0] >= 2:
+        return _pack(FULL_HOUSE, [top_rank, groups[1][1]])
+    high = _straight_high(rank_mask)
+    if high >= 0:
+        return _pack(STRAIGHT, [high])
+    if top_count == 3:
+        return _pack(THREE_OF_A_KIND, [top_rank] + kickers([top_rank], 2))
+    if top_count == 2 and groups[1][0] == 2:
+        pairs = [top_rank, groups[1][1]]
+        return _pack(TWO_PAIRS, pairs + kickers(pairs, 1))
+    if top_count == 2:
+        return _pack(ONE_PAIR, [top_rank] + kickers([top_rank], 3))
+    return _pack(HIGH_CARD, distinct[:5])
+
+
+def _build_tables():
+    '''
+    Build the flush table and the rank-key table of the evaluator.
+
+    Every 7-card hand is mapped to a dense hand rank in [1, N], N is the number of distinct hand values.
+
+    Returns:
+        (tuple): Tuple containing:
+            (list): hand rank of each 13-bit suit rank mask, 0 if the suit has less than 5 cards
+            (dict): hand rank of each rank key (sum of _RANK_KEY) of non-flush hands
+            (list): the first hand rank of each category, from HIGH_CARD to STRAIGHT_FLUSH
+    '''
+    flush_scores = [_score_flush(rank_mask) for rank_mask in range(1 << RANK_NUM)]
+    rank_scores = {}
+    # Every multiset of 7 ranks with at most 4 cards of each rank
+    for ranks in itertools.combinations_with_replacement(range(RANK_NUM), 7):
+        counts = [0] * RANK_NUM
+        for r in ranks:
+            counts[r] += 1
+        if max(counts) <= 4:
+            rank_scores[sum(_RANK_KEY[r] for r in ranks)] = _score_ranks(counts)
+    if len(rank_scores) != 49205:
+        raise RuntimeError("Rank keys are not unique.")
+
+    # Compress the packed scores into dense hand ranks
+    all_scores = sorted((set(flush_scores) | set(rank_scores.values())) - {0})
+    dense = {score: i + 1 for i, score in enumerate(all_scores)}
+    dense[0] = 0
+    flush_table = [dense[score] for score in flush_scores]
+    rank_table = {key: dense[score] for key, score in rank_scores.items()}
+    category_starts = [min(dense[score] for score in all_scores if score >> 20 == category)
+                       for category in range(HIGH_CARD, STRAIGHT_FLUSH + 1)]
+    return flush_table, rank_table, category_starts
+
+
+def get_tables():
+    '''
+    Return the look-up tables of the evaluator, building them on first use.
+    '''
+    global _tables
+    if _tables is None:
+        _tables = _build_tables()
+    return _tables
+
+
+def evaluate_hand(cards):
+    '''
+    Evaluate seven cards and return the hand rank.
+
+    Args:
+        cards (list): 7 integer card ids (or card index strings)
+    Returns:
+        (int): the hand rank, greater rank means stronger hand. Equal ranks are draws.
+    '''
+    hand_ranks = _rank_table if _rank_table is not None else load_rank_table()
+    if hand_ranks is not False:
+        if isinstance(cards[0], str):
+            cards = [CARD_STR_TO_ID[card] for card in cards]
+        # Look up the 7-card rank table by the colexicographic index of the sorted cards
+        c0, c1, c2, c3, c4, c5, c6 = sorted(cards)
+        return int(hand_ranks[_COLEX[0][c0] + _COLEX[1][c1] + _COLEX[2][c2] + _COLEX[3][c3]
+                              + _COLEX[4][c4] + _COLEX[5][c5] + _COLEX[6][c6]])
+
+    flush_table, rank_table, _ = get_tables()
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        if isinstance(card, str):
+            card = CARD_STR_TO_ID[card]
+        key += _CARD_KEY[card]
+        suit_masks[_CARD_SUIT[card]] |= _CARD_BIT[card]
+    for rank_mask in suit_masks:
+        # Flush beats every non-flush hand that can be made of 7 cards
+        rank = flush_table[rank_mask]
+        if rank:
+            return rank
+    return rank_table[key]
+
+
+def get_category(rank):
+    '''
+    Get the category of a hand rank.
+
+    Args:
+        rank (int): hand rank returned by evaluate_hand
+    Returns:
+        (int): category of the hand, same as Hand.category. 0 means not a valid rank.
+    '''
+    category_starts = get_tables()[2]
+    return bisect.bisect_right(category_starts, rank)
+
+
+def get_batch_tables():
+    '''
+    Return the look-up tables of the evaluator as numpy arrays, building them on first use.
+
+    Returns:
+        (tuple): Tuple containing:
+            (numpy.ndarray): hand rank of each 13-bit suit rank mask
+            (numpy.ndarray): hand rank of each rank key of non-flush hands, 0 for unused keys
+    '''
+    global _batch_tables
+    if _batch_tables is None:
+        flush_table, rank_table, _ = get_tables()
+        rank_array = np.zeros(max(rank_table) + 1, dtype=np.uint16)
+        rank_array[list(rank_table.keys())] = list(rank_table.values())
+        _batch_tables = (np.array(flush_table, dtype=np.uint16), rank_array)
+    return _batch_tables
+
+
+_CARD_KEY_ARRAY = np.array(_CARD_KEY, dtype=np.int32)
+# Bit of each card in the 52-bit card mask, 13 bits for each suit
+_CARD_MASK_ARRAY = np.left_shift(np.int64(1), np.arange(RANK_NUM * SUIT_NUM, dtype=np.int64))
+
+
+_COLEX_ARRAY = np.array(_COLEX, dtype=np.int64)
+
+
+def _evaluate_chunk(cards):
+    '''
+    Evaluate a chunk of hands held in memory.
+
+    Args:
+        cards (numpy.ndarray): shape (n, 7), integer card ids
+    Returns:
+        (numpy.ndarray): shape (n,), hand ranks
+    '''
+    hand_ranks = _rank_table if _rank_table is not None else load_rank_table()
+    if hand_ranks is False:
+        return _compute_chunk(cards)
+    cards = np.sort(cards, axis=1)
+    index = _COLEX_ARRAY[0][cards[:, 0]]
+    for i in range(1, 7):
+        index += _COLEX_ARRAY[i][cards[:, i]]
+    return hand_ranks[index]
+
+
+def _compute_chunk(cards):
+    '''
+    Evaluate a chunk of hands with the flush and rank-key tables.
+    '''
+    flush_table, rank_array = get_batch_tables()
+    result = rank_array[_CARD_KEY_ARRAY[cards].sum(axis=1)]
+    card_mask = _CARD_MASK_ARRAY[cards].sum(axis=1)
+    for suit in range(SUIT_NUM):
+        # Flush ranks are 0 when the suit has less than 5 cards,
+        # otherwise a flush beats every non-flush hand that can be made of 7 cards
+        np.maximum(result, flush_table[(card_mask >> (RANK_NUM * suit)) & 0x1FFF], out=result)
+    return result
+
+
+def evaluate_batch(cards, out=None):
+    '''
+    Evaluate a batch of seven-card hands.
+
+    The batch is processed in chunks, so cards can be a numpy.memmap larger than memory.
+
+    Args:
+        cards (numpy.ndarray): shape (N, 7), integer card ids of each hand
+        out (numpy.ndarray): optional, shape (N,), array to store the result
+
+    Returns:
+        (numpy.ndarray): shape (N,), the hand rank of each hand, same as evaluate_hand
+    '''
+    if cards.ndim != 2 or cards.shape[1] != 7:
+        raise ValueError("cards must be an array of shape (N, 7).")
+    if out is None:
+        out = np.empty(len(cards), dtype=np.int32)
+    for start in range(0, len(cards), BATCH_CHUNK_SIZE):
+        chunk = np.asarray(cards[start:start + BATCH_CHUNK_SIZE], dtype=np.intp)
+        out[start:start + len(chunk)] = _evaluate_chunk(chunk)
+    return out
+
+
+def evaluate_board_batch(board, cards, out=None):
+    '''
+    Evaluate a batch of seven-card hands that share the same board cards.
+
+    The rank key and the card mask of the board are summed only once, so each hand only adds its own cards.
+    Suits that cannot make a flush with the board are skipped.
+
+    Args:
+        board (list): the shared card ids, Eg: the public cards
+        cards (numpy.ndarray): shape (N, 7 - len(board)), integer card ids of the rest cards of each hand
+        out (numpy.ndarray): optional, shape (N,), array to store the result
+
+    Returns:
+        (numpy.ndarray): shape (N,), the hand rank of each hand, same as evaluate_hand
+    '''
+    board = [int(card) for card in board]
+    if cards.ndim != 2 or len(board) + cards.shape[1] != 7:
+        raise ValueError("cards must be an array of shape (N, {}).".format(7 - len(board)))
+    flush_table, rank_array = get_batch_tables()
+    board_key = sum(_CARD_KEY[card] for card in board)
+    board_mask = sum(1 << card for card in board)
+    flush_suits = [suit for suit in range(SUIT_NUM)
+                   if sum(_CARD_SUIT[card] == suit for card in board) + cards.shape[1] >= 5]
+    if out is None:
+        out = np.empty(len(cards), dtype=np.int32)
+    for start in range(0, len(cards), BATCH_CHUNK_SIZE):
+        chunk = np.asarray(cards[start:start + BATCH_CHUNK_SIZE], dtype=np.intp)
+        key = np.full(len(chunk), board_key, dtype=np.int32)
+        card_mask = np.full(len(chunk), board_mask, dtype=np.int64)
+        for i in range(chunk.shape[1]):
+            key += _CARD_KEY_ARRAY[chunk[:, i]]
+            card_mask |= _CARD_MASK_ARRAY[chunk[:, i]]
+        result = rank_array[key]
+        for suit in flush_suits:
+            np.maximum(result, flush_table[(card_mask >> (RANK_NUM * suit)) & 0x1FFF], out=result)
+        out[start:start + len(chunk)] = result
+    return out
+
+
+def colex_combinations(n, k):
+    '''
+    Generate all k-combinations of range(n) in colexicographic order.
+
+    Note: the combinations of range(m) are the first C(m, k) rows for every m <= n.
+
+    Returns:
+        (numpy.ndarray): shape (C(n, k), k), each row is sorted in ascending order
+    '''
+    if k == 0 or k > n:
+        # The empty combination, or none
+        return np.empty((comb(n, k), k), dtype=np.int8)
+    combos = np.arange(n, dtype=np.int8)[:, None]
+    for j in range(2, k + 1):
+        blocks = []
+        for top in range(j - 1, n):
+            block = np.empty((comb(top, j - 1), j), dtype=np.int8)
+            block[:, :-1] = combos[:len(block)]
+            block[:, -1] = top
+            blocks.append(block)
+        combos = np.concatenate(blocks)
+    return combos
+
+
+def build_rank_table(path=RANK_TABLE_PATH):
+    '''
+    Build the 7-card rank table and write it to a .npy file.
+
+    Entry i of the table is the hand rank of the i-th 7-card hand in colexicographic order
+    (a perfect hash of the sorted cards). The table has 133784560 uint16 entries (about 268MB).
+
+    Args:
+        path (str): the path of the table file
+    '''
+    card_num = RANK_NUM * SUIT_NUM
+    lower_combos = colex_combinations(card_num - 2, 5)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint16, shape=(HAND_NUM,))
+    # Hands with the same two highest cards (c5, c6) are consecutive in colexicographic order
+    offset = 0
+    for c6 in range(6, card_num):
+        for c5 in range(5, c6):
+            block = np.empty((comb(c5, 5), 7), dtype=np.int8)
+            block[:, :5] = lower_combos[:len(block)]
+            block[:, 5] = c5
+            block[:, 6] = c6
+            for start in range(0, len(block), BATCH_CHUNK_SIZE):
+                chunk = block[start:start + BATCH_CHUNK_SIZE].astype(np.intp)
+                table[offset:offset + len(chunk)] = _compute_chunk(chunk)
+                offset += len(chunk)
+    table.flush()
+    del table
+    # Replace atomically, so that other processes never load a partial table
+    os.replace(tmp_path, path)
+
+
+def load_rank_table(path=None):
+    '''
+    Memory-map the 7-card rank table, all the processes share the table through the page cache.
+
+    The table is loaded lazily by the evaluator on first use. If the table file does not exist,
+    the evaluator falls back to the flush and rank-key tables.
+
+    Args:
+        path (str): the path of the table file, default is RANK_TABLE_PATH
+    Returns:
+        (numpy.ndarray or bool): the rank table backed by the memory map, False if not available
+    '''
+    global _rank_table
+    path = RANK_TABLE_PATH if path is None else path
+    if os.path.exists(path):
+        table = np.load(path, mmap_mode='r')
+        if table.shape != (HAND_NUM,) or table.dtype != np.uint16:
+            raise ValueError("{} is not a valid rank table.".format(path))
+        # A plain ndarray view of the memory map is faster to index than numpy.memmap
+        _rank_table = table.view(np.ndarray)
+    else:
+        _rank_table = False
+    return _rank_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand evaluator tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="build the 7-card rank table")
+    build_parser.add_argument('-o', '--output', default=RANK_TABLE_PATH, help="path of the rank table file")
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_rank_table(args.output)
+        print("Rank table is saved to {}".format(args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,13 @@
 import numpy as np
-from copy import deepcopy
+from array import array
 from poker_env.dealer import NoLimitTexasHoldemDealer as Dealer
 from poker_env.player import NoLimitTexasHoldemPlayer as Player
 from poker_env.judger import NoLimitTexasHoldemJudger as Judger
 from poker_env.round import NoLimitTexasHoldemRound as Round
+from poker_env.table import NoLimitTexasHoldemTable as Table, ALIVE, FOLDED
 from poker_env.state import PokerState
+from poker_env.action import LegalActions, to_action
+from poker_env.hand_history import action_event, deal_event, render_events, HOLE_EVENT, PUBLIC_EVENT, RUNOUT_EVENT
 
 
 class NoLimitTexasHoldemGame:
@@ -17,18 +20,53 @@ class NoLimitTexasHoldemGame:
         small_blind (int): the number of Small Blind(SB) chips of the game(Default=1).
         big_blind (int): the number of Big Blind(BB) chips of the game(Default=2).
         init_chips (int or list): chips that each player holds when game starts. Int means that each player hold the same chips, while list means initializing each players' chips individually.
+        rng (numpy.random.Generator): the random generator of the game, which deals the cards and places the button.
+        events (array): the int64 chance and action events of the current game, see poker_env.hand_history.
     '''
 
-    def __init__(self, allow_step_back=False, num_players=2, small_blind=1, big_blind=2, init_chips=100):
+    def __init__(self, allow_step_back=False, num_players=2, small_blind=1, big_blind=2, init_chips=100, seed=None,
+                 all_in_ev=False):
         '''
         Initialize the settings of No Limit Texas Hold'em Game Class
+
+        Args:
+            seed (int or numpy.random.SeedSequence or numpy.random.Generator): the seed of the random generator
+                of the game, or the generator itself. Default is None, which means unpredictable.
+            all_in_ev (boolean): True to settle the games whose betting is over before the river (Eg: every remaining
+                player is all-in) by the expected payoffs over the runouts, instead of the dealt public cards.
         '''
         self.allow_step_back = allow_step_back
+        self.all_in_ev = all_in_ev
         self.num_players = num_players
         self.init_chips = init_chips
         self.small_blind = small_blind
         self.big_blind = big_blind
         self.allow_hint_info_shown = False
+        # Initialize a judger class which will decide who wins in the end
+        self.judger = Judger()
+        # The undo journal, cleared when a game starts
+        self.history = []
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        '''
+        Reset the random generator of the game, and the dealer that uses it. The judger samples the runouts of
+        all_in_ev from a jumped copy of the generator, so the deals are the same whether all_in_ev is on or not.
+
+        Args:
+            seed (int or numpy.random.SeedSequence or numpy.random.Generator): the seed, or the generator itself
+        '''
+        self.rng = np.random.default_rng(seed)
+        # A stream far ahead of the deals, jumping does not advance the generator of the game
+        bit_generator = self.rng.bit_generator
+        if hasattr(bit_generator, 'jumped'):
+            self.judger.seed(np.random.Generator(bit_generator.jumped()))
+        else:
+            self.judger.seed(self.rng.spawn(1)[0])
+        if hasattr(self, 'dealer'):
+            self.dealer.seed(self.rng)
+        else:
+            self.dealer = Dealer(self.rng)
 
     def init_game(self, button=None):
         '''
@@ -44,54 +82,66 @@ class NoLimitTexasHoldemGame:
                 (PokerState): The first state of the game
                 (int): Current player's id
         '''
-        # Initialize a judger class which will decide who wins in the end
-        self.judger = Judger()
-        # Initialize a dealer that can deal cards
-        self.dealer = Dealer()
-        # Initialize a round class which will proceed the game
-        self.round = Round(self.num_players, self.big_blind)
-        # Count the round. There are 4 rounds in each game.
-        self.round_counter = 0
-        # Initialize several players to play the game
+        # Shuffle the deck of the dealer
+        self.dealer.shuffle()
         if isinstance(self.init_chips, int):
-            self.players = [Player(i, self.init_chips) for i in range(self.num_players)]
-        elif isinstance(self.init_chips, list):
-            if len(self.init_chips) != self.num_players:
+            init_chips = [self.init_chips] * self.num_players
+        else:
+            init_chips = self.init_chips
+            if len(init_chips) != self.num_players:
                 raise ValueError("Length of init_chips must equal to num_players.")
-            self.players = [Player(i, chips) for i, chips in enumerate(self.init_chips)]
+        table = getattr(self, 'table', None)
+        if table is not None and table.num_players == self.num_players and table.init_chips.tolist() == init_chips:
+            # Reset the objects of the last game in place, instead of reallocating them for every hand
+            table.reset()
+            self.round.init_raise_amount = self.big_blind
+            for player in self.players:
+                # A new list, since the states of the last game refer to the old hand
+                player.hand = []
+        else:
+            # Initialize the chips and status of all the seats
+            self.table = Table(init_chips)
+            # Initialize a round class which will proceed the game
+            self.round = Round(self.num_players, self.big_blind, self.table)
+            # Initialize several players to play the game
+            self.players = [Player(i, self.table.init_chips[i], self.table) for i in range(self.num_players)]
+        # Count the round. There are 4 rounds in each game.
+        self.round_counter = 0
         self.game_pointer = 0
         # Initialize public cards
         self.public_cards = []
 
-        # Save the history for stepping back to the last state.
-        self.history = []
+        # Save the undo journal for stepping back to the last state.
+        self.history.clear()
 
-        # Save the action sequence
-        self.game_tree = []
+        # Save the chance and action events, see poker_env.hand_history
+        self.events = array('q')
+
+        # The number of public cards, the chips and the status of the seats when the betting is over
+        self.all_in_point = None
 
         # Set position
         if button is not None and button >= self.num_players:
             raise ValueError("button is out of ranges")
         # Button
-        self.button = np.random.randint(0, self.num_players) if button is None else button
+        self.button = int(self.rng.integers(self.num_players)) if button is None else button
         # SB
         sb = (self.button + 1) % self.num_players
         # BB
         bb = (sb + 1) % self.num_players
-        self.players[sb].in_chips = self.small_blind
-        self.players[bb].in_chips = self.big_blind
+        self.table.bet(sb, self.small_blind)
+        self.table.bet(bb, self.big_blind)
         # The first player to action in pre-flop round is the UTG
         self.game_pointer = (bb + 1) % self.num_players
         # Pre-Flop round
         for i in range(2 * self.num_players):
             self.players[i % self.num_players].hand.append(self.dealer.deal_card())
-        self.round.start_new_round(game_pointer=self.game_pointer, raised=[p.in_chips for p in self.players])
+        self.round.start_new_round(game_pointer=self.game_pointer)
 
         # Save chance's deal action
         for i in range(1, self.num_players + 1):
             position = (self.button + i) % self.num_players
-            deal_card = [card.get_index() for card in self.players[position].hand]
-            self.game_tree.append(('c', 'deal_{}:{}'.format(position, deal_card)))
+            self.events.append(deal_event(HOLE_EVENT, self.players[position].hand, position))
 
         state = self.get_state()
         return state, self.game_pointer
@@ -101,29 +151,31 @@ class NoLimitTexasHoldemGame:
         Get the next state
 
         Args:
-            action (str or int): a specific action. (call, fold, check or raise(int))
+            action (int or str): the code of a legal action (see poker_env.action), or its string
 
         Ruturns:
             (tuple): Tuple containing:
                 (PokerState): next player's state
                 (int): next plater's id
         '''
-        # If allowed, snapshot the current state
+        action = to_action(action)
+
+        # If allowed, record the fields that the action may change
         if self.allow_step_back:
-            r = deepcopy(self.round)
-            b = deepcopy(self.game_pointer)
-            r_c = deepcopy(self.round_counter)
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            tr = deepcopy(self.game_tree)
-            self.history.append((r, b, r_c, d, p, ps, tr))
+            r = self.round
+            actor = r.game_pointer
+            self.history.append((self.game_pointer, self.round_counter,
+                                 actor, r.not_raise_num, r.current_raise_amount,
+                                 self.table.in_chips[actor], self.table.status[actor],
+                                 len(self.public_cards), len(self.events), self.all_in_point))
 
         # Save the player's action
-        self.game_tree.append((self.game_pointer, action))
+        self.events.append(action_event(self.game_pointer, action))
 
         # Then proceed the action and get to the next state
         self.game_pointer = self.round.proceed_round(self.players, action)
+        if self.all_in_ev and self.all_in_point is None:
+            self.__check_all_in_point()
 
         # If a round is over, we deal more public cards
         if self.round.is_over():
@@ -131,18 +183,18 @@ class NoLimitTexasHoldemGame:
             if self.round_counter == 0:
                 for _ in range(3):
                     self.public_cards.append(self.dealer.deal_card())
-                self.game_tree.append(('c', 'deal_public:{}'.format([card.get_index() for card in self.public_cards])))
+                self.events.append(deal_event(PUBLIC_EVENT, self.public_cards))
 
             # For the following rounds, we deal only 1 card
             elif self.round_counter <= 2:
                 card = self.dealer.deal_card()
                 self.public_cards.append(card)
-                self.game_tree.append(('c', 'deal_public:{}'.format(card.get_index())))
+                self.events.append(deal_event(PUBLIC_EVENT, [card]))
             self.round_counter += 1
             # The first player to action in flop, turn, and river round is SB(if is alive).
             self.game_pointer = (self.button + 1) % self.num_players
             i = 1
-            while self.players[self.game_pointer].status != 'alive':
+            while self.table.status[self.game_pointer] != ALIVE:
                 i += 1
                 self.game_pointer = (self.game_pointer + 1) % self.num_players
                 # No player is in status 'alive', game over or several players choose to all-in
@@ -150,19 +202,71 @@ class NoLimitTexasHoldemGame:
                     if not self.is_over():
                         # All Players choose all-in, deal remaining public cards and Showdown
                         self.round_counter = 4
-                        deal_card = []
-                        for _ in range(len(self.public_cards), 5):
+                        public_card_num = len(self.public_cards)
+                        for _ in range(public_card_num, 5):
                             self.public_cards.append(self.dealer.deal_card())
-                            deal_card.append(self.public_cards[-1].get_index())
-                        self.game_tree.append(('c', 'deal_public:{}'.format(deal_card)))
+                        self.events.append(deal_event(RUNOUT_EVENT, self.public_cards[public_card_num:]))
 
                     return {}, self.game_pointer
-            self.round.start_new_round(self.game_pointer, raised=self.round.raised)
+            self.round.start_new_round(self.game_pointer)
             # self.show_hint_info()
 
         state = self.get_state()
         return state, self.game_pointer
 
+    def clone(self):
+        '''
+        Copy the game without deepcopy. The copy can be stepped (or stepped back) independently.
+
+        Only the mutable containers are copied: the table, round, dealer deck, players, public cards, events
+        and the undo journal. Cards and journal entries are immutable and shared.
+
+        Returns:
+            (NoLimitTexasHoldemGame): the copy
+        '''
+        game = NoLimitTexasHoldemGame.__new__(NoLimitTexasHoldemGame)
+        game.__dict__.update(self.__dict__)
+        game.dealer = self.dealer.clone()
+        game.table = self.table.clone()
+        game.round = self.round.clone(game.table)
+        game.players = [player.clone(game.table) for player in self.players]
+        game.public_cards = self.public_cards.copy()
+        game.history = self.history.copy()
+        game.events = self.events[:]
+        return game
+
+    def __check_all_in_point(self):
+        '''
+        Record the all-in point if the betting is over: at least two players are not folded, and at most one of
+        them is not all-in and has nothing to call.
+        '''
+        table = self.table
+        if table.alive_num < 2 or table.alive_num - table.all_in_num > 1:
+            return
+        for seat in range(self.num_players):
+            if table.status[seat] == ALIVE and table.in_chips[seat] < table.max_in_chips:
+                return
+        self.all_in_point = (len(self.public_cards), table.in_chips.tolist(), table.status.tolist())
+
+    @property
+    def game_tree(self):
+        # The action sequence rendered from the events, actions of players are action codes
+        return render_events(self.events, to_string=False)
+
+    def child(self, action):
+        '''
+        Get the game after an action without changing the current game.
+
+        Args:
+            action (int or str): a legal action of the current player
+
+        Returns:
+            (NoLimitTexasHoldemGame): the next game
+        '''
+        game = self.clone()
+        game.step(action)
+        return game
+
     def is_over(self):
         '''
         Check if the game is over
@@ -171,8 +275,7 @@ class NoLimitTexasHoldemGame:
             (boolean): True if the game is over
         '''
         # only one player left
-        alive_players = [1 if p.status != 'folded' else 0 for p in self.players]
-        if sum(alive_players) == 1:
+        if self.table.alive_num == 1:
             return True
         # 4 round finished
         if self.round_counter >= 4:
@@ -187,7 +290,18 @@ class NoLimitTexasHoldemGame:
             (bool): True if the game steps back successfully
         '''
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, self.players, self.game_tree = self.history.pop()
+            r = self.round
+            (self.game_pointer, self.round_counter,
+             r.game_pointer, r.not_raise_num, r.current_raise_amount,
+             in_chips, status,
+             public_card_num, event_num, self.all_in_point) = self.history.pop()
+            # Only the acting player changes in one step
+            self.table.set_in_chips(r.game_pointer, in_chips)
+            self.table.set_status(r.game_pointer, status)
+            # Return the public cards dealt in the step to the deck
+            self.dealer.put_back(self.public_cards[public_card_num:])
+            del self.public_cards[public_card_num:]
+            del self.events[event_num:]
             return True
         return False
 
@@ -230,10 +344,12 @@ class NoLimitTexasHoldemGame:
         '''
         current_player = self.round.game_pointer
         state = PokerState(player_id=current_player,
-                           pot=[p.in_chips for p in self.players],
+                           pot=self.table.in_chips.tolist(),
                            hand_cards=self.players[current_player].hand,
-                           public_cards=self.public_cards,
-                           legal_actions=self.get_legal_actions())
+                           public_cards=list(self.public_cards),
+                           legal_actions=self.get_legal_actions(),
+                           init_chips=self.table.init_chips,
+                           button=self.button)
         return state
 
     def get_final_state(self, player_id):
@@ -245,18 +361,19 @@ class NoLimitTexasHoldemGame:
         '''
         current_player = self.round.game_pointer
         state = PokerState(player_id=current_player,
-                           pot=[p.in_chips for p in self.players],
+                           pot=self.table.in_chips.tolist(),
                            hand_cards=self.players[current_player].hand,
-                           public_cards=self.public_cards,
-                           legal_actions=[])
+                           public_cards=list(self.public_cards),
+                           legal_actions=LegalActions(fold=False, all_in=False),
+                           init_chips=self.table.init_chips,
+                           button=self.button)
         return state
-
     def get_legal_actions(self):
         '''
         Return the legal actions for current player
 
         Returns:
-            (list): A list of legal actions
+            (LegalActions): the legal actions, it can be used as a list of action strings
         '''
         return self.round.get_legal_actions(self.players)
 
@@ -271,7 +388,12 @@ class NoLimitTexasHoldemGame:
         # for p in self.players:
         #     if p.status != 'folded':
         #         print("Player{}'s hand:{}".format(p.get_player_id(), [card.get_index() for card in p.hand]))
-        hands = [p.hand + self.public_cards if p.status != 'folded' else None for p in self.players]
+        point = self.all_in_point
+        # Chips and status unchanged since the all-in point, Eg: the player who is not all-in never folds
+        if point is not None and point[0] < 5 and point[1] == self.table.in_chips.tolist() and \
+                point[2] == self.table.status.tolist():
+            return self.judger.judge_all_in_ev(self.players, self.public_cards[:point[0]])
+        hands = [p.hand + self.public_cards if self.table.status[p.seat] != FOLDED else None for p in self.players]
         payoffs = self.judger.judge_game(self.players, hands)
         # payoffs = np.array(payoffs) / self.big_blind
         return payoffs
@@ -1,4 +1,5 @@
-from poker_env.card import LookUpStr
+from poker_env.card import RANK_STR, SUIT_STR
+from poker_env.evaluator import evaluate_hand
 
 
 class Hand:
@@ -99,7 +100,7 @@ class Hand:
         current_rank = 0
 
         for card in all_cards:
-            rank = LookUpStr.RANK.value.index(card[0])
+            rank = RANK_STR.index(card[0])
             if rank == current_rank:
                 count += 1
                 card_group_element.append(card)
@@ -389,7 +390,7 @@ class Hand:
             (list): the flush cards
         '''
         card_string = ''.join(self.all_cards)
-        for suit in LookUpStr.SUIT.value:
+        for suit in SUIT_STR:
             suit_count = card_string.count(suit)
             if suit_count >= 5:
                 flush_cards = [
@@ -410,7 +411,7 @@ class Hand:
         i = len(Cards)
         while (i - 5 >= 0):
             hand_to_check = ''.join(card[0] for card in Cards[i - 5:i])
-            if LookUpStr.RANK.value.find(hand_to_check) >= 0:
+            if RANK_STR.find(hand_to_check) >= 0:
                 return Cards[i - 5:i]
             i -= 1
         return []
@@ -449,7 +450,7 @@ def get_sorted_cards(all_cards):
     Returns:
         (list): a list of sorted cards
     '''
-    return sorted(all_cards, key=lambda card: LookUpStr.RANK.value.index(card[0]))
+    return sorted(all_cards, key=lambda card: RANK_STR.index(card[0]))
 
 
 def compare_ranks(position, handcard0, handcard1):
@@ -465,7 +466,7 @@ def compare_ranks(position, handcard0, handcard1):
         [1, 0]: player0 wins
         [1, 1]: draw
     '''
-    RANKS = LookUpStr.RANK.value
+    RANKS = RANK_STR
     if RANKS.index(handcard0[position][0]) > RANKS.index(
             handcard1[position][0]):
         return [1, 0]
@@ -502,8 +503,8 @@ def compare_2_hands(hand0, hand1):
     Compare two palyer's all seven cards.
 
     Args:
-        hand0(list) : all the seven cards of player0
-        hand1(list) : all the seven cards of player1
+        hand0(list) : all the seven cards of player0 (card ids or card index strings)
+        hand1(list) : all the seven cards of player1 (card ids or card index strings)
     Returns:
         [1, 0]: player0 wins
         [0, 1]: player1 wins
@@ -514,37 +515,12 @@ def compare_2_hands(hand0, hand1):
         return [0, 1]
     elif hand1 is None:
         return [1, 0]
-    hand0 = Hand(hand0)
-    hand1 = Hand(hand1)
-    hand0.evaluateHand()
-    hand1.evaluateHand()
-    hand0_category = hand0.category
-    hand1_category = hand1.category
-
-    if hand0_category > hand1_category:
+    hand0_rank = evaluate_hand(hand0)
+    hand1_rank = evaluate_hand(hand1)
+
+    if hand0_rank > hand1_rank:
         return [1, 0]
-    elif hand0_category < hand1_category:
+    elif hand0_rank < hand1_rank:
         return [0, 1]
-    elif hand0_category == hand1_category:
-        # compare equal category
-        hand0_5_cards = hand0.get_hand_five_cards()
-        hand1_5_cards = hand1.get_hand_five_cards()
-        # Straight_Flush, Straight
-        if hand0_category == 9 or hand0_category == 5:
-            return determine_winner([0], hand0_5_cards, hand1_5_cards)
-        # Four_of_a_Kind, FullHouse
-        if hand0_category == 8 or hand0_category == 7:
-            return determine_winner([4, 0], hand0_5_cards, hand1_5_cards)
-        # Three_of_a_Kind
-        if hand0_category == 4:
-            return determine_winner([2, 1, 0], hand0_5_cards, hand1_5_cards)
-        # Two_Pairs
-        if hand0_category == 3:
-            return determine_winner([4, 2, 0], hand0_5_cards, hand1_5_cards)
-        # One_Pair
-        if hand0_category == 2:
-            return determine_winner([4, 2, 1, 0], hand0_5_cards, hand1_5_cards)
-        # High_Card, Flush
-        if hand0_category == 1 or hand0_category == 6:
-            return determine_winner([4, 3, 2, 1, 0], hand0_5_cards,
-                                    hand1_5_cards)
+    else:
+        return [1, 1]
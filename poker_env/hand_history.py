@@ -0,0 +1,289 @@
+import os
+import numpy as np
+from array import array
+from poker_env.action import action_to_str
+from poker_env.utils import _DECK
+
+
+# An event of a hand is one int64:
+#   bits [0, 2): the event type
+#   bits [2, 10): the seat of the player (the receiver of hole cards, 0 for public cards)
+#   bits [10, 64): the payload, the action code for an action, or the number of cards (3 bits)
+#                  followed by 6 bits for the id of each card for a deal
+EVENT_TYPE_BITS = 2
+EVENT_TYPE_MASK = (1 << EVENT_TYPE_BITS) - 1
+EVENT_SEAT_BITS = 8
+EVENT_SEAT_MASK = (1 << EVENT_SEAT_BITS) - 1
+EVENT_PAYLOAD_SHIFT = EVENT_TYPE_BITS + EVENT_SEAT_BITS
+CARD_NUM_BITS = 3
+CARD_ID_BITS = 6
+CARD_ID_MASK = (1 << CARD_ID_BITS) - 1
+
+# Event types
+ACTION_EVENT = 0
+# Hole cards of a player
+HOLE_EVENT = 1
+# Public cards of a betting round, one card is shown as a string instead of a list
+PUBLIC_EVENT = 2
+# Remaining public cards dealt at once when no player can act
+RUNOUT_EVENT = 3
+
+# The first int64 of each chunk of a hand history file
+CHUNK_MAGIC = 0x48484b4e43  # 'HHKNC'
+# [magic, hand number, event number]
+CHUNK_HEADER_SIZE = 3
+HAND_CHUNK_SIZE = 4096
+
+
+def action_event(seat, action):
+    '''
+    Encode an action of a player.
+
+    Args:
+        seat (int): the seat of the player
+        action (int): the action code, see poker_env.action
+
+    Returns:
+        (int): the event
+    '''
+    return ACTION_EVENT | seat << EVENT_TYPE_BITS | action << EVENT_PAYLOAD_SHIFT
+
+
+def deal_event(event_type, cards, seat=0):
+    '''
+    Encode dealt cards.
+
+    Args:
+        event_type (int): HOLE_EVENT, PUBLIC_EVENT or RUNOUT_EVENT
+        cards (list): Card objects, at most 5
+        seat (int): the seat of the player who receives hole cards
+
+    Returns:
+        (int): the event
+    '''
+    payload = len(cards)
+    for i, card in enumerate(cards):
+        payload |= card.id << (CARD_NUM_BITS + CARD_ID_BITS * i)
+    return event_type | seat << EVENT_TYPE_BITS | payload << EVENT_PAYLOAD_SHIFT
+
+
+def get_event_type(event):
+    return event & EVENT_TYPE_MASK
+
+
+def get_event_seat(event):
+    return (event >> EVENT_TYPE_BITS) & EVENT_SEAT_MASK
+
+
+def get_event_action(event):
+    '''
+    Get the action code of an action event
+    '''
+    return event >> EVENT_PAYLOAD_SHIFT
+
+
+def get_event_cards(event):
+    '''
+    Get the ids of the dealt cards of a deal event
+    '''
+    payload = event >> EVENT_PAYLOAD_SHIFT
+    card_num = payload & ((1 << CARD_NUM_BITS) - 1)
+    return [(payload >> (CARD_NUM_BITS + CARD_ID_BITS * i)) & CARD_ID_MASK for i in range(card_num)]
+
+
+def render_events(events, to_string=True):
+    '''
+    Render the events of a hand as the game tree, a list of (player, action) and ('c', chance string) entries.
+
+    Args:
+        events (sequence): the events of a hand
+        to_string (boolean): True to show the actions of players as strings, otherwise action codes
+
+    Returns:
+        (list): the game tree
+    '''
+    game_tree = []
+    for event in events:
+        event = int(event)
+        event_type = get_event_type(event)
+        if event_type == ACTION_EVENT:
+            action = get_event_action(event)
+            game_tree.append((get_event_seat(event), action_to_str(action) if to_string else action))
+            continue
+        cards = [_DECK[card_id].string for card_id in get_event_cards(event)]
+        if event_type == HOLE_EVENT:
+            game_tree.append(('c', 'deal_{}:{}'.format(get_event_seat(event), cards)))
+        elif event_type == PUBLIC_EVENT and len(cards) == 1:
+            game_tree.append(('c', 'deal_public:{}'.format(cards[0])))
+        else:
+            game_tree.append(('c', 'deal_public:{}'.format(cards)))
+    return game_tree
+
+
+def _scan_chunks(data):
+    '''
+    Find the complete chunks of a hand history file. Broken data (Eg: a chunk torn by a killed writer and followed
+    by the chunks of a later writer) is skipped by resynchronizing to the next CHUNK_MAGIC.
+
+    Args:
+        data (numpy.ndarray): the int64 words of the file
+
+    Returns:
+        (tuple): Tuple containing:
+            (list): the position of each chunk
+            (list): the number of hands before each chunk, and the total number of hands at the end
+            (int): the end position of the last complete chunk
+    '''
+    chunks = []
+    hand_counts = [0]
+    position = end = 0
+    while position + CHUNK_HEADER_SIZE <= len(data):
+        magic, hand_num, event_num = data[position:position + CHUNK_HEADER_SIZE].tolist()
+        size = CHUNK_HEADER_SIZE + hand_num + 1 + event_num
+        offsets = position + CHUNK_HEADER_SIZE
+        # A complete chunk ends at the end of the file or at the next chunk
+        if magic == CHUNK_MAGIC and hand_num > 0 and event_num >= 0 and position + size <= len(data) and \
+                data[offsets] == 0 and data[offsets + hand_num] == event_num and \
+                (position + size == len(data) or data[position + size] == CHUNK_MAGIC):
+            chunks.append(position)
+            hand_counts.append(hand_counts[-1] + hand_num)
+            position = end = position + size
+            continue
+        following = np.flatnonzero(data[position + 1:] == CHUNK_MAGIC)
+        if len(following) == 0:
+            break
+        position += 1 + int(following[0])
+    return chunks, hand_counts, end
+
+
+def _map_file(path):
+    '''
+    Memory-map the int64 words of a file.
+    '''
+    size = os.path.getsize(path) // 8
+    if size == 0:
+        return np.empty(0, dtype='<i8')
+    return np.memmap(path, dtype='<i8', mode='r', shape=(size,))
+
+
+class HandHistoryWriter:
+    '''
+    Append the events of hands to a binary hand history file.
+
+    The file is a sequence of chunks of little-endian int64, each chunk holds up to chunk_size hands:
+        [CHUNK_MAGIC, hand number, event number], the offset index of the hands (hand number + 1 event offsets
+        in the chunk), and the events of the hands.
+    Hands are buffered until a chunk is full, and opening an existing file appends new chunks to it. An incomplete
+    chunk at the end of an existing file (Eg: the previous writer was killed) is truncated first.
+    '''
+    def __init__(self, path, chunk_size=HAND_CHUNK_SIZE):
+        '''
+        Args:
+            path (str): the path of the file
+            chunk_size (int): the number of hands in a chunk
+        '''
+        self.chunk_size = chunk_size
+        if os.path.exists(path):
+            data = _map_file(path)
+            end = _scan_chunks(data)[2] * 8
+            del data
+            if end < os.path.getsize(path):
+                os.truncate(path, end)
+        self.__file = open(path, 'ab')
+        self.__events = array('q')
+        self.__offsets = array('q', [0])
+
+    def write(self, events):
+        '''
+        Append a hand.
+
+        Args:
+            events (sequence): the events of the hand, Eg: env.get_hand_history()
+        '''
+        self.__events.extend(events)
+        self.__offsets.append(len(self.__events))
+        if len(self.__offsets) > self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        '''
+        Write the buffered hands as a chunk.
+        '''
+        hand_num = len(self.__offsets) - 1
+        if hand_num > 0:
+            header = np.array([CHUNK_MAGIC, hand_num, len(self.__events)], dtype='<i8')
+            header.tofile(self.__file)
+            np.frombuffer(self.__offsets, dtype=np.int64).astype('<i8', copy=False).tofile(self.__file)
+            np.frombuffer(self.__events, dtype=np.int64).astype('<i8', copy=False).tofile(self.__file)
+            self.__events = array('q')
+            self.__offsets = array('q', [0])
+        self.__file.flush()
+
+    def close(self):
+        if not self.__file.closed:
+            self.flush()
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class HandHistoryReader:
+    '''
+    Random access to the hands of a hand history file written by HandHistoryWriter.
+
+    The file is memory-mapped, and only the chunk headers are read when the reader is created.
+    Incomplete chunks (Eg: the writer was killed) are skipped, the reader resynchronizes to the next chunk.
+    '''
+    def __init__(self, path):
+        '''
+        Args:
+            path (str): the path of the file
+        '''
+        self.__data = _map_file(path)
+        # The position of each chunk and the number of hands before it
+        self.__chunks, hand_counts, _ = _scan_chunks(self.__data)
+        self.__hand_counts = np.array(hand_counts)
+
+    def __len__(self):
+        return int(self.__hand_counts[-1])
+
+    def __getitem__(self, index):
+        '''
+        Get the events of a hand.
+
+        Returns:
+            (numpy.ndarray): int64 events of the hand
+        '''
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("hand index out of range")
+        chunk = int(np.searchsorted(self.__hand_counts, index, side='right')) - 1
+        position = self.__chunks[chunk]
+        hand_num = int(self.__data[position + 1])
+        offsets = position + CHUNK_HEADER_SIZE
+        events = offsets + hand_num + 1
+        i = index - int(self.__hand_counts[chunk])
+        start, end = self.__data[offsets + i:offsets + i + 2].tolist()
+        return np.array(self.__data[events + start:events + end], dtype=np.int64)
+
+    def __iter__(self):
+        for position in self.__chunks:
+            hand_num = int(self.__data[position + 1])
+            event_num = int(self.__data[position + 2])
+            offsets = position + CHUNK_HEADER_SIZE
+            events = offsets + hand_num + 1
+            events = np.array(self.__data[events:events + event_num], dtype=np.int64)
+            bounds = self.__data[offsets:offsets + hand_num + 1].tolist()
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                yield events[start:end]
+
+    def get_game_tree(self, index, to_string=True):
+        '''
+        Render a hand as the game tree, see render_events
+        '''
+        return render_events(self[index], to_string)
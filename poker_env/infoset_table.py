@@ -0,0 +1,190 @@
+import numpy as np
+from collections.abc import Mapping
+
+
+class SparseInfosetTable:
+    '''
+    Per-infoset action vectors (Eg: regrets and policies of CFR) stored sparsely in flat arrays.
+
+    An infoset only owns a block of the flat arrays for the actions that have been legal at it. The offset
+    table maps an infoset to the offset of its block and the sorted action ids of the block. When a new action
+    becomes legal, the block is moved to the end of the arrays with the new action inserted, and the arrays are
+    compacted once the moved-out blocks take more than half of them.
+
+    Attributes:
+        field_num (int): the number of vectors of each infoset
+    '''
+    def __init__(self, field_num, capacity=1024):
+        '''
+        Initialize an empty table.
+
+        Args:
+            field_num (int): the number of vectors of each infoset
+            capacity (int): the initial length of the flat arrays
+        '''
+        self.field_num = field_num
+        self.__data = np.zeros((field_num, capacity))
+        self.__size = 0
+        # The number of entries taken by moved-out blocks
+        self.__garbage = 0
+        # infoset -> [offset, sorted action ids, fill values of new actions]
+        self.__offsets = {}
+
+    @property
+    def data(self):
+        '''
+        The flat arrays, shape (field_num, N). Slots from get_slots index the second axis.
+        '''
+        return self.__data
+
+    @property
+    def nbytes(self):
+        '''
+        The bytes of the used part of the flat arrays and the action ids
+        '''
+        return self.__size * self.__data.itemsize * self.field_num + \
+            sum(entry[1].nbytes for entry in self.__offsets.values())
+
+    def __len__(self):
+        return len(self.__offsets)
+
+    def __contains__(self, infoset):
+        return infoset in self.__offsets
+
+    def __iter__(self):
+        return iter(self.__offsets)
+
+    def get_actions(self, infoset):
+        '''
+        Get the sorted action ids of the block of an infoset
+        '''
+        return self.__offsets[infoset][1]
+
+    def get_block(self, infoset):
+        '''
+        Get the block of an infoset.
+
+        Returns:
+            (numpy.ndarray): shape (field_num, len(get_actions(infoset))), a view of the flat arrays
+        '''
+        offset, actions, _ = self.__offsets[infoset]
+        return self.__data[:, offset:offset + len(actions)]
+
+    def get_fill(self, infoset):
+        '''
+        Get the values of the fields for the actions that are not in the block of an infoset.
+        '''
+        return self.__offsets[infoset][2]
+
+    def set_fill(self, infoset, fill):
+        '''
+        Set the values of the fields for the actions that are added to the block of an infoset later.
+        '''
+        self.__offsets[infoset][2] = np.array(fill, dtype=float)
+
+    def get_slots(self, infoset, actions, fill=None):
+        '''
+        Get the slots of actions of an infoset. The block of the infoset is created or extended if needed.
+        A slot may change when the block is extended, so it should not be kept after the next get_slots.
+
+        Args:
+            infoset (hashable): the infoset
+            actions (list): action ids, Eg: indices of legal actions
+            fill (list): the values of each field for the actions of a new infoset, default is 0
+
+        Returns:
+            (numpy.ndarray): the slot of each action in the flat arrays
+        '''
+        actions = np.asarray(actions, dtype=np.int32)
+        entry = self.__offsets.get(infoset)
+        if entry is None:
+            fill = np.zeros(self.field_num) if fill is None else np.array(fill, dtype=float)
+            entry = [0, np.empty(0, dtype=np.int32), fill]
+            self.__offsets[infoset] = entry
+        offset, block_actions, _ = entry
+        positions = np.searchsorted(block_actions, actions)
+        if len(block_actions) == 0 or np.any(block_actions[np.minimum(positions, len(block_actions) - 1)] != actions):
+            self.__extend(entry, actions)
+            offset, block_actions, _ = entry
+            positions = np.searchsorted(block_actions, actions)
+        return offset + positions
+
+    def __extend(self, entry, actions):
+        '''
+        Move the block of an infoset to the end of the arrays with the new actions.
+        '''
+        offset, block_actions, fill = entry
+        new_actions = np.union1d(block_actions, actions)
+        if self.__size + len(new_actions) > self.__data.shape[1]:
+            self.__reserve(len(new_actions))
+            # Compacting may move the block
+            offset = entry[0]
+        new_offset = self.__size
+        self.__data[:, new_offset:new_offset + len(new_actions)] = fill[:, None]
+        old_positions = np.searchsorted(new_actions, block_actions)
+        self.__data[:, new_offset + old_positions] = self.__data[:, offset:offset + len(block_actions)]
+        self.__size += len(new_actions)
+        self.__garbage += len(block_actions)
+        entry[0] = new_offset
+        entry[1] = new_actions
+
+    def __reserve(self, length):
+        '''
+        Make room for length more entries, by compacting or growing the arrays.
+        '''
+        if self.__garbage * 2 > self.__size:
+            self.__compact()
+        capacity = self.__data.shape[1]
+        if self.__size + length > capacity:
+            capacity = max(2 * capacity, self.__size + length)
+            data = np.zeros((self.field_num, capacity))
+            data[:, :self.__size] = self.__data[:, :self.__size]
+            self.__data = data
+
+    def __compact(self):
+        '''
+        Remove the moved-out blocks from the arrays.
+        '''
+        data = np.zeros_like(self.__data)
+        size = 0
+        for entry in self.__offsets.values():
+            offset, length = entry[0], len(entry[1])
+            data[:, size:size + length] = self.__data[:, offset:offset + length]
+            entry[0] = size
+            size += length
+        self.__data = data
+        self.__size = size
+        self.__garbage = 0
+
+    def field_view(self, field, length):
+        '''
+        Get a read-only mapping from infosets to the dense vectors of a field.
+
+        Args:
+            field (int): the index of the field
+            length (int): the length of the dense vectors
+
+        Returns:
+            (Mapping): infoset -> numpy.ndarray of shape (length,), the fill value for the actions not in the block
+        '''
+        return _DenseFieldView(self, field, length)
+
+
+class _DenseFieldView(Mapping):
+    def __init__(self, table, field, length):
+        self.__table = table
+        self.__field = field
+        self.__length = length
+
+    def __getitem__(self, infoset):
+        if infoset not in self.__table:
+            raise KeyError(infoset)
+        vector = np.full(self.__length, self.__table.get_fill(infoset)[self.__field], dtype=float)
+        vector[self.__table.get_actions(infoset)] = self.__table.get_block(infoset)[self.__field]
+        return vector
+
+    def __iter__(self):
+        return iter(self.__table)
+
+    def __len__(self):
+        return len(self.__table)
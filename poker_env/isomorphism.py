@@ -0,0 +1,390 @@
+import bisect
+import itertools
+from math import comb
+import numpy as np
+
+
+# Number of public cards in each betting round: pre-flop, flop, turn, river
+PUBLIC_CARDS_PER_ROUND = (0, 3, 4, 5)
+# Number of isomorphic hands in each betting round, and the offset of each round in the global index
+HAND_INDEX_SIZES = (169, 1286792, 13960050, 123156254)
+HAND_INDEX_OFFSETS = (0, 169, 1286961, 15247011)
+HAND_INDEX_NUM = 138403265
+RANK_NUM = 13
+SUIT_NUM = 4
+
+# Bit tables over 13-bit rank masks, built with the first HandIndexer (see _build_tables)
+_POPCOUNT_ARRAY = None
+_COLEX_ARRAY = None
+_BINOM_ARRAY = None
+_EXTRACT_LOW_ARRAY = None
+_EXTRACT_HIGH_ARRAY = None
+# Tables of HandIndexer.index, also built with the first HandIndexer.
+# The cards of a hand are packed into one int, 26 bits for each suit: hand rank mask << 13 | public rank mask.
+_HAND_BITS = None
+_PUBLIC_BITS = None
+# Key of each possible suit field: order of its count vector << _SUIT_KEY_SHIFT | pattern index (< 2^16).
+# The order is a power of 5, so the sum of the keys of 4 suits identifies the multiset of their count vectors.
+_SUIT_KEYS = None
+_SUIT_KEY_SHIFT = 18
+# _GROUP_TERMS[j][pattern_index] = C(pattern_index + j, j + 1)
+_GROUP_TERMS = None
+# Max number of hands cached by index_cards, the cache is cleared when it is full
+HAND_INDEX_CACHE_SIZE = 1 << 16
+_hand_index_cache = {}
+
+
+def _build_extract_table(bits):
+    '''
+    Build the table of extracting the bits of a value selected by a mask into the low bits (PEXT).
+    Entry (value << bits) | mask is the extracted value.
+    '''
+    values = np.arange(1 << bits)[:, None]
+    masks = np.arange(1 << bits)[None, :]
+    table = np.zeros((1 << bits, 1 << bits), dtype=np.int64)
+    # The number of selected bits below each bit
+    k = np.zeros_like(masks)
+    for p in range(bits):
+        selected = masks >> p & 1
+        table |= (values >> p & 1) * selected << k
+        k = k + selected
+    return table.ravel()
+
+
+def _get_suit_patterns(hand_masks, public_masks):
+    '''
+    Get the pattern index of suits: the ranks of hand cards and the ranks of public cards among the other ranks,
+    indexed in mixed radix.
+
+    Args:
+        hand_masks (numpy.ndarray): int64 rank masks of hand cards
+        public_masks (numpy.ndarray): int64 rank masks of public cards, the same shape
+    Returns:
+        (numpy.ndarray): the pattern index of each suit
+    '''
+    hand_counts = _POPCOUNT_ARRAY[hand_masks]
+    public_counts = _POPCOUNT_ARRAY[public_masks]
+    # Remove the bits of the hand ranks from the public rank mask
+    keep = ~hand_masks & 0x1FFF
+    compressed = _EXTRACT_LOW_ARRAY[(public_masks & 0x7F) << 7 | keep & 0x7F] \
+        | _EXTRACT_HIGH_ARRAY[(public_masks >> 7) << 6 | keep >> 7] << _POPCOUNT_ARRAY[keep & 0x7F]
+    return _COLEX_ARRAY[hand_masks] * _BINOM_ARRAY[RANK_NUM - hand_counts, public_counts] + _COLEX_ARRAY[compressed]
+
+
+def _build_tables():
+    '''
+    Build the bit tables. They are only needed once an indexer is created, so importing the module stays cheap.
+    '''
+    global _POPCOUNT_ARRAY, _COLEX_ARRAY, _BINOM_ARRAY, _EXTRACT_LOW_ARRAY, _EXTRACT_HIGH_ARRAY
+    global _HAND_BITS, _PUBLIC_BITS, _SUIT_KEYS, _GROUP_TERMS
+    if _POPCOUNT_ARRAY is not None:
+        return
+    bits = np.arange(1 << RANK_NUM)[:, None] >> np.arange(RANK_NUM) & 1
+    orders = np.cumsum(bits, axis=1)
+    # _BINOM_ARRAY[n][k] = C(n, k)
+    binom = np.array([[comb(n, k) for k in range(RANK_NUM + 1)] for n in range(RANK_NUM + 1)], dtype=np.int64)
+    # Colexicographic index of the set bits of a mask, sum of C(p_i, i + 1)
+    _COLEX_ARRAY = np.sum(bits * binom[np.arange(RANK_NUM), orders], axis=1)
+    _POPCOUNT_ARRAY = orders[:, -1].copy()
+    _BINOM_ARRAY = binom
+    _EXTRACT_LOW_ARRAY = _build_extract_table(7)
+    _EXTRACT_HIGH_ARRAY = _build_extract_table(RANK_NUM - 7)
+
+    _PUBLIC_BITS = [1 << (card // RANK_NUM * 26 + card % RANK_NUM) for card in range(RANK_NUM * SUIT_NUM)]
+    _HAND_BITS = [bit << RANK_NUM for bit in _PUBLIC_BITS]
+    # Every suit with at most 2 hand cards and 5 public cards
+    masks = np.arange(1 << RANK_NUM)
+    hand_masks, public_masks = np.meshgrid(masks[_POPCOUNT_ARRAY <= 2], masks[_POPCOUNT_ARRAY <= 5], indexing='ij')
+    valid = hand_masks & public_masks == 0
+    hand_masks, public_masks = hand_masks[valid], public_masks[valid]
+    patterns = _get_suit_patterns(hand_masks, public_masks)
+    # Count vectors in ascending order of (hand count, public count)
+    count_orders = 5 ** (_POPCOUNT_ARRAY[hand_masks] * 6 + _POPCOUNT_ARRAY[public_masks])
+    _SUIT_KEYS = dict(zip((hand_masks << RANK_NUM | public_masks).tolist(),
+                          (count_orders << _SUIT_KEY_SHIFT | patterns).tolist()))
+    # C(pattern_index + j, j + 1), computed step by step to stay exact
+    values = np.arange(patterns.max() + 1, dtype=np.int64)
+    _GROUP_TERMS = [values.tolist()]
+    for j in range(1, SUIT_NUM):
+        _GROUP_TERMS.append((np.array(_GROUP_TERMS[-1]) * (values + j) // (j + 1)).tolist())
+
+
+def _nth_unset(used_mask, n):
+    '''
+    Get the rank of the n-th (from 0) unused rank.
+    '''
+    for rank in range(RANK_NUM):
+        if not used_mask >> rank & 1:
+            if n == 0:
+                return rank
+            n -= 1
+    raise ValueError("There are not enough unused ranks.")
+
+
+def _colex_unrank(index, k):
+    '''
+    Get the positions p_0 < ... < p_{k-1} whose colexicographic index is index.
+    '''
+    positions = []
+    for i in range(k, 0, -1):
+        p = i - 1
+        while comb(p + 1, i) <= index:
+            p += 1
+        index -= comb(p, i)
+        positions.append(p)
+    return positions[::-1]
+
+
+class HandIndexer:
+    '''
+    A dense and bijective indexer of suit isomorphic hands.
+
+    Two hands are isomorphic if one can be turned into the other by permuting suits, keeping hand cards
+    as hand cards and public cards as public cards (the order of public cards does not matter). The indexer
+    maps every hand of a betting round into [0, size) and each index back to a canonical hand, with integer
+    operations only. The sizes are 169, 1286792, 13960050 and 123156254 from pre-flop to river.
+
+    Each suit is described by its count vector (the number of its hand cards and public cards) and its
+    pattern index (the ranks of its hand cards and public cards, indexed in mixed radix). A hand is the
+    multiset of the (count vector, pattern index) of its 4 suits.
+
+    Attributes:
+        bet_round (int): 0 for pre-flop, 1 for flop, 2 for turn, 3 for river
+        size (int): the number of isomorphic hands of the round
+    '''
+    def __init__(self, bet_round):
+        '''
+        Initialize a hand indexer.
+
+        Args:
+            bet_round (int): 0 for pre-flop, 1 for flop, 2 for turn, 3 for river
+        '''
+        if bet_round not in (0, 1, 2, 3):
+            raise ValueError("bet_round must be 0, 1, 2 or 3.")
+        self.bet_round = bet_round
+        _build_tables()
+        # Cards are dealt in groups: hand cards and public cards
+        self.cards_per_round = (2, PUBLIC_CARDS_PER_ROUND[bet_round])
+        self.rounds = len(self.cards_per_round)
+        self.card_num = sum(self.cards_per_round)
+
+        # Every possible count vector of a suit and its number of patterns
+        self.pattern_nums = {}
+        for counts in itertools.product(*[range(num + 1) for num in self.cards_per_round]):
+            pattern_num, used = 1, 0
+            for count in counts:
+                pattern_num *= comb(RANK_NUM - used, count)
+                used += count
+            self.pattern_nums[counts] = pattern_num
+
+        # Every configuration (count vectors of the 4 suits in descending order) and its offset.
+        # In index_batch(), a suit is packed into an int:
+        # count code (hand count << 3 | public count) << 16 | pattern index
+        self.configs = {}
+        self.config_list = []
+        self.config_offsets = []
+        self._config_keys = {}
+        offset = 0
+        for config in itertools.combinations_with_replacement(sorted(self.pattern_nums, reverse=True), SUIT_NUM):
+            if any(sum(counts[r] for counts in config) != num for r, num in enumerate(self.cards_per_round)):
+                continue
+            # Suits with the same count vector form a group, the group index is a multiset of pattern indices
+            groups = []
+            # For the suit at each position, its order j in the group and the multiplier of the group,
+            # the group index is the sum of C(pattern_index + j, j + 1) over the group
+            positions = []
+            multiplier = 1
+            for counts, group in itertools.groupby(config):
+                group_size = len(list(group))
+                group_num = comb(self.pattern_nums[counts] + group_size - 1, group_size)
+                groups.append((counts, group_size, group_num, multiplier))
+                positions.extend((j, multiplier) for j in range(group_size - 1, -1, -1))
+                multiplier *= group_num
+            self.configs[config] = (offset, groups)
+            self._config_keys[tuple(counts[0] << 3 | counts[1] for counts in config)] = (offset, positions)
+            self.config_list.append(config)
+            self.config_offsets.append(offset)
+            offset += multiplier
+        self.size = offset
+        self._batch_tables = None
+        # For index(): the offset of each configuration, and the group term table and multiplier of the suit at
+        # each position, keyed by the sum of the orders of its count vectors. Suits are sorted in ascending order.
+        self._config_tables = {}
+        for codes, (offset, positions) in self._config_keys.items():
+            config_key = sum(5 ** ((code >> 3) * 6 + (code & 7)) for code in codes)
+            self._config_tables[config_key] = (offset, *(item for j, multiplier in reversed(positions)
+                                                         for item in (_GROUP_TERMS[j], multiplier)))
+
+    def index(self, cards):
+        '''
+        Index a hand.
+
+        The key of each suit is a dict lookup of its rank masks, and the multiset of the 4 keys is indexed with
+        precomputed group term tables, so there are no loops over suits.
+
+        Args:
+            cards (list): card ids (suit_index * 13 + rank_index) of hand cards followed by public cards
+        Returns:
+            (int): the index of the hand in [0, size)
+        '''
+        field = _HAND_BITS[cards[0]] | _HAND_BITS[cards[1]]
+        for card in cards[2:]:
+            field |= _PUBLIC_BITS[card]
+        suits = [_SUIT_KEYS[field & 0x3FFFFFF], _SUIT_KEYS[field >> 26 & 0x3FFFFFF],
+                 _SUIT_KEYS[field >> 52 & 0x3FFFFFF], _SUIT_KEYS[field >> 78]]
+        suits.sort()
+        suit0, suit1, suit2, suit3 = suits
+        index, terms0, multiplier0, terms1, multiplier1, terms2, multiplier2, terms3, multiplier3 = \
+            self._config_tables[(suit0 + suit1 + suit2 + suit3) >> _SUIT_KEY_SHIFT]
+        return index + terms0[suit0 & 0xFFFF] * multiplier0 + terms1[suit1 & 0xFFFF] * multiplier1 \
+            + terms2[suit2 & 0xFFFF] * multiplier2 + terms3[suit3 & 0xFFFF] * multiplier3
+
+    def _get_batch_tables(self):
+        '''
+        Build the numpy tables of index_batch.
+        '''
+        if self._batch_tables is None:
+            config_codes = sorted(self._config_keys)
+            self._batch_tables = (
+                np.array([sum(code << 5 * (SUIT_NUM - 1 - i) for i, code in enumerate(codes))
+                          for codes in config_codes], dtype=np.int64),
+                np.array([self._config_keys[codes][0] for codes in config_codes], dtype=np.int64),
+                np.array([[j for j, _ in self._config_keys[codes][1]] for codes in config_codes], dtype=np.int64),
+                np.array([[multiplier for _, multiplier in self._config_keys[codes][1]]
+                          for codes in config_codes], dtype=np.int64))
+        return self._batch_tables
+
+    def index_batch(self, cards):
+        '''
+        Index many hands at once.
+
+        Args:
+            cards (numpy.ndarray): shape (N, card_num), card ids of hand cards followed by public cards
+        Returns:
+            (numpy.ndarray): shape (N,), int64 index of each hand
+        '''
+        cards = np.asarray(cards, dtype=np.int64)
+        if cards.ndim != 2 or cards.shape[1] != self.card_num:
+            raise ValueError("cards must be of shape (N, {}).".format(self.card_num))
+        config_codes, offsets, orders, multipliers = self._get_batch_tables()
+        rows = np.arange(len(cards))
+        suits = cards // RANK_NUM
+        bits = np.left_shift(1, cards % RANK_NUM)
+        hand_masks = np.zeros((len(cards), SUIT_NUM), dtype=np.int64)
+        public_masks = np.zeros((len(cards), SUIT_NUM), dtype=np.int64)
+        for i in range(self.card_num):
+            masks = hand_masks if i < 2 else public_masks
+            masks[rows, suits[:, i]] |= bits[:, i]
+
+        keys = (_POPCOUNT_ARRAY[hand_masks] << 3 | _POPCOUNT_ARRAY[public_masks]) << 16 \
+            | _get_suit_patterns(hand_masks, public_masks)
+        keys = np.sort(keys, axis=1)[:, ::-1]
+
+        codes = keys >> 16
+        config_index = np.searchsorted(config_codes,
+                                       codes[:, 0] << 15 | codes[:, 1] << 10 | codes[:, 2] << 5 | codes[:, 3])
+        orders = orders[config_index]
+        # C(pattern_index + j, j + 1), computed step by step to stay exact
+        values = (keys & 0xFFFF) + orders
+        group_terms = values.copy()
+        for k in range(1, SUIT_NUM):
+            group_terms = np.where(orders >= k, group_terms * (values - k) // (k + 1), group_terms)
+        return offsets[config_index] + np.sum(group_terms * multipliers[config_index], axis=1)
+
+    def unindex(self, index):
+        '''
+        Get the canonical hand of an index.
+
+        Args:
+            index (int): the index of the hand in [0, size)
+        Returns:
+            (list): card ids of hand cards followed by public cards, each group is sorted
+        '''
+        if not 0 <= index < self.size:
+            raise ValueError("index is out of range.")
+        config = self.config_list[bisect.bisect_right(self.config_offsets, index) - 1]
+        offset, groups = self.configs[config]
+        index -= offset
+
+        suits = []
+        for counts, group_size, group_num, multiplier in groups:
+            group_index = index // multiplier % group_num
+            positions = _colex_unrank(group_index, group_size)
+            # Recover the pattern indices in descending order
+            suits.extend((counts, positions[j] - j) for j in range(group_size - 1, -1, -1))
+
+        round_cards = [[] for _ in range(self.rounds)]
+        for suit, (counts, pattern_index) in enumerate(suits):
+            # Decode the mixed radix pattern index from the last round
+            round_indices = []
+            used = sum(counts)
+            for count in reversed(counts):
+                used -= count
+                radix = comb(RANK_NUM - used, count)
+                round_indices.append(pattern_index % radix)
+                pattern_index //= radix
+            used_mask = 0
+            for r, (count, round_index) in enumerate(zip(counts, reversed(round_indices))):
+                rank_mask = 0
+                for position in _colex_unrank(round_index, count):
+                    rank_mask |= 1 << _nth_unset(used_mask, position)
+                for rank in range(RANK_NUM):
+                    if rank_mask >> rank & 1:
+                        round_cards[r].append(suit * RANK_NUM + rank)
+                used_mask |= rank_mask
+        return [card for cards in round_cards for card in sorted(cards)]
+
+
+_indexers = {}
+
+
+def get_hand_indexer(bet_round):
+    '''
+    Get the shared hand indexer of a betting round.
+
+    Args:
+        bet_round (int): 0 for pre-flop, 1 for flop, 2 for turn, 3 for river
+    Returns:
+        (HandIndexer): the hand indexer
+    '''
+    if bet_round not in _indexers:
+        _indexers[bet_round] = HandIndexer(bet_round)
+    return _indexers[bet_round]
+
+
+def index_hand(cards):
+    '''
+    Get the global index of a hand, unique across all betting rounds.
+
+    Args:
+        cards (list): card ids of 2 hand cards followed by 0, 3, 4 or 5 public cards
+    Returns:
+        (int): the index in [0, HAND_INDEX_NUM), indices of each round are contiguous
+    '''
+    bet_round = max(0, len(cards) - 4)
+    indexer = _indexers.get(bet_round)
+    if indexer is None:
+        indexer = get_hand_indexer(bet_round)
+    return HAND_INDEX_OFFSETS[bet_round] + indexer.index(cards)
+
+
+def index_cards(hand_cards, public_cards):
+    '''
+    Get the global index of a hand given by Card objects, see index_hand.
+
+    Tree search asks for the same hand at many nodes, so the indices are cached by the cards (Card objects are
+    shared instances, hashed by identity). A cache hit costs a tuple and a dict lookup.
+
+    Args:
+        hand_cards (list): 2 Card objects
+        public_cards (list): 0, 3, 4 or 5 Card objects
+    Returns:
+        (int): the index in [0, HAND_INDEX_NUM)
+    '''
+    key = (*hand_cards, *public_cards)
+    index = _hand_index_cache.get(key)
+    if index is None:
+        if len(_hand_index_cache) >= HAND_INDEX_CACHE_SIZE:
+            _hand_index_cache.clear()
+        index = _hand_index_cache[key] = index_hand([card.id for card in key])
+    return index
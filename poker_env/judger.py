@@ -1,14 +1,52 @@
-from poker_env.utils import compare_all_hands
+import functools
+from math import comb
+import numpy as np
+from poker_env.evaluator import evaluate_hand, evaluate_batch, colex_combinations
+
+
+# Number of cards in a deck
+CARD_NUM = 52
+# The max number of runouts judge_all_in_ev enumerates, more runouts are sampled
+MAX_RUNOUTS = 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _get_combinations(n, k):
+    return colex_combinations(n, k).astype(np.intp)
+
+
+def _sample_combinations(rng, n, k, num):
+    '''
+    Sample num k-combinations of range(n) uniformly.
+    '''
+    return np.argpartition(rng.random((num, n)), k - 1, axis=1)[:, :k]
 
 
 class NoLimitTexasHoldemJudger:
     '''
     The Judger class for No Limit Texas Hold'em Poker.
     '''
-    def __init__(self):
+    def __init__(self, max_runouts=MAX_RUNOUTS, rng=None):
         '''
         Initialize a judger class.
+
+        Args:
+            max_runouts (int): the max number of runouts judge_all_in_ev enumerates, None means no limit
+            rng (numpy.random.Generator or int or SeedSequence): the random generator of the sampled runouts,
+                or its seed
         '''
+        self.max_runouts = max_runouts
+        self.seed(rng)
+
+    def seed(self, rng=None):
+        '''
+        Reset the random generator of the sampled runouts.
+
+        Args:
+            rng (numpy.random.Generator or int or SeedSequence): the random generator, or its seed
+        '''
+        self.rng = np.random.default_rng(rng)
+
     def judge_game(self, players, hands):
         '''
         Judge the winner of the game.
@@ -19,14 +57,32 @@ class NoLimitTexasHoldemJudger:
         Returns:
             (list): Each entry of the list corresponds to one entry of the plays.
         '''
-        # Convert the hands into card indexes
-        for i, hand in enumerate(hands):
-            if hands[i] is not None:
-                h = [card.get_index() for card in hand]
-                hands[i] = h
+        # Evaluate each hand only once, the rank is None for folded players
+        ranks = [None for _ in hands]
+        live_players = [i for i, hand in enumerate(hands) if hand is not None]
+        if len(live_players) == 1:
+            # The only player left wins without showdown, the hand needs no evaluation
+            ranks[live_players[0]] = 0
+        else:
+            for i in live_players:
+                ranks[i] = evaluate_hand([card.id for card in hands[i]])
 
         payoffs = [float(-p.in_chips) for p in players]
+        # Split the Main Pot(side_pots[0]) and the Side Pots(side_pots[1:])
+        for pot in self.get_pots(players):
+            self.split_pot(pot, ranks, payoffs)
 
+        return payoffs
+
+    def get_pots(self, players):
+        '''
+        Divide the chips that the players have put in into the Main Pot and the Side Pots.
+
+        Args:
+            players (list): The list of the players who play the game.
+        Returns:
+            (list): the pots from the Main Pot to the last Side Pot, each pot is the chips that each player put into it.
+        '''
         # Compute the total chips and divide the Main/Side Pot
         main_pot = [p.in_chips for p in players]
         all_in_amounts = []
@@ -35,39 +91,83 @@ class NoLimitTexasHoldemJudger:
                 if p.in_chips not in all_in_amounts:
                     all_in_amounts.append(p.in_chips)
 
-        # If there is no Side Pot
-        if len(all_in_amounts) == 0:
-            winners = compare_all_hands(hands)
-            each_win = float(sum(main_pot)) / sum(winners)
-            for i, _ in enumerate(players):
-                if winners[i] == 1:
-                    payoffs[i] += each_win
+        all_in_amounts = sorted(all_in_amounts)
+        side_pots = []
+        previous_all_in = 0
+        for all_in_amount in all_in_amounts:
+            all_in_increase = all_in_amount - previous_all_in
+            previous_all_in = all_in_amount
+            side_pots.append(
+                [min(chips, all_in_increase) for chips in main_pot])
+            main_pot = list(
+                map(lambda chips: max(chips - all_in_increase, 0),
+                    main_pot))
+        side_pots.append(main_pot)
+        return side_pots
+
+    def judge_all_in_ev(self, players, public_cards):
+        '''
+        Judge the expected payoffs of a game whose betting is over before the board is complete (Eg: every remaining
+        player is all-in), over every runout of the remaining public cards instead of the dealt one.
+
+        The runouts are drawn from the cards that are not dealt to any player or the board. They are enumerated
+        if there are at most max_runouts of them, otherwise max_runouts runouts are sampled uniformly by the random
+        generator of the judger, so the samples are reproducible by its seed and independent across calls.
+
+        Args:
+            players (list): The list of the players who play the game, with their hand cards.
+            public_cards (list): The public cards dealt when the betting was over, less than 5 cards.
+        Returns:
+            (list): Each entry of the list corresponds to one entry of the plays.
+        '''
+        live_players = [i for i, p in enumerate(players) if p.status != 'folded']
+        # The hands of folded players are not in the deck either
+        dealt_ids = [card.id for p in players for card in p.hand]
+        public_ids = [card.id for card in public_cards]
+        deck = np.setdiff1d(np.arange(CARD_NUM), dealt_ids + public_ids)
+        runout_num = 5 - len(public_ids)
+        if self.max_runouts is None or comb(len(deck), runout_num) <= self.max_runouts:
+            runouts = deck[_get_combinations(len(deck), runout_num)]
         else:
-            all_in_amounts = sorted(all_in_amounts)
-            side_pots = []
-            previous_all_in = 0
-            for all_in_amount in all_in_amounts:
-                all_in_increase = all_in_amount - previous_all_in
-                previous_all_in = all_in_amount
-                side_pots.append(
-                    [min(chips, all_in_increase) for chips in main_pot])
-                main_pot = list(
-                    map(lambda chips: max(chips - all_in_increase, 0),
-                        main_pot))
-            side_pots.append(main_pot)
-            # Split the Main Pot(side_pots[0]) and the Side Pots(side_pots[1:])
-            for pot in side_pots:
-                hands = list(
-                    map(lambda hand, chips: hand
-                        if (chips != 0) else None, hands, pot))
-                pot_winners = compare_all_hands(hands)
-                each_win = float(sum(pot)) / sum(pot_winners)
-                for i, _ in enumerate(players):
-                    if pot_winners[i] == 1:
-                        payoffs[i] += each_win
+            runouts = deck[_sample_combinations(self.rng, len(deck), runout_num, self.max_runouts)]
+        boards = np.concatenate([np.tile(public_ids, (len(runouts), 1)), runouts], axis=1)
+        ranks = np.zeros((len(players), len(boards)), dtype=np.int32)
+        for i in live_players:
+            hands = np.concatenate([np.tile([card.id for card in players[i].hand], (len(boards), 1)), boards], axis=1)
+            evaluate_batch(hands, out=ranks[i])
 
+        payoffs = [float(-p.in_chips) for p in players]
+        for pot in self.get_pots(players):
+            contenders = [i for i, chips in enumerate(pot) if chips != 0 and i in live_players]
+            if len(contenders) == 0:
+                continue
+            contender_ranks = ranks[contenders]
+            winners = contender_ranks == contender_ranks.max(axis=0)
+            # The expected share of the pot of each contender
+            shares = (winners / winners.sum(axis=0)).mean(axis=1) * float(sum(pot))
+            for i, share in zip(contenders, shares):
+                payoffs[i] += share
         return payoffs
 
+    def split_pot(self, pot, ranks, payoffs):
+        '''
+        Split a pot among the players with the best hand rank who put chips into it.
+
+        Args:
+            pot (list): The chips that each player put into the pot.
+            ranks (list): The hand rank of each player, None for folded players.
+            payoffs (list): The payoffs of the players, updated in place.
+        '''
+        contenders = [i for i, chips in enumerate(pot) if chips != 0 and ranks[i] is not None]
+        # No live player put chips into the pot
+        if len(contenders) == 0:
+            return
+        best_rank = max(ranks[i] for i in contenders)
+        winners = [i for i in contenders if ranks[i] == best_rank]
+        each_win = float(sum(pot)) / len(winners)
+        for i in winners:
+            payoffs[i] += each_win
+
 
 # from player import NoLimitTexasHoldemPlayer as Player
 # from card import Card
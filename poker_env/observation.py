@@ -0,0 +1,175 @@
+import numpy as np
+from poker_env.action import get_action_space, get_legal_action_mask
+
+
+# Number of cards in a deck
+CARD_NUM = 52
+# Number of betting rounds
+ROUND_NUM = 4
+
+
+class ObservationEncoder:
+    '''
+    Encode PokerState objects into numeric observations, written into caller-provided buffers.
+
+    The observation of a state is the view of its player. Seats are ordered relative to the player
+    (the player first, then the next seats clockwise), and chips are counted in big blinds:
+        hand: one-hot of the hand cards (by card id)
+        public: one-hot of the public cards
+        pot: the chips each seat has put in
+        stack: the chips each seat has not put in
+        total_pot: the chips all the seats have put in
+        position: one-hot of the seat of the player relative to the button
+        round: one-hot of the betting round
+        legal: the legal action mask over the action space of the env
+
+    Attributes:
+        num_players (int): the number of players
+        big_blind (int): the number of Big Blind(BB) chips
+        init_chips (int or list): chips that each player holds when game starts
+        action_space (list): the action space of the env
+        slices (dict): the slice of each part above in the observation
+        observation_shape (tuple): the shape of an observation
+        max_chips (float): the max chips of an observation in big blinds, the total chips of all the players
+    '''
+    def __init__(self, num_players=2, big_blind=2, init_chips=100):
+        '''
+        Initialize the encoder for the env with the same arguments.
+
+        Args:
+            num_players (int): the number of players
+            big_blind (int): the number of Big Blind(BB) chips
+            init_chips (int or list): chips that each player holds when game starts
+        '''
+        self.num_players = num_players
+        self.big_blind = big_blind
+        self.init_chips = init_chips
+        self.action_space = get_action_space(big_blind, init_chips)
+        sizes = (('hand', CARD_NUM), ('public', CARD_NUM), ('pot', num_players), ('stack', num_players),
+                 ('total_pot', 1), ('position', num_players), ('round', ROUND_NUM),
+                 ('legal', len(self.action_space)))
+        self.slices = {}
+        start = 0
+        for name, size in sizes:
+            self.slices[name] = slice(start, start + size)
+            start += size
+        self.observation_shape = (start,)
+        # Seats ordered relative to each player
+        self.__seat_orders = [[(player_id + i) % num_players for i in range(num_players)]
+                              for player_id in range(num_players)]
+        self.__seat_order_array = np.array(self.__seat_orders, dtype=np.intp)
+        # The max chips of the observation in big blinds, the total pot when every player is all-in
+        total_chips = init_chips * num_players if isinstance(init_chips, int) else sum(init_chips)
+        self.max_chips = total_chips / big_blind
+
+    def encode(self, state, out=None):
+        '''
+        Encode a state.
+
+        Args:
+            state (PokerState): the state, from NoLimitTexasHoldemGame.get_state
+            out (numpy.ndarray): optional, shape observation_shape, the buffer to fill. Float buffers are
+                                 recommended, integer buffers get chips rounded and must hold max_chips
+                                 (Eg: int8 is rejected if the total chips are more than 127 big blinds).
+
+        Returns:
+            (numpy.ndarray): the observation
+        '''
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=np.float32)
+        self.__check_dtype(out)
+        out[:] = 0
+        for card in state.hand_cards:
+            out[card.id] = 1
+        for card in state.public_cards:
+            out[CARD_NUM + card.id] = 1
+        slices = self.slices
+        player_id = state.player_id
+        order = self.__seat_orders[player_id]
+        pot = state.pot
+        remained_chips = state.remained_chips
+        chips = [pot[seat] for seat in order] + [remained_chips[seat] for seat in order] + [sum(pot)]
+        self.__set_chips(out, slice(slices['pot'].start, slices['total_pot'].stop), chips)
+        out[slices['position'].start + (player_id - state.button) % self.num_players] = 1
+        out[slices['round'].start + state.get_bet_round()] = 1
+        get_legal_action_mask(state.legal_actions, self.big_blind, self.init_chips, out[slices['legal']])
+        return out
+
+    def encode_batch(self, states, out=None):
+        '''
+        Encode states into one contiguous array. The loop over the states only copies their fields into arrays
+        of the whole batch, then the one-hot parts, the chips and the legal action masks of all the states are
+        written by a few vectorized operations.
+
+        Args:
+            states (list): PokerState objects
+            out (numpy.ndarray): optional, shape (len(states), *observation_shape), the buffer to fill
+
+        Returns:
+            (numpy.ndarray): the observations
+        '''
+        state_num = len(states)
+        if out is None:
+            out = np.empty((state_num,) + self.observation_shape, dtype=np.float32)
+        self.__check_dtype(out)
+        out[:state_num] = 0
+        player_num = self.num_players
+        # The one-hot columns of the hand and public cards, -1 for the cards not dealt
+        card_columns = np.full((state_num, 7), -1, dtype=np.intp)
+        # The player, the button, the betting round, fold, check, call, min raise, raise number and all-in
+        fields = np.empty((state_num, 9), dtype=np.intp)
+        pots = np.empty((state_num, player_num))
+        stacks = np.empty((state_num, player_num))
+        for row, state in enumerate(states):
+            columns = card_columns[row]
+            for i, card in enumerate(state.hand_cards):
+                columns[i] = card.id
+            for i, card in enumerate(state.public_cards, 2):
+                columns[i] = CARD_NUM + card.id
+            legal_actions = state.legal_actions
+            fields[row] = (state.player_id, state.button, state.get_bet_round(), legal_actions.fold,
+                           legal_actions.check, legal_actions.call, legal_actions.min_raise,
+                           legal_actions.raise_num, legal_actions.all_in)
+            pots[row] = state.pot
+            stacks[row] = state.remained_chips
+        rows = np.arange(state_num)
+        observations = out[:state_num]
+        card_rows, card_indices = np.nonzero(card_columns >= 0)
+        observations[card_rows, card_columns[card_rows, card_indices]] = 1
+        player_ids = fields[:, 0]
+        slices = self.slices
+        observations[rows, slices['position'].start + (player_ids - fields[:, 1]) % player_num] = 1
+        observations[rows, slices['round'].start + fields[:, 2]] = 1
+
+        orders = self.__seat_order_array[player_ids]
+        chips = np.empty((state_num, 2 * player_num + 1))
+        chips[:, :player_num] = np.take_along_axis(pots, orders, axis=1)
+        chips[:, player_num:-1] = np.take_along_axis(stacks, orders, axis=1)
+        chips[:, -1] = pots.sum(axis=1)
+        self.__set_chips(observations, (slice(None), slice(slices['pot'].start, slices['total_pot'].stop)), chips)
+
+        # Raise actions are consecutive in the action space, see get_legal_action_mask
+        legal = observations[:, slices['legal']]
+        legal[:, :3] = fields[:, 3:6]
+        min_raise_indices = 3 + fields[:, 6:7] - self.big_blind
+        raise_indices = np.arange(3, len(self.action_space) - 1)
+        legal[:, 3:-1] = (raise_indices >= min_raise_indices) & (raise_indices < min_raise_indices + fields[:, 7:8])
+        legal[:, -1] = fields[:, 8]
+        return out
+
+    def __check_dtype(self, out):
+        '''
+        Reject integer buffers that cannot hold the chips in big blinds.
+        '''
+        if np.issubdtype(out.dtype, np.integer) and np.iinfo(out.dtype).max < self.max_chips:
+            raise ValueError("{} buffers cannot hold {} big blinds of chips, use a wider dtype."
+                             .format(out.dtype, self.max_chips))
+
+    def __set_chips(self, out, index, chips):
+        '''
+        Write chips in big blinds.
+        '''
+        chips = np.divide(chips, self.big_blind)
+        if np.issubdtype(out.dtype, np.integer):
+            chips = np.rint(chips)
+        out[index] = chips
@@ -1,23 +1,67 @@
+from poker_env.table import NoLimitTexasHoldemTable as Table, STATUS_NAMES, STATUS_CODES
+
+
 class NoLimitTexasHoldemPlayer:
     '''
     The Player class for No Limit Texas Hold'em Poker.
+
+    The chips and status of the player are stored in a seat of a NoLimitTexasHoldemTable,
+    the player is a view of the seat.
     '''
-    def __init__(self, player_id, init_chips):
+    def __init__(self, player_id, init_chips, table=None):
         '''
         Initialize a player class.
 
         Args:
             player_id (int): The id of the player
             init_chips (int): The number of chips the player has initially
+            table (NoLimitTexasHoldemTable): optional, the table of the game whose seat player_id
+                                             belongs to the player. Default is a table of its own.
         '''
         self.player_id = player_id
-        self.init_chips = init_chips
+        if table is None:
+            table = Table([init_chips])
+            self.seat = 0
+        else:
+            self.seat = player_id
+        self.table = table
+        self.hand = []
+
+    @property
+    def init_chips(self):
+        return self.table.init_chips[self.seat]
+
+    @property
+    def in_chips(self):
         # The chips that this player has put in until now
-        self.in_chips = 0
+        return self.table.in_chips[self.seat]
 
-        self.hand = []
+    @in_chips.setter
+    def in_chips(self, chips):
+        self.table.set_in_chips(self.seat, chips)
+
+    @property
+    def status(self):
         # Status can be alive, folded, all-in
-        self.status = 'alive'
+        return STATUS_NAMES[self.table.status[self.seat]]
+
+    @status.setter
+    def status(self, status):
+        self.table.set_status(self.seat, STATUS_CODES[status])
+
+    def clone(self, table=None):
+        '''
+        Copy the player, the copy shares the Card objects of the hand.
+
+        Args:
+            table (NoLimitTexasHoldemTable): the table of the copy, default is a copy of the table
+        '''
+        player = NoLimitTexasHoldemPlayer.__new__(NoLimitTexasHoldemPlayer)
+        player.player_id = self.player_id
+        player.seat = self.seat
+        player.table = self.table.clone() if table is None else table
+        player.hand = self.hand.copy()
+        return player
 
     def get_player_id(self):
         '''
@@ -29,7 +73,7 @@ class NoLimitTexasHoldemPlayer:
         '''
         Return the remained chips of the player
         '''
-        return self.init_chips - self.in_chips
+        return self.table.get_remained_chips(self.seat)
 
     def get_action(self, state):
         '''
@@ -0,0 +1,166 @@
+import os
+import argparse
+import numpy as np
+from poker_env.card import Card
+from poker_env.state import PokerState
+from poker_env.utils import init_52_deck
+from poker_env.evaluator import evaluate_batch
+from poker_env.equity import monte_carlo_equity, to_card_ids
+
+
+# Default path of the pre-flop table built by `python -m poker_env.preflop build`
+PREFLOP_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_table.npy')
+# The table holds equity against 1 to MAX_OPPONENT_NUM random opponents
+MAX_OPPONENT_NUM = 9
+HISTOGRAM_BINS = 50
+
+PREFLOP_TABLE_DTYPE = np.dtype([('key', 'U4'),
+                                ('equity', np.float32, (MAX_OPPONENT_NUM,)),
+                                ('histogram', np.float32, (HISTOGRAM_BINS,))])
+
+# Lazily loaded pre-flop table and the row of each key
+_preflop_table = None
+_preflop_rows = None
+
+
+def get_preflop_key(hand_cards):
+    '''
+    Get the lossless pre-flop key of 2 hand cards, the same as PokerState.get_lossless_abstraction.
+
+    Args:
+        hand_cards (list): 2 Card objects
+    Returns:
+        (str): Eg: 'AsAc', 'AsKs', 'AsKc'
+    '''
+    state = PokerState(player_id=0, pot=[], hand_cards=hand_cards, public_cards=[], legal_actions=[])
+    return ''.join(state.get_lossless_abstraction())
+
+
+def get_preflop_keys():
+    '''
+    Get the keys of the 169 strategically distinct starting hands in sorted order.
+    '''
+    deck = init_52_deck()
+    return sorted({get_preflop_key([card0, card1]) for i, card0 in enumerate(deck) for card1 in deck[i + 1:]})
+
+
+def multiway_equity(hand_cards, opponent_num, sample_num, rng):
+    '''
+    Estimate the pre-flop equity of a hand against several random opponents by sampling deals.
+
+    Args:
+        hand_cards (list): 2 hand card ids
+        opponent_num (int): the number of opponents
+        sample_num (int): the number of sampled deals
+        rng (numpy.random.Generator): the random generator
+
+    Returns:
+        (float): the expected share of the pot, ties split the pot evenly
+    '''
+    deck = np.array(sorted(set(range(52)) - set(hand_cards)), dtype=np.intp)
+    deals = deck[np.argsort(rng.random((sample_num, len(deck))), axis=1)[:, :5 + 2 * opponent_num]]
+    cards = np.empty((sample_num, opponent_num + 1, 7), dtype=np.intp)
+    cards[:, :, :5] = deals[:, None, :5]
+    cards[:, 0, 5:] = hand_cards
+    cards[:, 1:, 5:] = deals[:, 5:].reshape(sample_num, opponent_num, 2)
+    ranks = evaluate_batch(cards.reshape(-1, 7)).reshape(sample_num, opponent_num + 1)
+    winners = ranks == ranks.max(axis=1, keepdims=True)
+    return float(np.mean(winners[:, 0] / winners.sum(axis=1)))
+
+
+def build_preflop_table(path=PREFLOP_TABLE_PATH, sample_num=20000, histogram_sample_num=2000, seed=0):
+    '''
+    Build the pre-flop table and write it to a .npy file.
+
+    Args:
+        path (str): the path of the table file
+        sample_num (int): the number of sampled deals for each equity
+        histogram_sample_num (int): the number of sampled runouts for each EHS histogram
+        seed (int): the seed of the random generator
+    '''
+    rng = np.random.default_rng(seed)
+    keys = get_preflop_keys()
+    table = np.zeros(len(keys), dtype=PREFLOP_TABLE_DTYPE)
+    for i, key in enumerate(keys):
+        # The key itself is a hand of the class
+        hand_cards = to_card_ids([key[:2], key[2:]])
+        table[i]['key'] = key
+        for opponent_num in range(1, MAX_OPPONENT_NUM + 1):
+            table[i]['equity'][opponent_num - 1] = multiway_equity(hand_cards, opponent_num, sample_num, rng)
+        table[i]['histogram'] = monte_carlo_equity(hand_cards, bins=HISTOGRAM_BINS, tolerance=0,
+                                                   min_samples=histogram_sample_num,
+                                                   max_samples=histogram_sample_num, rng=rng).histogram
+    np.save(path, table)
+
+
+def load_preflop_table(path=None):
+    '''
+    Load the pre-flop table, which has one row for each of the 169 starting hands.
+
+    Args:
+        path (str): the path of the table file, default is PREFLOP_TABLE_PATH
+    Returns:
+        (numpy.ndarray): the table with fields key, equity and histogram
+    '''
+    global _preflop_table, _preflop_rows
+    _preflop_table = np.load(PREFLOP_TABLE_PATH if path is None else path)
+    _preflop_rows = {key: i for i, key in enumerate(_preflop_table['key'].tolist())}
+    return _preflop_table
+
+
+def _get_row(key):
+    '''
+    Get the row of a starting hand in the pre-flop table.
+
+    Args:
+        key (str or list): the pre-flop key or 2 hand cards
+    '''
+    if _preflop_table is None:
+        load_preflop_table()
+    if not isinstance(key, str):
+        key = get_preflop_key(key) if isinstance(key[0], Card) else ''.join(key)
+    return _preflop_table[_preflop_rows[key]]
+
+
+def get_preflop_equity(key, opponent_num=1):
+    '''
+    Get the pre-flop equity of a starting hand against random opponents.
+
+    Args:
+        key (str or list): the pre-flop key (Eg: 'AsKs'), the lossless abstraction or 2 hand Card objects
+        opponent_num (int): the number of opponents, from 1 to 9
+    Returns:
+        (float): the expected share of the pot
+    '''
+    return float(_get_row(key)['equity'][opponent_num - 1])
+
+
+def get_preflop_histogram(key):
+    '''
+    Get the EHS histogram of a starting hand against a random opponent.
+
+    Args:
+        key (str or list): the pre-flop key (Eg: 'AsKs'), the lossless abstraction or 2 hand Card objects
+    Returns:
+        (numpy.ndarray): the probability histogram of hand strength over all runouts
+    '''
+    return _get_row(key)['histogram']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-flop table tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="build the pre-flop equity and EHS histogram table")
+    build_parser.add_argument('-o', '--output', default=PREFLOP_TABLE_PATH, help="path of the table file")
+    build_parser.add_argument('-n', '--samples', type=int, default=20000, help="sampled deals for each equity")
+    build_parser.add_argument('--histogram_samples', type=int, default=2000,
+                              help="sampled runouts for each EHS histogram")
+    build_parser.add_argument('--seed', type=int, default=0, help="seed of the random generator")
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_preflop_table(args.output, args.samples, args.histogram_samples, args.seed)
+        print("Pre-flop table is saved to {}".format(args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+import traceback
+import collections
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from poker_env.env import NoLimitTexasHoldemEnv as Env
+from poker_env.observation import ObservationEncoder
+
+
+# The trajectories collected by the pool, the decisions of each game are grouped by player
+# game_ids (numpy.ndarray): shape (N,), the game of each decision, counted from 0 in the batch
+# player_ids (numpy.ndarray): shape (N,), the player who makes each decision
+# observations (numpy.ndarray): shape (N, *observation_shape), encoded by poker_env.observation.ObservationEncoder
+# actions (numpy.ndarray): shape (N,), the index of each action in the action space of the env
+# payoffs (numpy.ndarray): shape (G, num_players), the payoffs of each game
+Rollout = collections.namedtuple('Rollout', ['game_ids', 'player_ids', 'observations', 'actions', 'payoffs'])
+
+
+def _get_encoder(env_kwargs):
+    '''
+    Create the observation encoder of the env created by env_kwargs.
+    '''
+    return ObservationEncoder(**{key: env_kwargs[key] for key in ('num_players', 'big_blind', 'init_chips')
+                                 if key in env_kwargs})
+
+
+def _get_step_dtype(observation_shape):
+    return np.dtype([('game', np.int32), ('player_id', np.int8), ('action', np.int32),
+                     ('observation', np.float32, observation_shape)])
+
+
+def _get_buffers(buf, num_players, observation_shape, step_capacity, games_per_batch):
+    '''
+    Create the numpy views of the steps and payoffs of a batch on a shared memory buffer.
+    '''
+    step_dtype = _get_step_dtype(observation_shape)
+    steps = np.ndarray((step_capacity,), dtype=step_dtype, buffer=buf)
+    payoffs = np.ndarray((games_per_batch, num_players), dtype=np.float64, buffer=buf,
+                         offset=step_capacity * step_dtype.itemsize)
+    return steps, payoffs
+
+
+def _get_buffer_size(num_players, observation_shape, step_capacity, games_per_batch):
+    return step_capacity * _get_step_dtype(observation_shape).itemsize + games_per_batch * num_players * 8
+
+
+def _make_env(env_kwargs, rng, agents):
+    env = Env(seed=rng, **env_kwargs)
+    env.set_agents(agents)
+    return env
+
+
+def _rollout_worker(worker_id, shm_name, agent_fn, env_kwargs, step_capacity, games_per_batch, seed,
+                    commands, results):
+    '''
+    The loop of a worker process. Each 'collect' command fills the shared buffer with one batch of games.
+    '''
+    shm = shared_memory.SharedMemory(name=shm_name)
+    steps = payoffs = None
+    try:
+        # Independent random streams of the worker: the env owns a generator, and agents draw from the global ones
+        env_seed, agent_seed = seed.spawn(2)
+        rng = np.random.default_rng(env_seed)
+        np.random.seed(agent_seed.generate_state(1)[0])
+        env = _make_env(env_kwargs, rng, agent_fn(None))
+        encoder = _get_encoder(env_kwargs)
+        steps, payoffs = _get_buffers(shm.buf, env.player_num, encoder.observation_shape, step_capacity,
+                                      games_per_batch)
+        while True:
+            command, params = commands.get()
+            if command == 'stop':
+                break
+            if command == 'refresh':
+                env.set_agents(agent_fn(params))
+                continue
+            step_num = 0
+            for game in range(games_per_batch):
+                trajectories, payoffs[game] = env.run(is_training=True)
+                game_step_num = sum(len(trajectory) for trajectory in trajectories) // 2
+                if step_num + game_step_num > step_capacity:
+                    raise ValueError("A batch of games needs more than step_capacity ({}) steps."
+                                     .format(step_capacity))
+                for player_id, trajectory in enumerate(trajectories):
+                    for i in range(0, len(trajectory), 2):
+                        state, action = trajectory[i], trajectory[i + 1]
+                        step = steps[step_num]
+                        step['game'] = game
+                        step['player_id'] = player_id
+                        step['action'] = env.get_action_index(action)
+                        encoder.encode(state, step['observation'])
+                        step_num += 1
+            results.put(('batch', worker_id, step_num))
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        results.put(('error', worker_id, traceback.format_exc()))
+    finally:
+        del steps, payoffs
+        shm.close()
+
+
+class RolloutPool:
+    '''
+    A pool of worker processes that generate self-play trajectories with env.run(is_training=True).
+
+    Each worker owns a NoLimitTexasHoldemEnv, its agents and an independent random stream. A worker plays
+    games_per_batch games at a time and writes the decisions (observations, actions) and payoffs into its own
+    shared memory buffer, and only a small message is sent back. The buffer is reused after the batch is
+    copied out by the pool.
+
+    Agents are created in the workers by agent_fn(params), which must be picklable (Eg: a module level function).
+    params is None at the start, refresh(params) recreates the agents of every worker with new params.
+
+    Attributes:
+        worker_num (int): the number of worker processes
+        action_space (list): the action space of the env, actions are indices of it
+        encoder (ObservationEncoder): the encoder of the observations
+    '''
+    def __init__(self, agent_fn, worker_num=None, env_kwargs=None, games_per_batch=16, step_capacity=4096, seed=0):
+        '''
+        Start the worker processes.
+
+        Args:
+            agent_fn (callable): agent_fn(params) returns the list of agents of a game
+            worker_num (int): the number of worker processes, default is the number of CPUs
+            env_kwargs (dict): the arguments of NoLimitTexasHoldemEnv
+            games_per_batch (int): the number of games of each batch
+            step_capacity (int): the max number of decisions of each batch
+            seed (int): the seed of the random streams of the workers
+        '''
+        self.worker_num = multiprocessing.cpu_count() if worker_num is None else worker_num
+        self.__env_kwargs = {} if env_kwargs is None else dict(env_kwargs)
+        env = Env(**self.__env_kwargs)
+        self.action_space = env.action_space
+        self.encoder = _get_encoder(self.__env_kwargs)
+        self.__player_num = env.player_num
+        self.__games_per_batch = games_per_batch
+        self.__step_capacity = step_capacity
+        self.__results = multiprocessing.Queue()
+        self.__commands = []
+        self.__shms = []
+        self.__buffers = []
+        self.__workers = []
+        # Workers that are filling their buffers
+        self.__busy = set()
+        observation_shape = self.encoder.observation_shape
+        size = _get_buffer_size(self.__player_num, observation_shape, step_capacity, games_per_batch)
+        seeds = np.random.SeedSequence(seed).spawn(self.worker_num)
+        for worker_id in range(self.worker_num):
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            commands = multiprocessing.Queue()
+            worker = multiprocessing.Process(
+                target=_rollout_worker,
+                args=(worker_id, shm.name, agent_fn, self.__env_kwargs, step_capacity, games_per_batch,
+                      seeds[worker_id], commands, self.__results),
+                daemon=True)
+            worker.start()
+            self.__shms.append(shm)
+            self.__buffers.append(_get_buffers(shm.buf, self.__player_num, observation_shape, step_capacity,
+                                               games_per_batch))
+            self.__commands.append(commands)
+            self.__workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def refresh(self, params):
+        '''
+        Recreate the agents of every worker by agent_fn(params). Batches in progress finish with the old agents.
+
+        Args:
+            params: the picklable parameters of the agents, Eg: a policy
+        '''
+        for commands in self.__commands:
+            commands.put(('refresh', params))
+
+    def collect(self, game_num):
+        '''
+        Collect trajectories of at least game_num games from the workers.
+
+        Args:
+            game_num (int): the number of games to collect
+
+        Returns:
+            (Rollout): the trajectories and payoffs
+        '''
+        batches = []
+        requested = len(self.__busy) * self.__games_per_batch
+        for worker_id in range(self.worker_num):
+            if requested >= game_num:
+                break
+            if worker_id not in self.__busy:
+                self.__request(worker_id)
+                requested += self.__games_per_batch
+        game_offset = 0
+        while self.__busy:
+            message, worker_id, value = self.__results.get()
+            if message == 'error':
+                raise RuntimeError("Rollout worker {} failed:\n{}".format(worker_id, value))
+            self.__busy.discard(worker_id)
+            steps, payoffs = self.__buffers[worker_id]
+            # Copy out the batch, then the buffer can be refilled
+            batch_steps = steps[:value].copy()
+            batch_steps['game'] += game_offset
+            batches.append((batch_steps, payoffs.copy()))
+            game_offset += self.__games_per_batch
+            if requested < game_num:
+                self.__request(worker_id)
+                requested += self.__games_per_batch
+        steps = np.concatenate([batch_steps for batch_steps, _ in batches])
+        return Rollout(game_ids=steps['game'], player_ids=steps['player_id'], observations=steps['observation'],
+                       actions=steps['action'], payoffs=np.concatenate([payoffs for _, payoffs in batches]))
+
+    def __request(self, worker_id):
+        self.__busy.add(worker_id)
+        self.__commands[worker_id].put(('collect', None))
+
+    def close(self, timeout=5):
+        '''
+        Stop the workers and release the shared memory. Workers finish their current batch first,
+        and are terminated if they do not stop within timeout seconds.
+        '''
+        for commands in self.__commands:
+            commands.put(('stop', None))
+        for worker in self.__workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self.__buffers = []
+        for shm in self.__shms:
+            shm.close()
+            shm.unlink()
+        self.__shms = []
+        self.__commands = []
+        self.__workers = []
+        self.__busy = set()
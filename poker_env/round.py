@@ -1,50 +1,73 @@
+from poker_env.table import NoLimitTexasHoldemTable as Table, FOLDED, ALL_IN, ALIVE
+from poker_env.action import LegalActions, ACTION_KIND_BITS, ACTION_KIND_MASK, \
+    FOLD_ACTION, CHECK_ACTION, CALL_ACTION, RAISE_ACTION, ALL_IN_ACTION
+
+
 class NoLimitTexasHoldemRound:
     '''
     The Round class for No Limit Texas Hold'em Poker.
     Round can call other Classes' functions to keep the game running.
     '''
-    def __init__(self, num_players=6, init_raise_amount=2):
+    def __init__(self, num_players=6, init_raise_amount=2, table=None):
         '''
         Initialize a round class.
 
         Args:
             num_players (int): The number of players
             init_raise_amount (int): The min raise amount when every round starts
+            table (NoLimitTexasHoldemTable): optional, the per-seat chips and status of the game.
+                                             Default is an empty table of num_players seats.
         '''
         self.game_pointer = None
         self.num_players = num_players
         self.init_raise_amount = init_raise_amount
         self.current_raise_amount = self.init_raise_amount
+        self.table = Table([0] * num_players) if table is None else table
 
         # Count the number without raise
         # If every alive player agree to not raise, the round is over.
         self.not_raise_num = 0
-        self.all_in_player_num = 0
-        self.alive_player_num = self.num_players
 
-        # Raised amount for each player
-        self.raised = [0 for _ in range(self.num_players)]
+    @property
+    def raised(self):
+        # Raised amount for each player, the same as the chips each player has put in
+        return self.table.in_chips
+
+    @property
+    def alive_player_num(self):
+        return self.table.alive_num
 
-        # Save the history for stepping back to the last state.
-        # self.history = []
+    @property
+    def all_in_player_num(self):
+        return self.table.all_in_num
 
-    def start_new_round(self, game_pointer, raised=None):
+    def clone(self, table=None):
+        '''
+        Copy the round.
+
+        Args:
+            table (NoLimitTexasHoldemTable): the table of the copy, default is a copy of the table
+
+        Returns:
+            (NoLimitTexasHoldemRound): the copy
+        '''
+        new_round = NoLimitTexasHoldemRound.__new__(NoLimitTexasHoldemRound)
+        new_round.__dict__.update(self.__dict__)
+        new_round.table = self.table.clone() if table is None else table
+        return new_round
+
+    def start_new_round(self, game_pointer):
         '''
         Start a new bidding round
 
         Args:
             game_pointer (int): The index of the current player.
-            raised (list): Initialize the chips for each player
 
-        Note: For the first round of the game, we need to setup the big/small blind
+        Note: For the first round of the game, the big/small blind should be put in the table before.
         '''
         self.game_pointer = game_pointer
         self.not_raise_num = 0
         self.current_raise_amount = self.init_raise_amount
-        if raised:
-            self.raised = raised
-        else:
-            self.raised = [0 for _ in range(self.num_players)]
 
     def proceed_round(self, players, action):
         '''
@@ -52,54 +75,52 @@ class NoLimitTexasHoldemRound:
 
         Args:
             players (list): The list of players that play the game
-            action (str): An legal action taken by the player
+            action (int): the code of a legal action taken by the player, see poker_env.action
 
         Returns:
             (int): The game_pointer that indicates the next player
         '''
-        if 'raise' in action:
-            rebet_amount = int(action[5:])
-            call_amount = max(self.raised) - self.raised[self.game_pointer]
-            self.raised[self.game_pointer] += rebet_amount
-            players[self.game_pointer].in_chips += rebet_amount
-            self.not_raise_num = 1
-            self.current_raise_amount = rebet_amount - call_amount
-
-        elif action == 'call':
-            call_amount = max(self.raised) - self.raised[self.game_pointer]
-            self.raised[self.game_pointer] += call_amount
-            players[self.game_pointer].in_chips += call_amount
+        table = self.table
+        game_pointer = self.game_pointer
+        kind = action & ACTION_KIND_MASK
+        if kind == CALL_ACTION:
+            table.bet(game_pointer, table.get_call_amount(game_pointer))
             self.not_raise_num += 1
 
-        elif action == 'fold':
-            players[self.game_pointer].status = 'folded'
-            self.alive_player_num -= 1
-
-        elif action == 'check':
+        elif kind == CHECK_ACTION:
             self.not_raise_num += 1
 
-        elif action == 'all-in':
-            call_amount = max(self.raised) - self.raised[self.game_pointer]
-            all_in_amount = players[
-                self.game_pointer].init_chips - self.raised[self.game_pointer]
-            self.raised[self.game_pointer] += all_in_amount
-            players[self.game_pointer].in_chips += all_in_amount
-            players[self.game_pointer].status = 'all-in'
-            self.all_in_player_num += 1
+        elif kind == FOLD_ACTION:
+            table.set_status(game_pointer, FOLDED)
+
+        elif kind == ALL_IN_ACTION:
+            call_amount = table.get_call_amount(game_pointer)
+            all_in_amount = table.get_remained_chips(game_pointer)
+            table.bet(game_pointer, all_in_amount)
+            table.set_status(game_pointer, ALL_IN)
             if all_in_amount > call_amount:
                 self.not_raise_num = 0
             self.current_raise_amount = max(all_in_amount - call_amount,
                                             self.current_raise_amount)
 
+        elif kind == RAISE_ACTION:
+            rebet_amount = action >> ACTION_KIND_BITS
+            call_amount = table.get_call_amount(game_pointer)
+            table.bet(game_pointer, rebet_amount)
+            self.not_raise_num = 1
+            self.current_raise_amount = rebet_amount - call_amount
+
         # game over
-        if self.all_in_player_num == self.alive_player_num:
+        if table.all_in_num == table.alive_num:
             return -1
 
-        self.game_pointer = (self.game_pointer + 1) % self.num_players
+        status = table.status
+        game_pointer = (game_pointer + 1) % self.num_players
         # Skip the folded players and the all_in players
-        while players[self.game_pointer].status != 'alive':
-            self.game_pointer = (self.game_pointer + 1) % self.num_players
-        return self.game_pointer
+        while status[game_pointer] != ALIVE:
+            game_pointer = (game_pointer + 1) % self.num_players
+        self.game_pointer = game_pointer
+        return game_pointer
 
     # Deprecated!
     # def step_back(self, players, player_id, action):
@@ -122,34 +143,20 @@ class NoLimitTexasHoldemRound:
             players (list): The players in the game
 
         Returns:
-           (list):  A list of legal actions
+           (LegalActions): the legal actions, raise strings are not created until they are iterated
         '''
-        full_actions = ['fold']
-        call_amount = max(self.raised) - self.raised[self.game_pointer]
-        remained_chips = players[self.game_pointer].get_remained_chips()
+        call_amount = self.table.get_call_amount(self.game_pointer)
+        remained_chips = self.table.get_remained_chips(self.game_pointer)
 
-        # If the current player has put in the chips that are more than others, he can check.
-        if call_amount == 0:
-            full_actions.append('check')
         # If the current player cannot provide call amount, he has to all-in or fold.
-        elif call_amount >= remained_chips:
-            return ['fold', 'all-in']
+        if call_amount > 0 and call_amount >= remained_chips:
+            return LegalActions()
+        # If the current player has put in the chips that are more than others, he can check.
         # If the current chips are less than that of the highest one in the round, he can call.
-        elif call_amount > 0:
-            full_actions.append('call')
-
-        # Append available raise amount to the action list
-        min_raise_amount = call_amount + self.current_raise_amount
-        # If the current player cannot provide min raise amount, he has to all-in or fold.
-        if min_raise_amount >= remained_chips:
-            full_actions.append('all-in')
-        else:
-            for available_raise_amount in range(min_raise_amount,
-                                                remained_chips):
-                full_actions.append('raise{}'.format(available_raise_amount))
-            full_actions.append('all-in')
-
-        return full_actions
+        # Raise amounts from the min raise amount to the remained chips (exclusive) are available,
+        # so the player has to all-in or fold if he cannot provide min raise amount.
+        return LegalActions(check=call_amount == 0, call=call_amount > 0,
+                            min_raise=call_amount + self.current_raise_amount, max_raise=remained_chips - 1)
 
     def is_over(self):
         '''
@@ -158,11 +165,7 @@ class NoLimitTexasHoldemRound:
         Returns:
             (boolean): True if the current round is over
         '''
-        if self.not_raise_num == (self.alive_player_num -
-                                  self.all_in_player_num):
-            return True
-        else:
-            return False
+        return self.not_raise_num == self.table.alive_num - self.table.all_in_num
 
     def get_action_player_num(self):
         '''
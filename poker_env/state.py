@@ -1,4 +1,5 @@
-from poker_env.card import LookUpStr
+from poker_env.card import SUIT_STR
+from poker_env.isomorphism import index_cards
 
 
 class PokerState:
@@ -11,9 +12,11 @@ class PokerState:
         pot (list): each element corresponds to the total number of a player betting into the game
         hand_cards (list): a list of Card class
         public_cards (list): a list of Card class
-        legal_actions (list): a list of Strings, each element corresponds to a legal action
+        legal_actions (LegalActions): the legal actions, it can be used as a list of action strings
+        init_chips (list): the chips that each player holds when the game starts, None if unknown
+        button (int): the position of the button, None if unknown
     '''
-    def __init__(self, player_id, pot, hand_cards, public_cards, legal_actions):
+    def __init__(self, player_id, pot, hand_cards, public_cards, legal_actions, init_chips=None, button=None):
         '''
         Initialize a poker state.
         '''
@@ -22,6 +25,8 @@ class PokerState:
         self.__hand_cards = hand_cards
         self.__public_cards = public_cards
         self.__legal_actions = legal_actions
+        self.__init_chips = init_chips
+        self.__button = button
 
     @property
     def player_id(self):
@@ -43,6 +48,23 @@ class PokerState:
     def legal_actions(self):
         return self.__legal_actions
 
+    @property
+    def init_chips(self):
+        return self.__init_chips
+
+    @property
+    def remained_chips(self):
+        '''
+        The chips that each player has not put in, None if init_chips is unknown
+        '''
+        if self.__init_chips is None:
+            return None
+        return [init_chips - in_chips for init_chips, in_chips in zip(self.__init_chips, self.__pot)]
+
+    @property
+    def button(self):
+        return self.__button
+
     def get_bet_round(self):
         '''
         Get the current round of the game
@@ -74,7 +96,17 @@ class PokerState:
         Returns:
             (list): strings of cards' ranks and suits. First 2 are hand cards.
         '''
-        return [card.get_index() for card in (self.hand_cards + self.public_cards)]
+        return [card.string for card in (self.hand_cards + self.public_cards)]
+
+    def get_hand_index(self):
+        '''
+        Get the integer index of the suit isomorphic hand (hand cards + public cards).
+        Isomorphic hands share the same index, which is dense over all betting rounds.
+
+        Returns:
+            (int): index in [0, poker_env.isomorphism.HAND_INDEX_NUM)
+        '''
+        return index_cards(self.__hand_cards, self.__public_cards)
 
     def get_lossless_abstraction(self):
         '''
@@ -85,9 +117,9 @@ class PokerState:
             (list): strings of cards' ranks and suits. First 2 are hand cards.
         '''
         # Sort cards through their ranks
-        sorted_cards = sorted(self.hand_cards, key=lambda card: LookUpStr.RANK.index(card.rank), reverse=True) \
-            + sorted(self.public_cards, key=lambda card: LookUpStr.RANK.index(card.rank), reverse=True)
-        sorted_string = ''.join([card.get_index() for card in sorted_cards])
+        sorted_cards = sorted(self.hand_cards, key=lambda card: card.rank_index, reverse=True) \
+            + sorted(self.public_cards, key=lambda card: card.rank_index, reverse=True)
+        sorted_string = ''.join([card.string for card in sorted_cards])
 
         # Special handling for Pair hand cards + public cards
         if sorted_cards[0].rank == sorted_cards[1].rank and len(sorted_cards) > 2:
@@ -100,13 +132,13 @@ class PokerState:
                 max_rank = [sorted_string[sorted_string[4:].index(card.suit) + 3] for card in sorted_cards[:2]]
                 if max_rank[0] < max_rank[1]:
                     sorted_cards = sorted_cards[1::-1] + sorted_cards[2:]
-            sorted_string = ''.join([card.get_index() for card in sorted_cards])
+            sorted_string = ''.join([card.string for card in sorted_cards])
 
         origin_suit_order = ''
         for suit in sorted_string[1::2]:
             if suit not in origin_suit_order:
                 origin_suit_order += suit
-        match_suit_order = LookUpStr.SUIT.value[0:len(origin_suit_order)]
+        match_suit_order = SUIT_STR[0:len(origin_suit_order)]
 
         match_string = sorted_string.translate(str.maketrans(origin_suit_order, match_suit_order))
 
@@ -0,0 +1,114 @@
+from array import array
+
+
+# Integer status codes of a seat
+ALIVE = 0
+FOLDED = 1
+ALL_IN = 2
+STATUS_NAMES = ('alive', 'folded', 'all-in')
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+
+class NoLimitTexasHoldemTable:
+    '''
+    The per-seat state of a No Limit Texas Hold'em game stored as struct of arrays.
+
+    Stacks, contributions and status codes of all seats live in small array.array buffers, and the
+    aggregates the round asks for on every action (the max contribution, the numbers of not folded and
+    all-in players) are maintained as the seats change instead of being recomputed.
+
+    Attributes:
+        num_players (int): the number of seats
+        init_chips (array): the chips that each player holds when the game starts
+        in_chips (array): the chips that each player has put in until now
+        status (array): status code (ALIVE, FOLDED or ALL_IN) of each player
+        max_in_chips (int): the max of in_chips
+        alive_num (int): the number of players who have not folded
+        all_in_num (int): the number of all-in players
+    '''
+    def __init__(self, init_chips):
+        '''
+        Initialize a table.
+
+        Args:
+            init_chips (list): chips that each player holds when the game starts
+        '''
+        self.num_players = len(init_chips)
+        self.init_chips = array('l', init_chips)
+        self.in_chips = array('l', [0]) * self.num_players
+        self.status = array('b', [ALIVE]) * self.num_players
+        self.max_in_chips = 0
+        self.alive_num = self.num_players
+        self.all_in_num = 0
+
+    def clone(self):
+        '''
+        Copy the table.
+
+        Returns:
+            (NoLimitTexasHoldemTable): the copy
+        '''
+        table = NoLimitTexasHoldemTable.__new__(NoLimitTexasHoldemTable)
+        table.__dict__.update(self.__dict__)
+        table.init_chips = array('l', self.init_chips)
+        table.in_chips = array('l', self.in_chips)
+        table.status = array('b', self.status)
+        return table
+
+    def reset(self):
+        '''
+        Reset the table in place for a new game with the same init_chips.
+        '''
+        for seat in range(self.num_players):
+            self.in_chips[seat] = 0
+            self.status[seat] = ALIVE
+        self.max_in_chips = 0
+        self.alive_num = self.num_players
+        self.all_in_num = 0
+
+    def get_remained_chips(self, seat):
+        '''
+        Return the remained chips of a player
+        '''
+        return self.init_chips[seat] - self.in_chips[seat]
+
+    def get_call_amount(self, seat):
+        '''
+        Return the chips a player needs to put in to match the max contribution
+        '''
+        return self.max_in_chips - self.in_chips[seat]
+
+    def bet(self, seat, amount):
+        '''
+        Put chips of a player into the pot.
+
+        Args:
+            seat (int): the seat of the player
+            amount (int): the number of chips
+        '''
+        chips = self.in_chips[seat] + amount
+        self.in_chips[seat] = chips
+        if chips > self.max_in_chips:
+            self.max_in_chips = chips
+
+    def set_in_chips(self, seat, chips):
+        '''
+        Set the chips a player has put in, Eg: the blinds or restoring a previous state.
+        '''
+        self.in_chips[seat] = chips
+        self.max_in_chips = max(self.in_chips)
+
+    def set_status(self, seat, status):
+        '''
+        Set the status code of a player and update the numbers of not folded and all-in players.
+
+        Args:
+            seat (int): the seat of the player
+            status (int): ALIVE, FOLDED or ALL_IN
+        '''
+        old_status = self.status[seat]
+        if old_status == status:
+            return
+        self.alive_num += (old_status == FOLDED) - (status == FOLDED)
+        self.all_in_num += (status == ALL_IN) - (old_status == ALL_IN)
+        self.status[seat] = status
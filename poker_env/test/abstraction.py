@@ -0,0 +1,95 @@
+from poker_env import abstraction
+from poker_env.abstraction import emd_distances, kmeans_emd, kmeans_1d, get_river_scores, get_board_histograms, \
+    get_bucket, get_hand_histograms, _board_bucket_worker, RIVER_SCORE_MAX
+from poker_env.equity import exact_equity, river_hand_strength, HOLE_PAIRS
+from poker_env.isomorphism import index_cards, HAND_INDEX_OFFSETS, RANK_NUM, SUIT_NUM
+from poker_env.utils import _DECK
+import itertools
+import random
+import numpy as np
+
+
+def transport_cost(supply, demand):
+    '''
+    The cost of moving the mass of supply to demand in one dimension, by matching the mass from left to right.
+    '''
+    supply, demand = list(supply), list(demand)
+    cost = 0
+    i = j = 0
+    while i < len(supply) and j < len(demand):
+        amount = min(supply[i], demand[j])
+        cost += amount * abs(i - j)
+        supply[i] -= amount
+        demand[j] -= amount
+        if supply[i] <= 1e-12:
+            i += 1
+        else:
+            j += 1
+    return cost
+
+
+def permute_suits(cards, permutation):
+    return [permutation[card // RANK_NUM] * RANK_NUM + card % RANK_NUM for card in cards]
+
+
+def run_test():
+    wrong_count = 0
+    random.seed(0)
+    rng = np.random.default_rng(0)
+
+    # EMD against the transport cost
+    histograms = rng.random((20, 8))
+    histograms /= histograms.sum(axis=1, keepdims=True)
+    distances = emd_distances(histograms[:10], histograms[10:])
+    for i, j in itertools.product(range(10), range(10)):
+        if not np.isclose(distances[i, j], transport_cost(histograms[i], histograms[10 + j])):
+            wrong_count += 1
+
+    # k-means on separated clusters
+    peaks = np.eye(8)[[0, 3, 7]]
+    histograms = np.repeat(peaks, 30, axis=0) + rng.random((90, 8)) * 0.05
+    histograms /= histograms.sum(axis=1, keepdims=True)
+    centers, labels = kmeans_emd(histograms, 3, rng=rng)
+    if not np.array_equal(labels, np.argmin(emd_distances(histograms, centers), axis=1)) or \
+            len(set(labels.tolist())) != 3 or any(len(set(labels[k * 30:k * 30 + 30].tolist())) != 1 for k in range(3)):
+        wrong_count += 1
+    values = np.concatenate([rng.normal(mean, 1, 50) for mean in (0, 20, 40)])
+    centers, labels = kmeans_1d(values, np.ones(len(values)), 3)
+    if not np.allclose(centers, [0, 20, 40], atol=1) or not np.array_equal(labels, np.repeat(np.arange(3), 50)):
+        wrong_count += 1
+
+    # River scores and board histograms against the exact equity
+    boards = np.array([random.sample(range(52), 5) for _ in range(4)])
+    scores = get_river_scores(boards)
+    for board, board_scores in zip(boards, scores):
+        valid = np.flatnonzero(board_scores >= 0)
+        if len(valid) != 1081:
+            wrong_count += 1
+        for i in rng.choice(valid, 20, replace=False):
+            if not np.isclose(board_scores[i] / RIVER_SCORE_MAX, river_hand_strength(HOLE_PAIRS[i], board[None])[0]):
+                wrong_count += 1
+    board = random.sample(range(52), 4)
+    pair_indices, histograms = get_board_histograms(np.array(board))
+    for i in rng.choice(len(pair_indices), 10, replace=False):
+        if not np.allclose(histograms[i], exact_equity(HOLE_PAIRS[pair_indices[i]].tolist(), board).histogram):
+            wrong_count += 1
+
+    # Hands in the same class of suit isomorphism are in the same bucket
+    centers, _ = kmeans_emd(get_hand_histograms(2, rng.choice(10000, 50, replace=False)), 8, rng=rng)
+    permutation = random.sample(range(SUIT_NUM), SUIT_NUM)
+    permuted_board = permute_suits(board, permutation)
+    indices, buckets = _board_bucket_worker((2, np.array([board, permuted_board]), centers))
+    abstraction._bucket_table = dict(zip((HAND_INDEX_OFFSETS[2] + indices).tolist(), buckets.tolist()))
+    try:
+        for pair in HOLE_PAIRS[pair_indices[:100]].tolist():
+            permuted_pair = permute_suits(pair, permutation)
+            bucket = get_bucket(index_cards([_DECK[card] for card in pair], [_DECK[card] for card in board]))
+            permuted_bucket = get_bucket(index_cards([_DECK[card] for card in permuted_pair],
+                                                     [_DECK[card] for card in permuted_board]))
+            histogram = exact_equity(pair, board).histogram
+            if bucket != permuted_bucket or bucket != np.argmin(emd_distances(histogram[None], centers)):
+                wrong_count += 1
+    finally:
+        abstraction._bucket_table = None
+    print("wrong number: {}".format(wrong_count))
+
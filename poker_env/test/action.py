@@ -0,0 +1,43 @@
+from poker_env.game import NoLimitTexasHoldemGame as Game
+from poker_env.action import action_from_str, action_to_str, to_action, get_action_kind, get_raise_amount, \
+    get_action_space, get_action_index, get_action_from_index, RAISE_ACTION
+import random
+
+
+def run_test():
+    wrong_count = 0
+    random.seed(0)
+    # Action codes and strings are one-to-one
+    for action in ['fold', 'check', 'call', 'all-in'] + ['raise{}'.format(amount) for amount in range(1, 300)]:
+        code = action_from_str(action)
+        if action_to_str(code) != action or to_action(action) != code or to_action(code) != code:
+            wrong_count += 1
+        if (get_action_kind(code) == RAISE_ACTION) != action.startswith('raise') or \
+                get_raise_amount(code) != (int(action[5:]) if action.startswith('raise') else 0):
+            wrong_count += 1
+    for action in ('raise', 'raisex', 'bet'):
+        try:
+            action_from_str(action)
+            wrong_count += 1
+        except ValueError:
+            pass
+    # The indices of the action space
+    for big_blind, init_chips in ((2, 100), (2, [30, 50, 20]), (10, 200)):
+        action_space = get_action_space(big_blind, init_chips)
+        for index, action in enumerate(action_space):
+            if get_action_index(action, big_blind, init_chips) != index or \
+                    action_to_str(get_action_from_index(index, big_blind, init_chips)) != action:
+                wrong_count += 1
+    # Stepping a game by the code of an action is the same as stepping it by the string
+    for _ in range(200):
+        game = Game(num_players=random.choice([2, 3, 6]), init_chips=random.choice([10, 30, 100]))
+        game.init_game()
+        while not game.is_over():
+            action = random.choice(game.get_legal_actions())
+            child = game.child(action)
+            game.step(action_from_str(action))
+            if game.game_tree != child.game_tree or game.events != child.events or game.is_over() != child.is_over():
+                wrong_count += 1
+        if game.get_payoffs() != child.get_payoffs():
+            wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
@@ -0,0 +1,104 @@
+from poker_env.game import NoLimitTexasHoldemGame as Game
+from poker_env.table import ALIVE, FOLDED
+from poker_env.action import FOLD_ACTION, CHECK_ACTION, CALL_ACTION, ALL_IN_ACTION
+from poker_env.utils import _DECK
+import itertools
+import numpy as np
+
+
+def choose_action(legal_actions, rng):
+    '''
+    A random action that goes all-in often, so that many games end before the river.
+    '''
+    weights = {ALL_IN_ACTION: 0.3, FOLD_ACTION: 0.15, CHECK_ACTION: 0.3, CALL_ACTION: 0.3}
+    actions = [action for action in (ALL_IN_ACTION, FOLD_ACTION, CHECK_ACTION, CALL_ACTION) if action in legal_actions]
+    p = np.array([weights[action] for action in actions])
+    return actions[rng.choice(len(actions), p=p / p.sum())]
+
+
+def play(game, rng):
+    game.init_game()
+    while not game.is_over():
+        game.step(choose_action(game.get_legal_actions(), rng))
+
+
+def get_runout_payoffs(game):
+    '''
+    The average payoffs of judge_game over every runout of the public cards dealt at the all-in point.
+    '''
+    public_cards = game.public_cards[:game.all_in_point[0]]
+    used = {card.id for player in game.players for card in player.hand} | {card.id for card in public_cards}
+    deck = [card for card in _DECK if card.id not in used]
+    payoffs = []
+    for runout in itertools.combinations(deck, 5 - len(public_cards)):
+        board = public_cards + list(runout)
+        hands = [player.hand + board if player.status != 'folded' else None for player in game.players]
+        payoffs.append(game.judger.judge_game(game.players, hands))
+    return np.mean(payoffs, axis=0)
+
+
+def run_test():
+    wrong_count = 0
+    rng = np.random.default_rng(0)
+    # Flop and turn all-ins with side pots and folded players against every runout
+    checked = set()
+    game = Game(num_players=4, init_chips=[30, 60, 100, 100], seed=0, all_in_ev=True)
+    for _ in range(2000):
+        play(game, rng)
+        payoffs = game.get_payoffs()
+        if not np.isclose(sum(payoffs), 0):
+            wrong_count += 1
+        point = game.all_in_point
+        if point is None or point[0] not in (3, 4):
+            continue
+        side_pot = len([pot for pot in game.judger.get_pots(game.players) if sum(pot) > 0]) > 1
+        folded = FOLDED in point[2]
+        case = (point[0], side_pot, folded)
+        if case in checked:
+            continue
+        checked.add(case)
+        if not np.allclose(payoffs, get_runout_payoffs(game)):
+            wrong_count += 1
+    # Flop and turn all-ins with a side pot and a folded player are covered
+    if not {(3, True, True), (4, True, True)} <= checked:
+        wrong_count += 1
+
+    # The sampled pre-flop runouts are reproducible from the seed, and the deals do not depend on all_in_ev
+    games = [Game(num_players=3, seed=seed, all_in_ev=all_in_ev) for seed, all_in_ev in ((1, True), (1, True),
+                                                                                        (1, False), (2, True))]
+    sampled_num = 0
+    for _ in range(300):
+        action_seed = rng.integers(1 << 30)
+        payoffs = []
+        for game in games[:3]:
+            play(game, np.random.default_rng(action_seed))
+            payoffs.append(game.get_payoffs())
+        play(games[3], np.random.default_rng(action_seed))
+        games[3].get_payoffs()
+        if games[0].events != games[1].events or games[0].events != games[2].events or payoffs[0] != payoffs[1]:
+            wrong_count += 1
+        if games[0].all_in_point is not None and games[0].all_in_point[0] == 0:
+            sampled_num += 1
+    if sampled_num == 0 or games[0].events == games[3].events:
+        wrong_count += 1
+
+    # Chips or status changed after the all-in point are settled by the dealt public cards
+    game = Game(num_players=2, init_chips=[50, 100], seed=3, all_in_ev=True)
+    game.init_game()
+    while not game.is_over():
+        # The short stack goes all-in, the other player calls
+        game.step(ALL_IN_ACTION if game.game_pointer == 0 else CALL_ACTION)
+    if game.all_in_point is None:
+        wrong_count += 1
+    else:
+        seat = game.table.status.tolist().index(ALIVE)
+        game.table.set_in_chips(seat, game.table.in_chips[seat] + 10)
+        hands = [player.hand + game.public_cards for player in game.players]
+        if game.get_payoffs() != game.judger.judge_game(game.players, hands):
+            wrong_count += 1
+        game.table.set_in_chips(seat, game.table.in_chips[seat] - 10)
+        game.table.set_status(seat, FOLDED)
+        hands[seat] = None
+        if game.get_payoffs() != game.judger.judge_game(game.players, hands):
+            wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
@@ -0,0 +1,30 @@
+from poker_env.benchmark import compare_reports
+
+
+def run_test():
+    wrong_count = 0
+    baseline = {'results': {'env_run': {'games_per_sec': 1000.0, 'steps_per_sec': 5000.0, 'game_num': 100},
+                            'cfr': {'iterations_per_sec': 10.0, 'peak_bytes': 1000.0}}}
+    current = {'results': {'env_run': {'games_per_sec': 800.0, 'steps_per_sec': 5200.0, 'game_num': 50},
+                           'cfr': {'iterations_per_sec': 9.5, 'peak_bytes': 1200.0, 'table_bytes': 10.0},
+                           'judger': {'games_per_sec': 1.0}}}
+    rows = {(name, metric): (change, regressed)
+            for name, metric, _, _, change, regressed in compare_reports(baseline, current, tolerance=0.1)}
+    expected = {
+        # 20% slower is a regression, faster and 5% slower are not
+        ('env_run', 'games_per_sec'): (-0.2, True),
+        ('env_run', 'steps_per_sec'): (0.04, False),
+        ('cfr', 'iterations_per_sec'): (-0.05, False),
+        # 20% more memory is a regression
+        ('cfr', 'peak_bytes'): (-0.2, True),
+    }
+    # _num metrics and the metrics without a baseline are skipped
+    if set(rows) != set(expected):
+        wrong_count += 1
+    for key, (change, regressed) in expected.items():
+        if key not in rows or abs(rows[key][0] - change) > 1e-9 or rows[key][1] != regressed:
+            wrong_count += 1
+    # A wider tolerance accepts the same changes
+    if any(regressed for *_, regressed in compare_reports(baseline, current, tolerance=0.25)):
+        wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
@@ -0,0 +1,87 @@
+from poker_env import duplicate
+from poker_env.duplicate import DuplicateEvaluator
+from poker_env.agent.base_agent import Agent
+from poker_env.agent.random_agent import RandomAgent
+from poker_env.action import CHECK_ACTION, CALL_ACTION
+from poker_env.hand_history import get_event_type, get_event_seat, get_event_cards, HOLE_EVENT
+import numpy as np
+
+
+class CallAgent(Agent):
+    '''
+    Check or call, and go all-in when calling is not possible.
+    '''
+    def __init__(self):
+        super().__init__(agent_type='CallAgent')
+
+    def step(self, state):
+        legal_actions = state.legal_actions
+        if legal_actions.check:
+            return CHECK_ACTION
+        if legal_actions.call:
+            return CALL_ACTION
+        return legal_actions.get_action(len(legal_actions) - 1)
+
+    def eval_step(self, state):
+        return self.step(state)
+
+
+def call_agents():
+    return [CallAgent(), CallAgent()]
+
+
+def mixed_agents():
+    return [CallAgent(), RandomAgent(), RandomAgent()]
+
+
+def get_deals(block_id, deal_num):
+    '''
+    Play a block in this process, and record the button and the hole cards of each seat of every deal.
+    '''
+    env, _ = duplicate._worker
+    deals = []
+    run = env.run
+
+    def recorded_run(*args, **kwargs):
+        result = run(*args, **kwargs)
+        holes = {get_event_seat(event): get_event_cards(event) for event in env.get_hand_history()
+                 if get_event_type(event) == HOLE_EVENT}
+        deals.append((env.get_state().button, holes))
+        return result
+
+    env.run = recorded_run
+    try:
+        duplicate._play_block(0, block_id, deal_num)
+    finally:
+        del env.run
+    return deals
+
+
+def run_test():
+    wrong_count = 0
+    # Every rotation of the seats replays the same buttons and hole cards
+    duplicate._init_worker(mixed_agents, {'num_players': 3})
+    deals = get_deals(5, 20)
+    if len(deals) != 60 or deals[:20] != deals[20:40] or deals[:20] != deals[40:] or deals[:20] == get_deals(6, 20):
+        wrong_count += 1
+    duplicate._worker = None
+    # Identical agents cancel out exactly
+    with DuplicateEvaluator(call_agents, worker_num=2, deals_per_block=64, seed=1) as evaluator:
+        result = evaluator.evaluate(2000)
+    if result.hand_num < 2000 or np.any(result.mbb_per_hand != 0) or np.any(result.confidence_interval != 0):
+        wrong_count += 1
+    # The same seed plays the same deals with the same random numbers
+    results = []
+    for _ in range(2):
+        with DuplicateEvaluator(mixed_agents, worker_num=2, deals_per_block=64, seed=2) as evaluator:
+            results.append(evaluator.evaluate(2000))
+            # Stop early when the intervals are narrow enough
+            early_result = evaluator.evaluate(10 ** 6, target_interval=10 ** 6, min_hand_num=1000)
+            if not 1000 <= early_result.hand_num < 10 ** 6:
+                wrong_count += 1
+    if results[0].deal_num != results[1].deal_num or \
+            not np.array_equal(results[0].mbb_per_hand, results[1].mbb_per_hand) or \
+            not np.array_equal(results[0].confidence_interval, results[1].confidence_interval) or \
+            not np.isclose(results[0].mbb_per_hand.sum(), 0):
+        wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
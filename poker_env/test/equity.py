@@ -0,0 +1,80 @@
+from poker_env.equity import exact_equity, river_hand_strength, monte_carlo_equity, get_histogram_vector, \
+    get_pair_index
+from poker_env.evaluator import evaluate_hand, colex_combinations
+import itertools
+import random
+import numpy as np
+
+
+def brute_force_strengths(hero, board, opponent_range):
+    '''
+    The hand strength of each runout, by evaluating every runout and opponent hand one by one.
+    '''
+    deck = [card for card in range(52) if card not in hero + board]
+    strengths = []
+    for runout in itertools.combinations(deck, 5 - len(board)):
+        public = board + list(runout)
+        hero_rank = evaluate_hand(hero + public)
+        score = total = 0
+        for opponent in itertools.combinations([card for card in deck if card not in runout], 2):
+            weight = 1 if opponent_range is None else opponent_range[get_pair_index(*opponent)]
+            opponent_rank = evaluate_hand(list(opponent) + public)
+            score += weight * ((hero_rank > opponent_rank) + 0.5 * (hero_rank == opponent_rank))
+            total += weight
+        if total > 0:
+            strengths.append(score / total)
+    return np.array(strengths)
+
+
+class CountingRng:
+    '''
+    A random generator that counts the batches of runouts sampled by monte_carlo_equity.
+    '''
+    def __init__(self, seed):
+        self.rng = np.random.default_rng(seed)
+        self.batch_num = 0
+
+    def random(self, size):
+        self.batch_num += 1
+        return self.rng.random(size)
+
+
+def run_test():
+    wrong_count = 0
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    # The only 0-combination is empty
+    if colex_combinations(5, 0).shape != (1, 0) or colex_combinations(3, 4).shape != (0, 4):
+        wrong_count += 1
+    for i in range(8):
+        cards = random.sample(range(52), 7)
+        hero = cards[:2]
+        board = cards[2:6] if i % 2 == 0 else cards[2:7]
+        opponent_range = None if i < 4 else rng.random(1326)
+        equity = exact_equity(hero, board, opponent_range)
+        strengths = brute_force_strengths(hero, board, opponent_range)
+        if not np.isclose(equity.ehs, strengths.mean()) or not np.isclose(equity.ehs2, np.mean(strengths ** 2)) \
+                or not np.allclose(equity.histogram, get_histogram_vector(strengths)):
+            wrong_count += 1
+        if len(board) == 5:
+            strength = river_hand_strength(hero, np.array([board]), opponent_range)[0]
+            if not np.isclose(strength, strengths[0]):
+                wrong_count += 1
+    # Pre-flop AA wins about 85.2% against a random hand
+    rng = CountingRng(0)
+    equity = monte_carlo_equity(['As', 'Ac'], tolerance=0.002, max_samples=100000, rng=rng)
+    if not 0.842 < equity.ehs < 0.862 or not np.isclose(equity.histogram.sum(), 1):
+        wrong_count += 1
+    # Sampling stops early once the standard error is small enough, and at the cap otherwise
+    if not 1024 <= rng.batch_num * 256 < 100000:
+        wrong_count += 1
+    rng = CountingRng(0)
+    monte_carlo_equity(['As', 'Ac'], tolerance=0, max_samples=2048, rng=rng)
+    if rng.batch_num != 8:
+        wrong_count += 1
+    # Sampled flop runouts agree with the exact enumeration
+    hero, board = [12, 25], [0, 14, 30]
+    if not np.isclose(monte_carlo_equity(hero, board, tolerance=0.001, rng=CountingRng(1)).ehs,
+                      exact_equity(hero, board).ehs, atol=0.005):
+        wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
@@ -0,0 +1,62 @@
+from poker_env.utils import init_52_deck
+from poker_env.card import LookUpStr
+from poker_env.hand import Hand, determine_winner
+from poker_env.evaluator import evaluate_hand, evaluate_batch, evaluate_board_batch, get_category, CARD_STR_TO_ID
+import numpy as np
+import random
+
+# Positions of deciding cards in Hand.best_five for each category
+KEY_INDEX = {9: [0], 8: [4, 0], 7: [4, 0], 6: [4, 3, 2, 1, 0], 5: [0],
+             4: [2, 1, 0], 3: [4, 2, 0], 2: [4, 2, 1, 0], 1: [4, 3, 2, 1, 0]}
+
+
+def compare_by_hand_class(hand0, hand1):
+    '''
+    Compare two hands with the string based Hand class.
+    '''
+    hand0 = Hand(hand0)
+    hand1 = Hand(hand1)
+    hand0.evaluateHand()
+    hand1.evaluateHand()
+    if hand0.category != hand1.category:
+        return [1, 0] if hand0.category > hand1.category else [0, 1]
+    return determine_winner(KEY_INDEX[hand0.category], hand0.get_hand_five_cards(), hand1.get_hand_five_cards())
+
+
+def run_test():
+    deck = [card.get_index() for card in init_52_deck()]
+    wrong_count = 0
+    batch_hands = []
+    batch_ranks = []
+    for i in range(100000):
+        if i % 3 == 0:
+            cards = random.sample(deck, 9)
+        elif i % 3 == 1:
+            # Few ranks, more pairs, trips and quads
+            ranks = random.sample(LookUpStr.RANK.value, 4)
+            cards = random.sample([card for card in deck if card[0] in ranks], 9)
+        else:
+            # Few suits and near ranks, more straights and flushes
+            start = random.randint(0, 6)
+            cards = random.sample([card for card in deck if card[1] in 'sc' and card[0] in LookUpStr.RANK.value[start:start + 7]], 9)
+        hand0 = cards[:7]
+        hand1 = cards[2:]
+        hand = Hand(hand0)
+        hand.evaluateHand()
+        rank0 = evaluate_hand(hand0)
+        rank1 = evaluate_hand(hand1)
+        result = [1, 0] if rank0 > rank1 else [0, 1] if rank0 < rank1 else [1, 1]
+        if get_category(rank0) != hand.category or result != compare_by_hand_class(hand0, hand1):
+            wrong_count += 1
+        batch_hands.append([CARD_STR_TO_ID[card] for card in hand0])
+        batch_ranks.append(rank0)
+    # The batched evaluator must agree with the scalar one
+    wrong_count += int(np.sum(evaluate_batch(np.array(batch_hands, dtype=np.int8)) != np.array(batch_ranks)))
+    # Hands sharing a board, with 0 to 5 shared cards
+    for board_num in range(6):
+        board = batch_hands[board_num][:board_num]
+        hands = np.array([board + [card for card in random.sample(range(52), 9) if card not in board][:7 - board_num]
+                          for _ in range(1000)], dtype=np.int8)
+        if not np.array_equal(evaluate_board_batch(board, hands[:, board_num:]), evaluate_batch(hands)):
+            wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
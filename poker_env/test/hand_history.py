@@ -0,0 +1,76 @@
+from poker_env.env import NoLimitTexasHoldemEnv as Env
+from poker_env.agent.random_agent import RandomAgent
+from poker_env.hand_history import HandHistoryWriter, HandHistoryReader, render_events
+import os
+import tempfile
+
+
+def get_hands(hand_num, seed, game_trees=None):
+    env = Env(num_players=3, seed=seed)
+    env.set_agents([RandomAgent() for _ in range(3)])
+    hands = []
+    for _ in range(hand_num):
+        env.run()
+        hands.append(list(env.get_hand_history()))
+        if game_trees is not None:
+            game_trees.append((env.get_game_tree(), env.get_game_tree(to_string=False)))
+    return hands
+
+
+def check_hands(path, hands):
+    reader = HandHistoryReader(path)
+    wrong_count = int(len(reader) != len(hands))
+    for i, events in enumerate(reader):
+        if i >= len(hands) or events.tolist() != hands[i]:
+            wrong_count += 1
+    del reader
+    return wrong_count
+
+
+def run_test():
+    wrong_count = 0
+    game_trees = []
+    first_hands = get_hands(50, 0, game_trees)
+    second_hands = get_hands(30, 1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'hands.bin')
+        # The hands of the env are read back with the same game trees
+        with HandHistoryWriter(path, chunk_size=20) as writer:
+            for events in first_hands:
+                writer.write(events)
+        reader = HandHistoryReader(path)
+        for i, (game_tree, code_tree) in enumerate(game_trees):
+            if reader.get_game_tree(i) != game_tree or render_events(reader[i]) != game_tree or \
+                    reader.get_game_tree(i - len(game_trees), False) != code_tree:
+                wrong_count += 1
+        del reader
+        os.remove(path)
+        with HandHistoryWriter(path, chunk_size=20) as writer:
+            for events in first_hands:
+                writer.write(events)
+        size = os.path.getsize(path)
+        # A writer killed in the middle of a chunk leaves a torn chunk at the end
+        for torn_size in (size - 5, size - 8 * len(first_hands[-1]), size - 8 * (len(first_hands[-1]) + 12)):
+            os.truncate(path, torn_size)
+            # The last chunk has 10 hands, and the reader skips it
+            wrong_count += check_hands(path, first_hands[:40])
+            # Reopening truncates the torn chunk, then new chunks are appended
+            with HandHistoryWriter(path, chunk_size=20) as writer:
+                for events in second_hands:
+                    writer.write(events)
+            wrong_count += check_hands(path, first_hands[:40] + second_hands)
+            # Restore the file of the first hands
+            os.remove(path)
+            with HandHistoryWriter(path, chunk_size=20) as writer:
+                for events in first_hands:
+                    writer.write(events)
+        # A torn chunk followed by complete chunks (Eg: appended without truncating), the reader resynchronizes
+        other_path = os.path.join(directory, 'other.bin')
+        with HandHistoryWriter(other_path, chunk_size=20) as writer:
+            for events in second_hands:
+                writer.write(events)
+        os.truncate(path, size - 8 * 12)
+        with open(other_path, 'rb') as f, open(path, 'ab') as g:
+            g.write(f.read())
+        wrong_count += check_hands(path, first_hands[:40] + second_hands)
+    print("wrong number: {}".format(wrong_count))
@@ -0,0 +1,34 @@
+from poker_env.isomorphism import get_hand_indexer, index_hand, index_cards, HAND_INDEX_OFFSETS
+from poker_env.utils import _DECK
+import numpy as np
+import random
+
+
+def run_test():
+    wrong_count = 0
+    for bet_round in range(4):
+        indexer = get_hand_indexer(bet_round)
+        hands = []
+        for _ in range(10000):
+            cards = random.sample(range(52), indexer.card_num)
+            index = indexer.index(cards)
+            # Permuting suits and reordering hand cards or public cards must not change the index
+            suits = random.sample(range(4), 4)
+            new_cards = [suits[card // 13] * 13 + card % 13 for card in cards]
+            new_cards = new_cards[1::-1] + random.sample(new_cards[2:], len(new_cards) - 2)
+            if indexer.index(new_cards) != index or index_hand(cards) != HAND_INDEX_OFFSETS[bet_round] + index:
+                wrong_count += 1
+            # The cached index of Card objects, asked twice to hit the cache
+            for _ in range(2):
+                if index_cards([_DECK[card] for card in cards[:2]], [_DECK[card] for card in cards[2:]]) != \
+                        HAND_INDEX_OFFSETS[bet_round] + index:
+                    wrong_count += 1
+            # Every index maps to a canonical hand which maps back to the index
+            random_index = random.randrange(indexer.size)
+            if indexer.index(indexer.unindex(random_index)) != random_index:
+                wrong_count += 1
+            hands.append(cards)
+        # The batched indexer must agree with the scalar one
+        indices = indexer.index_batch(np.array(hands))
+        wrong_count += sum(int(index) != indexer.index(cards) for index, cards in zip(indices, hands))
+    print("wrong number: {}".format(wrong_count))
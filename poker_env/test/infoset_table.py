@@ -0,0 +1,60 @@
+from poker_env.env import NoLimitTexasHoldemEnv as Env
+from poker_env.agent.cfr_agent import CFRAgent, POLICY
+from poker_env.infoset_table import SparseInfosetTable
+import random
+import numpy as np
+
+
+def run_test():
+    wrong_count = 0
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    # Random updates of a small table (so that blocks are moved and compacted) against dense vectors
+    action_num = 20
+    table = SparseInfosetTable(2, capacity=8)
+    dense = {}
+    for _ in range(5000):
+        infoset = random.randrange(50)
+        actions = sorted(random.sample(range(action_num), random.randint(1, 6)))
+        if infoset not in dense:
+            fill = rng.random(2)
+            dense[infoset] = np.repeat(fill[:, None], action_num, axis=1)
+            slots = table.get_slots(infoset, actions, fill=fill)
+        else:
+            slots = table.get_slots(infoset, actions)
+        values = rng.random((2, len(actions)))
+        table.data[:, slots] += values
+        dense[infoset][:, actions] += values
+    for field in range(2):
+        view = table.field_view(field, action_num)
+        if set(view) != set(dense) or len(view) != len(dense):
+            wrong_count += 1
+        for infoset, vectors in dense.items():
+            if not np.allclose(view[infoset], vectors[field]):
+                wrong_count += 1
+
+    # CFR with the sparse table against the dense dicts
+    agents = []
+    for sparse in (False, True):
+        random.seed(0)
+        np.random.seed(0)
+        env = Env(num_players=2, allow_step_back=True, init_chips=12, seed=0)
+        agent = CFRAgent(env=env, sparse=sparse)
+        for _ in range(3):
+            agent.train()
+        agents.append(agent)
+    dense_agent, sparse_agent = agents
+    if set(dense_agent.policy) != set(sparse_agent.table) or not set(dense_agent.regrets) <= set(sparse_agent.table):
+        wrong_count += 1
+    for infoset in dense_agent.regrets:
+        if not np.allclose(dense_agent.regrets[infoset], sparse_agent.regrets[infoset]) or \
+                not np.allclose(dense_agent.average_policy[infoset], sparse_agent.average_policy[infoset]):
+            wrong_count += 1
+    for infoset, policy in dense_agent.policy.items():
+        # The dense policy also covers the actions that have never been legal
+        actions = sparse_agent.table.get_actions(infoset)
+        dense_probs = policy[actions]
+        sparse_probs = sparse_agent.table.get_block(infoset)[POLICY]
+        if not np.allclose(dense_probs / dense_probs.sum(), sparse_probs / sparse_probs.sum()):
+            wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
@@ -0,0 +1,52 @@
+from poker_env.game import NoLimitTexasHoldemGame as Game
+from poker_env.action import LegalActions, action_from_str, action_to_str, get_action_space, get_legal_action_mask
+import random
+
+
+def get_legal_strings(round):
+    '''
+    The legal actions of the current player as the list of strings.
+    '''
+    seat = round.game_pointer
+    call_amount = round.table.get_call_amount(seat)
+    remained_chips = round.table.get_remained_chips(seat)
+    if call_amount >= remained_chips:
+        return ['fold', 'all-in']
+    actions = ['fold', 'check' if call_amount == 0 else 'call']
+    min_raise = call_amount + round.current_raise_amount
+    actions += ['raise{}'.format(amount) for amount in range(min_raise, remained_chips)]
+    actions.append('all-in')
+    return actions
+
+
+def run_test():
+    wrong_count = 0
+    random.seed(0)
+    # Legal actions of random games against the list of strings
+    for _ in range(500):
+        game = Game(num_players=random.choice([2, 3, 6]), init_chips=random.choice([10, 30, 100]))
+        game.init_game()
+        while not game.is_over():
+            legal_actions = game.get_legal_actions()
+            strings = get_legal_strings(game.round)
+            length = len(strings)
+            if legal_actions != strings or len(legal_actions) != length or list(legal_actions) != strings:
+                wrong_count += 1
+            if [legal_actions[i] for i in range(-length, length)] != strings + strings or \
+                    legal_actions[1:4] != strings[1:4] or legal_actions[::-2] != strings[::-2]:
+                wrong_count += 1
+            if [action_to_str(legal_actions.get_action(i)) for i in range(length)] != strings or \
+                    [action_to_str(action) for action in legal_actions.iter_actions()] != strings:
+                wrong_count += 1
+            if not all(action in legal_actions and action_from_str(action) in legal_actions for action in strings) \
+                    or any(action in legal_actions for action in ('raise0', 'raise1000', 'raisex', None)):
+                wrong_count += 1
+            mask = get_legal_action_mask(legal_actions, game.big_blind, game.init_chips)
+            action_space = get_action_space(game.big_blind, game.init_chips)
+            if [action for action, legal in zip(action_space, mask) if legal] != strings:
+                wrong_count += 1
+            game.step(random.choice(strings))
+    if LegalActions(call=True, min_raise=4, max_raise=9) != LegalActions(call=True, min_raise=4, max_raise=9) or \
+            LegalActions(check=True) == LegalActions(call=True):
+        wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
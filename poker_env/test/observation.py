@@ -0,0 +1,37 @@
+from poker_env.env import NoLimitTexasHoldemEnv as Env
+from poker_env.agent.random_agent import RandomAgent
+from poker_env.observation import ObservationEncoder
+import numpy as np
+
+
+def run_test():
+    wrong_count = 0
+    np.random.seed(0)
+    for num_players, init_chips in ((2, 100), (3, [40, 60, 80]), (6, 200)):
+        env = Env(num_players=num_players, init_chips=init_chips, seed=0)
+        encoder = ObservationEncoder(num_players=num_players, init_chips=init_chips)
+        agent = RandomAgent()
+        states = []
+        for _ in range(50):
+            state, _ = env.init_game()
+            while not env.is_over():
+                states.append(state)
+                state, _ = env.step(agent.step(state))
+        observations = encoder.encode_batch(states)
+        # The batched encoder writes the same observations as encoding the states one by one
+        for state, observation in zip(states, observations):
+            if not np.array_equal(encoder.encode(state), observation):
+                wrong_count += 1
+            legal = observation[encoder.slices['legal']]
+            if not np.array_equal(legal, env.get_legal_action_mask(state.legal_actions)):
+                wrong_count += 1
+        # Integer buffers must hold the total chips in big blinds
+        buffer = np.empty(observations.shape, dtype=np.int8)
+        try:
+            encoder.encode_batch(states, buffer)
+            if encoder.max_chips > 127 or not np.array_equal(buffer, np.rint(observations)):
+                wrong_count += 1
+        except ValueError:
+            if encoder.max_chips <= 127:
+                wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
@@ -0,0 +1,45 @@
+from poker_env.preflop import load_preflop_table, get_preflop_keys, get_preflop_equity, get_preflop_histogram, \
+    MAX_OPPONENT_NUM
+from poker_env.utils import init_52_deck
+from poker_env.state import PokerState
+import itertools
+import numpy as np
+
+
+def run_test():
+    wrong_count = 0
+    table = load_preflop_table()
+    keys = table['key'].tolist()
+    deck = init_52_deck()
+    # The keys of the table are the lossless abstractions of all the starting hands
+    state_keys = set()
+    for hand_cards in itertools.combinations(deck, 2):
+        state = PokerState(player_id=0, pot=[], hand_cards=list(hand_cards), public_cards=[], legal_actions=[])
+        state_keys.add(''.join(state.get_lossless_abstraction()))
+    if len(table) != 169 or len(set(keys)) != 169 or set(keys) != state_keys or sorted(keys) != get_preflop_keys():
+        wrong_count += 1
+    # Histograms are distributions and equities are probabilities
+    if not np.allclose(table['histogram'].sum(axis=1), 1) or np.any(table['equity'] <= 0) or \
+            np.any(table['equity'] >= 1):
+        wrong_count += 1
+    # More opponents, less equity
+    equities = [get_preflop_equity('AsAc', opponent_num) for opponent_num in range(1, MAX_OPPONENT_NUM + 1)]
+    if np.any(np.diff(equities) >= 0) or not 0.84 < equities[0] < 0.86:
+        wrong_count += 1
+    if not get_preflop_equity('AsAc') > get_preflop_equity('KsKc') > get_preflop_equity('7s2c'):
+        wrong_count += 1
+    # Lookups by Card objects, by the lossless abstraction and by the key agree
+    for hand_cards in itertools.combinations(deck[::5], 2):
+        state = PokerState(player_id=0, pot=[], hand_cards=list(hand_cards), public_cards=[], legal_actions=[])
+        abstraction = state.get_lossless_abstraction()
+        key = ''.join(abstraction)
+        for opponent_num in (1, 4, MAX_OPPONENT_NUM):
+            equity = get_preflop_equity(key, opponent_num)
+            if get_preflop_equity(list(hand_cards), opponent_num) != equity or \
+                    get_preflop_equity(abstraction, opponent_num) != equity:
+                wrong_count += 1
+        histogram = get_preflop_histogram(key)
+        if not np.array_equal(get_preflop_histogram(list(hand_cards)), histogram) or \
+                not np.array_equal(get_preflop_histogram(abstraction), histogram):
+            wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
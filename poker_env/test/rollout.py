@@ -0,0 +1,86 @@
+from poker_env.rollout import RolloutPool
+from poker_env.env import NoLimitTexasHoldemEnv as Env
+from poker_env.observation import ObservationEncoder
+from poker_env.agent.base_agent import Agent
+from poker_env.agent.random_agent import RandomAgent
+from poker_env.action import FOLD_ACTION
+import numpy as np
+
+
+ENV_KWARGS = {'num_players': 3}
+
+
+class FoldAgent(Agent):
+    def __init__(self):
+        super().__init__(agent_type='FoldAgent')
+
+    def step(self, state):
+        return FOLD_ACTION
+
+    def eval_step(self, state):
+        return FOLD_ACTION
+
+
+def agent_fn(params):
+    if params == 'fold':
+        return [FoldAgent() for _ in range(3)]
+    return [RandomAgent() for _ in range(3)]
+
+
+def replay_worker(seed, game_num):
+    '''
+    Play the games of the first worker of a pool in this process, with the same random streams.
+    '''
+    env_seed, agent_seed = np.random.SeedSequence(seed).spawn(1)[0].spawn(2)
+    np.random.seed(agent_seed.generate_state(1)[0])
+    env = Env(seed=np.random.default_rng(env_seed), **ENV_KWARGS)
+    env.set_agents(agent_fn(None))
+    encoder = ObservationEncoder(**ENV_KWARGS)
+    game_ids, player_ids, observations, actions, payoffs = [], [], [], [], []
+    for game in range(game_num):
+        trajectories, game_payoffs = env.run(is_training=True)
+        payoffs.append(game_payoffs)
+        for player_id, trajectory in enumerate(trajectories):
+            for i in range(0, len(trajectory), 2):
+                game_ids.append(game)
+                player_ids.append(player_id)
+                observations.append(encoder.encode(trajectory[i]))
+                actions.append(env.get_action_index(trajectory[i + 1]))
+    return np.array(game_ids), np.array(player_ids), np.array(observations), np.array(actions), np.array(payoffs)
+
+
+def run_test():
+    wrong_count = 0
+    games_per_batch = 8
+    with RolloutPool(agent_fn, worker_num=2, env_kwargs=ENV_KWARGS, games_per_batch=games_per_batch, seed=0) as pool:
+        # A batch is only requested from the first worker
+        rollouts = [pool.collect(games_per_batch) for _ in range(2)]
+        rollout = pool.collect(200)
+        pool.refresh('fold')
+        fold_rollout = pool.collect(2 * games_per_batch)
+    # The shared memory batches of the first worker are the same as playing its games in one process
+    game_ids, player_ids, observations, actions, payoffs = replay_worker(0, 2 * games_per_batch)
+    if not np.array_equal(np.concatenate([rollouts[0].game_ids, rollouts[1].game_ids + games_per_batch]), game_ids) \
+            or not np.array_equal(np.concatenate([r.player_ids for r in rollouts]), player_ids) \
+            or not np.array_equal(np.concatenate([r.actions for r in rollouts]), actions) \
+            or not np.array_equal(np.concatenate([r.observations for r in rollouts]), observations) \
+            or not np.array_equal(np.concatenate([r.payoffs for r in rollouts]), payoffs):
+        wrong_count += 1
+    public_card_nums = rollout.observations[:, pool.encoder.slices['public']].sum(axis=1)
+    seen = set()
+    for game_id, player_id, public_card_num in zip(rollout.game_ids, rollout.player_ids, public_card_nums):
+        # The first decision of each player is pre-flop, the board must be empty
+        if (game_id, player_id) not in seen:
+            seen.add((game_id, player_id))
+            if public_card_num != 0:
+                wrong_count += 1
+        # The board of a decision has 0, 3, 4 or 5 cards
+        if public_card_num not in (0, 3, 4, 5):
+            wrong_count += 1
+    if len(rollout.payoffs) < 200 or not np.allclose(rollout.payoffs.sum(axis=1), 0):
+        wrong_count += 1
+    # After refresh, every worker plays with the new agents: two players fold and the game is over
+    if len(fold_rollout.payoffs) < 2 * games_per_batch or np.any(fold_rollout.actions != FOLD_ACTION) or \
+            len(fold_rollout.actions) != 2 * len(fold_rollout.payoffs):
+        wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
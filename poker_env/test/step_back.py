@@ -0,0 +1,68 @@
+from poker_env.game import NoLimitTexasHoldemGame as Game
+import random
+
+
+def get_snapshot(game):
+    '''
+    The observable state of a game, to compare a game before a step and after stepping back.
+    '''
+    round = game.round
+    return (game.game_pointer, game.round_counter, round.game_pointer, round.not_raise_num,
+            round.current_raise_amount, round.all_in_player_num, round.alive_player_num, tuple(round.raised),
+            tuple((player.in_chips, player.status, tuple(card.string for card in player.hand))
+                  for player in game.players),
+            tuple(card.string for card in game.public_cards), tuple(game.game_tree),
+            tuple(card.string for card in game.dealer.get_remained_cards()),
+            tuple(game.get_legal_actions()) if not game.is_over() else ())
+
+
+def play_to_end(game):
+    while not game.is_over():
+        game.step(random.choice(game.get_legal_actions()))
+    game.get_payoffs()
+
+
+def run_test():
+    wrong_count = 0
+    random.seed(0)
+    # Random walks of steps and step_backs, every step_back must restore the game before the step
+    for _ in range(300):
+        game = Game(allow_step_back=True, num_players=random.choice([2, 3, 6]),
+                    init_chips=random.choice([10, 30, 100]))
+        game.init_game()
+        snapshots = []
+        for _ in range(100):
+            if game.is_over() or (snapshots and random.random() < 0.3):
+                if not snapshots:
+                    # The initial game is over
+                    wrong_count += 1
+                    break
+                game.step_back()
+                if get_snapshot(game) != snapshots.pop():
+                    wrong_count += 1
+                continue
+            snapshots.append(get_snapshot(game))
+            game.step(random.choice(game.get_legal_actions()))
+        # Undo the whole game
+        while snapshots:
+            game.step_back()
+            if get_snapshot(game) != snapshots.pop():
+                wrong_count += 1
+        if game.step_back():
+            wrong_count += 1
+    # A clone or a child is independent of its parent
+    for _ in range(100):
+        game = Game(allow_step_back=random.random() < 0.5, num_players=random.choice([2, 3, 6]),
+                    init_chips=random.choice([10, 30]))
+        game.init_game()
+        while not game.is_over():
+            snapshot = get_snapshot(game)
+            action = random.choice(game.get_legal_actions())
+            child = game.child(action)
+            play_to_end(child.clone())
+            if get_snapshot(game) != snapshot:
+                wrong_count += 1
+            game.step(action)
+            if get_snapshot(game) != get_snapshot(child):
+                wrong_count += 1
+    print("wrong number: {}".format(wrong_count))
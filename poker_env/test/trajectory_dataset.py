@@ -0,0 +1,40 @@
+from poker_env.rollout import RolloutPool
+from poker_env.trajectory_dataset import TrajectoryWriter, TrajectoryDataset
+from poker_env.agent.random_agent import RandomAgent
+import tempfile
+import numpy as np
+
+
+def agent_fn(params):
+    return [RandomAgent() for _ in range(3)]
+
+
+def run_test():
+    wrong_count = 0
+    with RolloutPool(agent_fn, worker_num=2, env_kwargs={'num_players': 3}, games_per_batch=8, seed=0) as pool:
+        rollout = pool.collect(200)
+    slices = pool.encoder.slices
+    with tempfile.TemporaryDirectory() as path:
+        # Small chunks, so the episodes are read back across several memory-mapped chunks
+        with TrajectoryWriter(path, pool.encoder.observation_shape, chunk_size=256) as writer:
+            writer.add_rollout(rollout)
+        dataset = TrajectoryDataset(path)
+        if dataset.step_num != len(rollout.actions) or dataset.episode_num != len(rollout.payoffs):
+            wrong_count += 1
+        batch = dataset.get_steps(np.arange(dataset.step_num))
+        if not np.array_equal(batch.observations, rollout.observations) or \
+                not np.array_equal(batch.actions, rollout.actions):
+            wrong_count += 1
+        public_card_nums = batch.observations[:, slices['public']].sum(axis=1)
+        # Pre-flop rows have an empty board
+        pre_flop = batch.observations[:, slices['round'].start] == 1
+        wrong_count += int(np.count_nonzero(public_card_nums[pre_flop]))
+        # The first decision of each player in an episode is pre-flop
+        seen = set()
+        for episode_id, player_id, public_card_num in zip(batch.episode_ids, batch.player_ids, public_card_nums):
+            if (episode_id, player_id) not in seen:
+                seen.add((episode_id, player_id))
+                if public_card_num != 0:
+                    wrong_count += 1
+        del dataset, batch
+    print("wrong number: {}".format(wrong_count))
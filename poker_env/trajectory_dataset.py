@@ -0,0 +1,279 @@
+import os
+import json
+import uuid
+import collections
+import numpy as np
+
+
+# Steps sampled from a TrajectoryDataset
+# observations (numpy.ndarray): shape (B, *observation_shape), the encoded observations
+# actions (numpy.ndarray): shape (B,), the index of each action in the action space of the env
+# player_ids (numpy.ndarray): shape (B,), the player who makes each decision
+# rewards (numpy.ndarray): shape (B,), the payoff of the player at the end of the episode
+# episode_ids (numpy.ndarray): shape (B,), the episode of each step in the dataset
+TrajectoryBatch = collections.namedtuple('TrajectoryBatch',
+                                         ['observations', 'actions', 'player_ids', 'rewards', 'episode_ids'])
+
+# The columns of a chunk, the episode offsets are stored in 'episodes'
+_COLUMNS = ('observations', 'actions', 'player_ids', 'rewards')
+_META_FILE = 'meta.json'
+STEP_CHUNK_SIZE = 65536
+
+
+def _get_column_dtypes(observation_dtype):
+    return {'observations': np.dtype(observation_dtype), 'actions': np.dtype(np.int32),
+            'player_ids': np.dtype(np.int8), 'rewards': np.dtype(np.float32)}
+
+
+class TrajectoryWriter:
+    '''
+    Append episodes to a trajectory dataset, a directory of chunks with fixed-width columns.
+
+    Steps are buffered in preallocated arrays and each full buffer is written as a chunk: a directory of .npy files
+    (observations, actions, player_ids, rewards, and the step offsets of the episodes). A chunk is written under a
+    temporary name and renamed when it is complete, and every writer names its chunks with its own token, so
+    several processes (Eg: the workers of rollouts) can append to the same dataset at the same time.
+    '''
+    def __init__(self, path, observation_shape, observation_dtype=np.float32, chunk_size=STEP_CHUNK_SIZE):
+        '''
+        Open a dataset for appending, it is created if it does not exist.
+
+        Args:
+            path (str): the directory of the dataset
+            observation_shape (tuple): the shape of an observation, Eg: ObservationEncoder.observation_shape
+            observation_dtype (numpy.dtype): the dtype of observations
+            chunk_size (int): the number of steps of a chunk, an episode is never split across chunks
+        '''
+        self.path = path
+        self.observation_shape = tuple(observation_shape)
+        self.chunk_size = chunk_size
+        self.__dtypes = _get_column_dtypes(observation_dtype)
+        os.makedirs(path, exist_ok=True)
+        meta = {'observation_shape': list(self.observation_shape),
+                'observation_dtype': self.__dtypes['observations'].str}
+        meta_path = os.path.join(path, _META_FILE)
+        try:
+            with open(meta_path, 'x') as f:
+                json.dump(meta, f)
+        except FileExistsError:
+            with open(meta_path) as f:
+                existing = json.load(f)
+            if existing != meta:
+                raise ValueError("The dataset has {}, which is different from {}.".format(existing, meta))
+        self.__token = '{}-{}'.format(os.getpid(), uuid.uuid4().hex[:8])
+        self.__chunk_num = 0
+        self.__buffers = self.__allocate(chunk_size)
+        self.__size = 0
+        self.__episode_offsets = [0]
+
+    def __allocate(self, size):
+        return {name: np.empty((size,) + (self.observation_shape if name == 'observations' else ()), dtype=dtype)
+                for name, dtype in self.__dtypes.items()}
+
+    def add_episode(self, observations, actions, player_ids, rewards):
+        '''
+        Append the steps of an episode.
+
+        Args:
+            observations (numpy.ndarray): shape (T, *observation_shape)
+            actions (numpy.ndarray): shape (T,), action indices
+            player_ids (numpy.ndarray): shape (T,)
+            rewards (numpy.ndarray or float): shape (T,), or one reward for all the steps
+        '''
+        step_num = len(actions)
+        if self.__size + step_num > self.chunk_size:
+            self.flush()
+        if step_num > self.chunk_size:
+            # A long episode takes a chunk of its own
+            buffers, self.__buffers = self.__buffers, self.__allocate(step_num)
+        else:
+            buffers = None
+        start = self.__size
+        columns = self.__buffers
+        columns['observations'][start:start + step_num] = observations
+        columns['actions'][start:start + step_num] = actions
+        columns['player_ids'][start:start + step_num] = player_ids
+        columns['rewards'][start:start + step_num] = rewards
+        self.__size += step_num
+        self.__episode_offsets.append(self.__size)
+        if buffers is not None:
+            self.flush()
+            self.__buffers = buffers
+
+    def add_rollout(self, rollout):
+        '''
+        Append the games of a rollout collected by poker_env.rollout.RolloutPool, each game is an episode
+        and the reward of a step is the payoff of its player.
+
+        Args:
+            rollout (Rollout): the rollout
+        '''
+        game_ids = np.asarray(rollout.game_ids)
+        rewards = rollout.payoffs[game_ids, rollout.player_ids]
+        bounds = np.flatnonzero(np.diff(game_ids)) + 1
+        for start, end in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(game_ids)]])):
+            if end > start:
+                self.add_episode(rollout.observations[start:end], rollout.actions[start:end],
+                                 rollout.player_ids[start:end], rewards[start:end])
+
+    def flush(self):
+        '''
+        Write the buffered episodes as a chunk.
+        '''
+        if self.__size == 0:
+            return
+        name = '{}-{:06d}'.format(self.__token, self.__chunk_num)
+        temp_path = os.path.join(self.path, '.' + name)
+        os.makedirs(temp_path)
+        for column, buffer in self.__buffers.items():
+            np.save(os.path.join(temp_path, column + '.npy'), buffer[:self.__size])
+        np.save(os.path.join(temp_path, 'episodes.npy'), np.array(self.__episode_offsets, dtype=np.int64))
+        os.rename(temp_path, os.path.join(self.path, name))
+        self.__chunk_num += 1
+        self.__size = 0
+        self.__episode_offsets = [0]
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TrajectoryDataset:
+    '''
+    Random access to the steps and episodes of a trajectory dataset written by TrajectoryWriter.
+
+    The columns of every chunk are opened with np.memmap (by np.load with mmap_mode='r'), so the data is paged in
+    from disk on demand and shared by the processes that read the same dataset. Chunks appended after the dataset
+    is opened are loaded by refresh().
+
+    Attributes:
+        observation_shape (tuple): the shape of an observation
+        step_num (int): the number of steps
+        episode_num (int): the number of episodes
+    '''
+    def __init__(self, path):
+        '''
+        Args:
+            path (str): the directory of the dataset
+        '''
+        self.path = path
+        with open(os.path.join(path, _META_FILE)) as f:
+            meta = json.load(f)
+        self.observation_shape = tuple(meta['observation_shape'])
+        self.__dtypes = _get_column_dtypes(meta['observation_dtype'])
+        self.__chunk_names = set()
+        self.__chunks = []
+        self.__step_counts = np.zeros(1, dtype=np.int64)
+        self.__episode_counts = np.zeros(1, dtype=np.int64)
+        self.refresh()
+
+    def refresh(self):
+        '''
+        Open the chunks that are not opened yet.
+
+        Returns:
+            (int): the number of new chunks
+        '''
+        names = sorted(name for name in os.listdir(self.path)
+                       if not name.startswith('.') and name not in self.__chunk_names and
+                       os.path.isdir(os.path.join(self.path, name)))
+        step_counts = self.__step_counts.tolist()
+        episode_counts = self.__episode_counts.tolist()
+        for name in names:
+            chunk_path = os.path.join(self.path, name)
+            chunk = {column: np.load(os.path.join(chunk_path, column + '.npy'), mmap_mode='r')
+                     for column in _COLUMNS}
+            chunk['episodes'] = np.load(os.path.join(chunk_path, 'episodes.npy'))
+            self.__chunks.append(chunk)
+            self.__chunk_names.add(name)
+            step_counts.append(step_counts[-1] + len(chunk['actions']))
+            episode_counts.append(episode_counts[-1] + len(chunk['episodes']) - 1)
+        self.__step_counts = np.array(step_counts, dtype=np.int64)
+        self.__episode_counts = np.array(episode_counts, dtype=np.int64)
+        return len(names)
+
+    @property
+    def step_num(self):
+        return int(self.__step_counts[-1])
+
+    @property
+    def episode_num(self):
+        return int(self.__episode_counts[-1])
+
+    def __len__(self):
+        return self.step_num
+
+    def get_steps(self, indices):
+        '''
+        Gather steps by their indices in the dataset.
+
+        Args:
+            indices (numpy.ndarray): the indices of steps
+
+        Returns:
+            (TrajectoryBatch): the steps in the order of indices
+        '''
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) > 0 and (indices.min() < 0 or indices.max() >= self.step_num):
+            raise IndexError("step index out of range")
+        dtypes = self.__dtypes
+        observations = np.empty((len(indices),) + self.observation_shape, dtype=dtypes['observations'])
+        actions = np.empty(len(indices), dtype=dtypes['actions'])
+        player_ids = np.empty(len(indices), dtype=dtypes['player_ids'])
+        rewards = np.empty(len(indices), dtype=dtypes['rewards'])
+        episode_ids = np.empty(len(indices), dtype=np.int64)
+        chunk_ids = np.searchsorted(self.__step_counts, indices, side='right') - 1
+        # Read each chunk once, with the rows in increasing order
+        order = np.lexsort((indices, chunk_ids))
+        bounds = np.flatnonzero(np.diff(chunk_ids[order])) + 1
+        for positions in np.split(order, bounds):
+            if len(positions) == 0:
+                continue
+            chunk_id = chunk_ids[positions[0]]
+            chunk = self.__chunks[chunk_id]
+            rows = indices[positions] - self.__step_counts[chunk_id]
+            observations[positions] = chunk['observations'][rows]
+            actions[positions] = chunk['actions'][rows]
+            player_ids[positions] = chunk['player_ids'][rows]
+            rewards[positions] = chunk['rewards'][rows]
+            episode_ids[positions] = self.__episode_counts[chunk_id] + \
+                np.searchsorted(chunk['episodes'], rows, side='right') - 1
+        return TrajectoryBatch(observations, actions, player_ids, rewards, episode_ids)
+
+    def sample(self, batch_size, rng=None):
+        '''
+        Sample steps uniformly with replacement.
+
+        Args:
+            batch_size (int): the number of steps
+            rng (numpy.random.Generator): the random generator, default is a new unpredictable one
+
+        Returns:
+            (TrajectoryBatch): the steps
+        '''
+        rng = np.random.default_rng(rng)
+        return self.get_steps(rng.integers(self.step_num, size=batch_size))
+
+    def get_episode(self, episode_id):
+        '''
+        Get the steps of an episode, the columns are views of the memory-mapped files.
+
+        Args:
+            episode_id (int): the index of the episode in the dataset
+
+        Returns:
+            (TrajectoryBatch): the steps of the episode
+        '''
+        if not 0 <= episode_id < self.episode_num:
+            raise IndexError("episode index out of range")
+        chunk_id = int(np.searchsorted(self.__episode_counts, episode_id, side='right')) - 1
+        chunk = self.__chunks[chunk_id]
+        i = episode_id - int(self.__episode_counts[chunk_id])
+        start, end = chunk['episodes'][i:i + 2].tolist()
+        return TrajectoryBatch(*(chunk[column][start:end] for column in _COLUMNS),
+                               np.full(end - start, episode_id, dtype=np.int64))
@@ -1,5 +1,8 @@
-from poker_env.card import Card, LookUpStr
-from poker_env.hand import compare_2_hands
+from poker_env.card import Card, RANK_STR, SUIT_STR
+from poker_env.evaluator import evaluate_hand
+
+# The 52 shared Card objects in the order of card ids
+_DECK = tuple(Card(suit, rank) for suit in SUIT_STR for rank in RANK_STR)
 
 
 def init_52_deck():
@@ -8,7 +11,7 @@ def init_52_deck():
     Returns:
         (list): A list of Card object
     '''
-    return [Card(suit, rank) for suit in LookUpStr.SUIT.value for rank in LookUpStr.RANK.value]
+    return list(_DECK)
 
 
 def compare_all_hands(hands):
@@ -16,18 +19,22 @@ def compare_all_hands(hands):
     Compare all palyer's all seven cards.
 
     Args:
-        hands(list) : seven cards of all players
+        hands(list) : seven cards of all players (card ids or card index strings), None for players out of the pot
     Returns:
         [0, ... , i, ... , 0]: player i wins
     '''
+    # The only player left wins without showdown (the board may be incomplete)
+    if sum(hand is not None for hand in hands) == 1:
+        return [1 if hand is not None else 0 for hand in hands]
     winner = []
-    winner_hand = None
+    winner_rank = None
     for i, hand in enumerate(hands):
-        result = compare_2_hands(winner_hand, hand)
-        if result == [0, 1]:
+        # Evaluate each hand only once, then compare hand ranks
+        rank = evaluate_hand(hand) if hand is not None else None
+        if winner_rank is None or (rank is not None and rank > winner_rank):
             winner = [i]
-            winner_hand = hand
-        elif result == [1, 1]:
+            winner_rank = rank
+        elif rank == winner_rank:
             winner.append(i)
     result = [1 if (i in winner) else 0 for i in range(len(hands))]
     return result
@@ -0,0 +1,112 @@
+import numpy as np
+from poker_env.game import NoLimitTexasHoldemGame as Game
+from poker_env.action import get_action_from_index
+from poker_env.observation import ObservationEncoder
+
+
+class NoLimitTexasHoldemVectorEnv:
+    '''
+    A vectorized No Limit Texas Holdem Environment that steps several independent tables in lockstep.
+
+    Actions are indices of the action space of NoLimitTexasHoldemEnv. Every step takes one action for each
+    table and returns batched observations, legal action masks, current player ids and done flags. A table
+    is reset automatically when its game is over.
+
+    The observation of a table is the state of its current player encoded by ObservationEncoder, the same
+    layout as the rollouts (see encoder.slices).
+
+    Attributes:
+        env_num (int): the number of tables
+        num_players (int): the number of players at each table
+        action_space (list): each element (str) represent a possible action
+        encoder (ObservationEncoder): the encoder of the observations
+        observation_shape (tuple): the shape of the observation of a table
+    '''
+    def __init__(self, env_num, num_players=2, small_blind=1, big_blind=2, init_chips=100, seed=None):
+        '''
+        Initialize the vectorized environment
+
+        Args:
+            env_num (int): the number of tables
+            num_players (int): the number of players at each table
+            small_blind (int): the number of Small Blind(SB) chips
+            big_blind (int): the number of Big Blind(BB) chips
+            init_chips (int or list): chips that each player holds when game starts
+            seed (int or numpy.random.SeedSequence): the seed, each table gets an independent stream spawned from it
+        '''
+        self.env_num = env_num
+        self.num_players = num_players
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        seeds = seed.spawn(env_num)
+        self.games = [Game(num_players=num_players, small_blind=small_blind, big_blind=big_blind,
+                           init_chips=init_chips, seed=seeds[i]) for i in range(env_num)]
+        self.big_blind = big_blind
+        self.init_chips = init_chips
+        self.encoder = ObservationEncoder(num_players=num_players, big_blind=big_blind, init_chips=init_chips)
+        self.action_space = self.encoder.action_space
+        self.observation_shape = self.encoder.observation_shape
+        # The legal action masks of the last observations, actions are checked against them
+        self.__legal_masks = None
+
+    def reset(self):
+        '''
+        Start new games on all the tables.
+
+        Returns:
+            (tuple): Tuple containing:
+                (numpy.ndarray): shape (env_num, *observation_shape), the observations
+                (numpy.ndarray): shape (env_num, len(action_space)), the legal action masks
+                (numpy.ndarray): shape (env_num,), the current player ids
+        '''
+        for game in self.games:
+            game.init_game()
+        return self.get_observations()
+
+    def step(self, actions):
+        '''
+        Take one action on each table, and reset the tables whose games are over.
+
+        Args:
+            actions (numpy.ndarray): shape (env_num,), the action index of the current player on each table,
+                                     it must be legal in the legal action masks of the last observations
+
+        Returns:
+            (tuple): Tuple containing:
+                (numpy.ndarray): shape (env_num, *observation_shape), the observations
+                (numpy.ndarray): shape (env_num, len(action_space)), the legal action masks
+                (numpy.ndarray): shape (env_num,), the current player ids
+                (numpy.ndarray): shape (env_num,), True if the game of the table is over at this step
+                (numpy.ndarray): shape (env_num, num_players), the payoffs of the finished games, 0 otherwise
+        '''
+        if len(actions) != self.env_num:
+            raise ValueError("The number of actions must equal to env_num.")
+        if self.__legal_masks is None:
+            raise ValueError("Call reset before step.")
+        actions = np.asarray(actions)
+        in_range = (actions >= 0) & (actions < len(self.action_space))
+        legal = in_range & self.__legal_masks[np.arange(self.env_num), np.where(in_range, actions, 0)]
+        if not legal.all():
+            i = int(np.argmin(legal))
+            raise ValueError("Action {} is illegal on table {}.".format(actions[i], i))
+        dones = np.zeros(self.env_num, dtype=bool)
+        payoffs = np.zeros((self.env_num, self.num_players))
+        for i, (game, action) in enumerate(zip(self.games, actions)):
+            game.step(get_action_from_index(int(action), self.big_blind, self.init_chips))
+            if game.is_over():
+                dones[i] = True
+                payoffs[i] = game.get_payoffs()
+                game.init_game()
+        observations, legal_masks, player_ids = self.get_observations()
+        return observations, legal_masks, player_ids, dones, payoffs
+
+    def get_observations(self):
+        '''
+        Get the observations, legal action masks and current player ids of all the tables.
+        '''
+        states = [game.get_state() for game in self.games]
+        observations = self.encoder.encode_batch(states)
+        legal_masks = observations[:, self.encoder.slices['legal']].astype(bool)
+        self.__legal_masks = legal_masks
+        player_ids = np.array([state.player_id for state in states], dtype=np.int64)
+        return observations, legal_masks, player_ids